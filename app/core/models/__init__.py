@@ -4,7 +4,8 @@ __all__ = {
     "database_helper",
     "User",
     "RefreshToken",
-    "VerificationCode"
+    "VerificationCode",
+    "BidderState"
 }
 
 
@@ -13,4 +14,5 @@ from .base import Base
 from .databasehelper import DataBaseHelper, database_helper
 from .user import User
 from .token import RefreshToken
-from .verification_codes import VerificationCode
\ No newline at end of file
+from .verification_codes import VerificationCode
+from .bidder_state import BidderState
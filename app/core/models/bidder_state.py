@@ -0,0 +1,15 @@
+from datetime import datetime
+
+from sqlalchemy import BigInteger, Integer, DateTime, JSON
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base import Base
+
+
+class BidderState(Base):
+    advert_id: Mapped[int] = mapped_column(BigInteger, nullable=False, unique=True, index=True)
+    last_cpm: Mapped[int] = mapped_column(Integer, nullable=False)
+    last_position: Mapped[int] = mapped_column(Integer, nullable=True)
+    streak: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    manager_state: Mapped[dict] = mapped_column(JSON, nullable=False, default=dict)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.utcnow)
@@ -8,7 +8,7 @@ from sqlalchemy.dialects.postgresql import UUID
 
 from .base import Base
 from .mixin import VerificationCodeAndTokenMixin, DateMixin
-from core.settings import settings
+from ..settings import settings
 
 if TYPE_CHECKING:
     from .user import User
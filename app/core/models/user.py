@@ -11,7 +11,7 @@ from .types.emailtype import EmailType
 from .enum.accountstatus import AccountStatus
 from .enum.accountrole import AccountRole
 from .enum.subscriptionstatus import SubscriptionStatus
-from core.settings import settings
+from ..settings import settings
 
 
 if TYPE_CHECKING:
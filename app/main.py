@@ -5,11 +5,18 @@ from fastapi.middleware.cors import CORSMiddleware
 
 from v0 import router as router_v0
 from core.settings import settings
+from utils.http_client import get_shared_http_client
 
+from contextlib import asynccontextmanager
 import uvicorn
 
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    async with get_shared_http_client():
+        yield
+
+app = FastAPI(lifespan=lifespan)
 
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
@@ -2,7 +2,7 @@ import asyncio
 import httpx
 
 from core.settings import settings
-from utils.http_client import HttpxHttpClient
+from utils.http_client import HttpxHttpClient, get_shared_http_client
 from .exceptions import CustomHTTPException
 
 
@@ -27,7 +27,7 @@ class SMSCSender:
     UNKNOWN = "Internal Server Error"
 
     def __init__(self, smsc_login: str, smsc_psw: str, smsc_tg: str):
-        self.httpx_request: HttpxHttpClient = HttpxHttpClient()
+        self.httpx_request: HttpxHttpClient = get_shared_http_client()
         self.smsc_login = smsc_login
         self.smsc_psw = smsc_psw
         self.smsc_tg = smsc_tg
@@ -0,0 +1,383 @@
+from abc import ABC, abstractmethod
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import asyncio
+import json
+
+import numpy as np
+
+from utils.http_client import BaseHttpClient
+from .batch_manager_cpm import BatchManagerCPM
+from .bidder_2 import DefaultBidder
+from .schemas import BidderData, ModeBidder
+from .settings import settings
+
+
+class AuctionModel(ABC):
+    '''
+    Модель аукциона: какую позицию получает каждая кампания при ставке cpm
+    на тике tick и какая минимальная ставка нужна для желаемой позиции.
+    '''
+
+    @abstractmethod
+    def position(self, cpm: np.ndarray, tick: int) -> np.ndarray: ...
+
+    @abstractmethod
+    def required_cpm(self, wish_position: np.ndarray, tick: int) -> np.ndarray: ...
+
+class SyntheticAuctionModel(AuctionModel):
+    '''
+    position = 1 + (worst - 1) * exp(-sensitivity * (cpm - floor)) + шум,
+    floor (ставка конкурентов) случайно блуждает от тика к тику.
+    '''
+    WORST_POSITION = settings.backtest.worst_position
+    NOISE = settings.backtest.noise
+    FLOOR_DRIFT = settings.backtest.floor_drift
+
+    def __init__(
+        self,
+        floor_cpm: np.ndarray,
+        sensitivity: np.ndarray,
+        worst_position: int = WORST_POSITION,
+        noise: float = NOISE,
+        floor_drift: float = FLOOR_DRIFT,
+        seed: int | None = None
+    ):
+        self.sensitivity = np.asarray(sensitivity, dtype=float)
+        self.worst_position = worst_position
+        self.noise = noise
+        self.floor_drift = floor_drift
+
+        self._rng = np.random.default_rng(seed)
+        self._floors = [np.asarray(floor_cpm, dtype=float)]
+
+    def position(self, cpm: np.ndarray, tick: int) -> np.ndarray:
+        raw = 1 + (self.worst_position - 1) * np.exp(-self.sensitivity * (cpm - self._get_floor(tick=tick)))
+        raw += self._rng.normal(0, self.noise, raw.shape) if self.noise else 0
+        return np.clip(np.rint(raw), 1, self.worst_position).astype(int)
+
+    def required_cpm(self, wish_position: np.ndarray, tick: int) -> np.ndarray:
+        ratio = (self.worst_position - 1) / np.maximum(wish_position - 0.5, 1e-9)
+        return np.maximum(self._get_floor(tick=tick) + np.log(ratio) / self.sensitivity, 0)
+
+    def _get_floor(self, tick: int) -> np.ndarray:
+        while len(self._floors) <= tick:
+            drift = self._rng.normal(0, self.floor_drift, self._floors[-1].shape)
+            self._floors.append(self._floors[-1] + drift)
+        return self._floors[tick]
+
+class RecordedAuctionModel(AuctionModel):
+    '''
+    Реплей записанных рядов (timestamp, position, cpm) по кампаниям.
+    Из всех точек кампании строится монотонная кривая position(cpm) на сетке
+    ставок, а на тике t к ней добавляется отклонение записанной позиции t от
+    кривой - так воспроизводится динамика аукциона во времени.
+    '''
+
+
+    def __init__(self, records: list[list[tuple]], min_cpm: int, max_cpm: int):
+        self.min_cpm = min_cpm
+        self.cpm_grid = np.arange(min_cpm, max_cpm + 1)
+
+        self.curves = np.empty((len(records), len(self.cpm_grid)))
+        self.lengths = np.empty(len(records), dtype=int)
+        self.residuals = np.zeros((len(records), max(len(rows) for rows in records)))
+
+        for index, rows in enumerate(records):
+            self._fit_campaign(index=index, rows=sorted(rows))
+
+    def position(self, cpm: np.ndarray, tick: int) -> np.ndarray:
+        residual = self.residuals[np.arange(len(self.lengths)), tick % self.lengths]
+        raw = self.curves[np.arange(len(self.lengths)), self._get_grid_index(cpm=cpm)] + residual
+        return np.maximum(np.rint(raw), 1).astype(int)
+
+    def required_cpm(self, wish_position: np.ndarray, tick: int) -> np.ndarray:
+        residual = self.residuals[np.arange(len(self.lengths)), tick % self.lengths]
+        reached = self.curves + residual[:, None] <= np.asarray(wish_position)[:, None] + 0.5
+        first = np.argmax(reached, axis=1)
+        return np.where(reached.any(axis=1), self.cpm_grid[first], np.inf)
+
+    def _fit_campaign(self, index: int, rows: list[tuple]) -> None:
+        _, positions, cpms = (np.asarray(column, dtype=float) for column in zip(*rows))
+        order = np.argsort(cpms, kind="stable")
+        monotone = np.minimum.accumulate(positions[order])
+
+        self.curves[index] = np.interp(self.cpm_grid, cpms[order], monotone)
+        self.lengths[index] = len(rows)
+        self.residuals[index, :len(rows)] = positions - np.interp(cpms, cpms[order], monotone)
+
+    def _get_grid_index(self, cpm: np.ndarray) -> np.ndarray:
+        return np.clip(np.asarray(cpm, dtype=int) - self.min_cpm, 0, len(self.cpm_grid) - 1)
+
+class BacktestResult:
+    def __init__(
+        self,
+        time_to_target: np.ndarray,
+        overspend: np.ndarray,
+        spend: np.ndarray,
+        bid_changes: np.ndarray,
+        bid_change_amount: np.ndarray,
+        final_cpm: np.ndarray
+    ):
+        self.time_to_target = time_to_target
+        self.overspend = overspend
+        self.spend = spend
+        self.bid_changes = bid_changes
+        self.bid_change_amount = bid_change_amount
+        self.final_cpm = final_cpm
+
+    @classmethod
+    def merge(cls, results: list["BacktestResult"]) -> "BacktestResult":
+        return cls(**{
+            name: np.concatenate([getattr(result, name) for result in results])
+            for name in ("time_to_target", "overspend", "spend", "bid_changes", "bid_change_amount", "final_cpm")
+        })
+
+    def summary(self) -> dict:
+        reached = ~np.isnan(self.time_to_target)
+        return {
+            "campaigns": len(self.spend),
+            "reached_share": float(reached.mean()) if len(reached) else 0.0,
+            "mean_time_to_target": float(self.time_to_target[reached].mean()) if reached.any() else None,
+            "mean_overspend": float(self.overspend.mean()),
+            "mean_spend": float(self.spend.mean()),
+            "mean_bid_changes": float(self.bid_changes.mean()),
+            "mean_bid_change_amount": float(self.bid_change_amount.mean()),
+        }
+
+class BacktestRecorder:
+    def __init__(self, count: int):
+        self.time_to_target = np.full(count, np.nan)
+        self.overspend = np.zeros(count)
+        self.spend = np.zeros(count)
+        self.bid_changes = np.zeros(count, dtype=int)
+        self.bid_change_amount = np.zeros(count)
+
+    def record_position(self, tick: int, position: np.ndarray, wish_position: np.ndarray) -> None:
+        reached = (position <= wish_position) & np.isnan(self.time_to_target)
+        self.time_to_target[reached] = tick
+
+    def record_spend(self, applied_cpm: np.ndarray, required_cpm: np.ndarray) -> None:
+        self.spend += applied_cpm
+        self.overspend += np.clip(applied_cpm - required_cpm, 0, None)
+
+    def record_bids(self, applied_cpm: np.ndarray, new_cpm: np.ndarray) -> None:
+        changed = new_cpm != applied_cpm
+        self.bid_changes += changed
+        self.bid_change_amount += np.abs(new_cpm - applied_cpm)
+
+    def result(self, final_cpm: np.ndarray) -> BacktestResult:
+        return BacktestResult(
+            time_to_target=self.time_to_target,
+            overspend=self.overspend,
+            spend=self.spend,
+            bid_changes=self.bid_changes,
+            bid_change_amount=self.bid_change_amount,
+            final_cpm=final_cpm
+        )
+
+class Backtester(ABC):
+
+    @abstractmethod
+    def run(self, ticks: int) -> BacktestResult: ...
+
+class BatchBacktester(Backtester):
+    '''
+    Векторный прогон: все кампании двигаются одним вызовом BatchManagerCPM
+    на тик. Повторяет цикл DefaultBidder: стоп при position == wish или когда
+    ставка упёрлась в max, база ставки - на первом тике
+    DefaultCalculatorCPM.calculate_start_cpm, дальше последняя отправленная.
+    '''
+
+
+    def __init__(
+        self,
+        manager: BatchManagerCPM,
+        model: AuctionModel,
+        step: np.ndarray,
+        wish_position: np.ndarray,
+        min_cpm: np.ndarray,
+        max_cpm: np.ndarray,
+        initial_cpm: np.ndarray | None = None
+    ):
+        self.manager = manager
+        self.model = model
+        self.step = np.asarray(step)
+        self.wish_position = np.asarray(wish_position)
+        self.min_cpm = np.asarray(min_cpm)
+        self.max_cpm = np.asarray(max_cpm)
+        self.initial_cpm = self.min_cpm if initial_cpm is None else np.asarray(initial_cpm)
+
+    def run(self, ticks: int = settings.backtest.ticks_per_day) -> BacktestResult:
+        recorder = BacktestRecorder(count=len(self.min_cpm))
+        applied_cpm = self.initial_cpm.copy()
+        calculator_min_cpm = self.min_cpm.copy()
+        active = np.ones(len(self.min_cpm), dtype=bool)
+
+        for tick in range(ticks):
+            position = self.model.position(cpm=applied_cpm, tick=tick)
+            recorder.record_position(tick=tick, position=position, wish_position=self.wish_position)
+            recorder.record_spend(
+                applied_cpm=applied_cpm,
+                required_cpm=self.model.required_cpm(wish_position=self.wish_position, tick=tick)
+            )
+
+            active &= (position != self.wish_position) & (calculator_min_cpm < self.max_cpm)
+            new_cpm = self.manager.increase_cpm(
+                cpm=self._calculate_start_cpm(calculator_min_cpm=calculator_min_cpm) if tick == 0 else applied_cpm,
+                step=self.step,
+                current_position=position,
+                wish_position=self.wish_position,
+                min_cpm=self.min_cpm,
+                max_cpm=self.max_cpm
+            )
+            new_cpm = np.where(active, new_cpm, applied_cpm)
+
+            recorder.record_bids(applied_cpm=applied_cpm, new_cpm=new_cpm)
+            applied_cpm = new_cpm
+            calculator_min_cpm = np.where(active, new_cpm, calculator_min_cpm)
+
+        return recorder.result(final_cpm=applied_cpm)
+
+    def _calculate_start_cpm(self, calculator_min_cpm: np.ndarray) -> np.ndarray:
+        part_max_cpm = self.max_cpm // 3
+        return np.where(part_max_cpm > calculator_min_cpm, part_max_cpm, calculator_min_cpm)
+
+class NoHttpClient(BaseHttpClient):
+    async def send_request(self, method: str, url: str, **kwargs):
+        raise RuntimeError("Backtest must not send HTTP requests")
+
+class SimulatedBidder(DefaultBidder):
+    '''
+    Настоящий DefaultBidder.start() без HTTP: позицию подставляет бэктест,
+    ставка записывается в applied_cpm.
+    '''
+
+
+    def __init__(self, bidder_data: BidderData, initial_cpm: int | None = None):
+        super().__init__(
+            bidder_data=bidder_data,
+            http_client=NoHttpClient(),
+            token="backtest",
+            articuls=[]
+        )
+        self.simulated_position: int | None = None
+        self.applied_cpm = bidder_data.min_cpm_campaign if initial_cpm is None else initial_cpm
+        self.finished = False
+
+    async def _get_current_position(self):
+        return self.simulated_position
+
+    async def _change_cpm(self, cpm: int):
+        self.applied_cpm = cpm
+        self.calculator.min_cpm = cpm
+
+class BidderBacktester(Backtester):
+    '''
+    Прогон через DefaultBidder -> CalculatorCPM -> ManagerCPM по одному тику
+    на кампанию. Медленнее BatchBacktester, зато проверяет ровно тот код,
+    что работает в проде, и любой зарегистрированный ManagerCPM.
+    '''
+
+
+    def __init__(self, bidders_data: list[BidderData], model: AuctionModel):
+        self.bidders = [SimulatedBidder(bidder_data=bidder_data) for bidder_data in bidders_data]
+        self.model = model
+        self.wish_position = np.array([bidder_data.wish_place_in_top for bidder_data in bidders_data])
+
+    def run(self, ticks: int = settings.backtest.ticks_per_day) -> BacktestResult:
+        return asyncio.run(self._run(ticks=ticks))
+
+    async def _run(self, ticks: int) -> BacktestResult:
+        recorder = BacktestRecorder(count=len(self.bidders))
+
+        for tick in range(ticks):
+            applied_cpm = self._get_applied_cpm()
+            position = self.model.position(cpm=applied_cpm, tick=tick)
+            recorder.record_position(tick=tick, position=position, wish_position=self.wish_position)
+            recorder.record_spend(
+                applied_cpm=applied_cpm,
+                required_cpm=self.model.required_cpm(wish_position=self.wish_position, tick=tick)
+            )
+
+            for bidder, current_position in zip(self.bidders, position):
+                await self._tick(bidder=bidder, current_position=int(current_position))
+            recorder.record_bids(applied_cpm=applied_cpm, new_cpm=self._get_applied_cpm())
+
+        return recorder.result(final_cpm=self._get_applied_cpm())
+
+    async def _tick(self, bidder: SimulatedBidder, current_position: int) -> None:
+        if bidder.finished:
+            return
+        bidder.simulated_position = current_position
+        bidder.finished = bool(await bidder.start())
+
+    def _get_applied_cpm(self) -> np.ndarray:
+        return np.array([bidder.applied_cpm for bidder in self.bidders])
+
+def _run_backtester(backtester: Backtester, ticks: int) -> BacktestResult:
+    return backtester.run(ticks=ticks)
+
+def run_in_processes(
+    backtesters: list[Backtester],
+    ticks: int = settings.backtest.ticks_per_day,
+    max_workers: int | None = None
+) -> BacktestResult:
+    '''
+    Каждый бэктестер (чанк кампаний) считается в отдельном процессе,
+    результаты склеиваются в один BacktestResult.
+    '''
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        results = list(executor.map(_run_backtester, backtesters, [ticks] * len(backtesters)))
+    return BacktestResult.merge(results)
+
+def compare_modes(
+    bidders_data: list[BidderData],
+    model: AuctionModel,
+    modes: list[ModeBidder],
+    ticks: int = settings.backtest.ticks_per_day
+) -> dict[str, dict]:
+    '''
+    Одни и те же кампании и модель аукциона, разные режимы биддера.
+    '''
+    return {
+        mode.value: BidderBacktester(
+            bidders_data=[
+                bidder_data.model_copy(update={"type_work_bidder": mode}) for bidder_data in bidders_data
+            ],
+            model=model
+        ).run(ticks=ticks).summary()
+        for mode in modes
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Сравнение режимов биддера на синтетическом аукционе")
+    parser.add_argument("--campaigns", type=int, default=100)
+    parser.add_argument("--ticks", type=int, default=settings.backtest.ticks_per_day)
+    parser.add_argument("--modes", nargs="+", default=["default", "momentum", "pid"])
+    parser.add_argument("--max-cpm", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    model = SyntheticAuctionModel(
+        floor_cpm=rng.uniform(100, 250, args.campaigns),
+        sensitivity=rng.uniform(0.01, 0.05, args.campaigns),
+        seed=args.seed
+    )
+    bidders_data = [
+        BidderData(advertId=index, max_cpm_campaign=args.max_cpm, wish_place_in_top=int(wish_position))
+        for index, wish_position in enumerate(rng.integers(5, 50, args.campaigns))
+    ]
+
+    summary = compare_modes(
+        bidders_data=bidders_data,
+        model=model,
+        modes=[ModeBidder(mode) for mode in args.modes],
+        ticks=args.ticks
+    )
+    for mode, result in summary.items():
+        print(mode, json.dumps(result))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+from abc import ABC, abstractmethod
+
+import numpy as np
+
+from .settings import settings
+from .utils import BaseRegistry, BaseFabric
+
+
+class BatchManagerCPM(ABC):
+    '''
+    Векторный аналог ManagerCPM: считает следующие ставки сразу для всех
+    кампаний. Все аргументы - массивы одинаковой длины.
+    '''
+
+    @abstractmethod
+    def increase_cpm(
+        self,
+        cpm: np.ndarray,
+        step: np.ndarray,
+        current_position: np.ndarray,
+        wish_position: np.ndarray,
+        min_cpm: np.ndarray,
+        max_cpm: np.ndarray
+    ) -> np.ndarray:
+        ...
+
+class BaseBatchManagerCPM(BatchManagerCPM):
+
+    def increase_cpm(
+        self,
+        cpm: np.ndarray,
+        step: np.ndarray,
+        current_position: np.ndarray,
+        wish_position: np.ndarray,
+        min_cpm: np.ndarray,
+        max_cpm: np.ndarray
+    ) -> np.ndarray:
+        current_position = np.asarray(current_position)
+        wish_position = np.asarray(wish_position)
+        step = self._get_step(
+            step=np.asarray(step),
+            current_position=current_position,
+            wish_position=wish_position
+        )
+        signed_step = self._get_positive_or_negative_step_increase_of_position_dif(
+            step=step,
+            current_position=current_position,
+            wish_position=wish_position
+        )
+        return np.clip(np.asarray(cpm) + signed_step, min_cpm, max_cpm)
+
+    def _get_step(
+        self,
+        step: np.ndarray,
+        current_position: np.ndarray,
+        wish_position: np.ndarray
+    ) -> np.ndarray:
+        return step
+
+    @staticmethod
+    def _get_positive_or_negative_step_increase_of_position_dif(
+        step: np.ndarray,
+        current_position: np.ndarray,
+        wish_position: np.ndarray
+    ) -> np.ndarray:
+        return np.where(wish_position > current_position, -step, step)
+
+class DefaultBatchManagerCPM(BaseBatchManagerCPM): ...
+
+class MomentumBatchManagerCPM(BaseBatchManagerCPM):
+    DEFAULT_DIF_PLACES = settings.cpm_var.default_dif_between_position_momentum_mode
+    MINIMUM_STEP = settings.cpm_var.step_cpm
+
+    def _get_step(
+        self,
+        step: np.ndarray,
+        current_position: np.ndarray,
+        wish_position: np.ndarray
+    ) -> np.ndarray:
+        use_minimum_step = np.abs(wish_position - current_position) < self.DEFAULT_DIF_PLACES
+        return np.where(use_minimum_step, self.MINIMUM_STEP, step)
+
+class BatchManagerCPMRegistry(BaseRegistry):
+    _registry = {}
+
+class BatchManagerCPMFabric(BaseFabric): ...
+
+class BatchDecisionEngine:
+    '''
+    Раскидывает кампании по режимам (массив modes) и считает ставки каждого
+    режима одним векторным вызовом.
+    '''
+
+
+    def __init__(self, registry: BaseRegistry = BatchManagerCPMRegistry):
+        self.registry = registry
+        self._managers: dict[str, BatchManagerCPM] = {}
+
+    def increase_cpm(self, modes: np.ndarray, **arrays: np.ndarray) -> np.ndarray:
+        modes = np.asarray(modes)
+        arrays = {name: np.asarray(value) for name, value in arrays.items()}
+        result = np.empty(len(modes), dtype=np.result_type(arrays["cpm"], arrays["step"]))
+
+        for mode in np.unique(modes):
+            mask = modes == mode
+            result[mask] = self._get_manager(mode=mode).increase_cpm(
+                **{name: value[mask] for name, value in arrays.items()}
+            )
+        return result
+
+    def _get_manager(self, mode: str) -> BatchManagerCPM:
+        if mode not in self._managers:
+            self._managers[mode] = BatchManagerCPMFabric.create_obj(mode, self.registry)
+        return self._managers[mode]
+
+BatchManagerCPMRegistry.register_obj('default', DefaultBatchManagerCPM)
+BatchManagerCPMRegistry.register_obj('momentum', MomentumBatchManagerCPM)
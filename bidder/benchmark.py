@@ -0,0 +1,331 @@
+'''
+Бенчмарк горячего пути тика биддера без сети. Запуск:
+
+    python -m bidder.benchmark --sizes 1 100 10000 --save-baseline bench_baseline.json
+    python -m bidder.benchmark --compare bench_baseline.json --tolerance 0.2
+'''
+from typing import Awaitable, Callable
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+import tracemalloc
+
+import httpx
+import orjson
+
+from utils.http_client import BaseHttpClient
+from .bidder_2 import DefaultBidder
+from .manager_cpm import ManagerCPMFabric, ManagerCPMRegistry
+from .position_report import PositionReport
+from .rate_limiter import RateLimiter
+from .schemas import BidderData, CPMChangeSchema, CurrentPositionSchema, PeriodTime, OrderBy
+from .settings import RateLimitRule
+from .wildberries_api import DataConverter, WildberriesBidderCPMWorker, WildberriesBidderStatsWorker
+
+
+STATS_BODY = json.dumps({
+    "data": {
+        "groups": [{
+            "items": [{"nmId": 240664574, "avgPosition": {"current": 50, "previous": 52}}]
+        }]
+    }
+}).encode()
+
+def create_report_body(items: int) -> bytes:
+    '''
+    search-report с items карточками и полями, которые биддер не читает -
+    как в реальном ответе WB.
+    '''
+    return json.dumps({
+        "data": {
+            "groups": [{
+                "subjectName": "Джинсы",
+                "brandName": "Brand",
+                "items": [{
+                    "nmId": 240664574 + index,
+                    "name": f"Джинсы мужские {index}",
+                    "vendorCode": f"VC-{index}",
+                    "subjectName": "Джинсы",
+                    "brandName": "Brand",
+                    "mainPhoto": f"https://basket-01.wbbasket.ru/vol{index}/images/big/1.webp",
+                    "isAdvertised": True,
+                    "rating": 4.7,
+                    "feedbackRating": 4.8,
+                    "price": {"minPrice": 1500, "maxPrice": 2300},
+                    "avgPosition": {"current": index % 300 + 1, "previous": index % 300 + 2, "dynamics": -1},
+                    "openCard": {"current": 120, "previous": 100, "dynamics": 20},
+                    "addToCart": {"current": 12, "previous": 10, "dynamics": 20},
+                    "orders": {"current": 3, "previous": 2, "dynamics": 50},
+                    "visibility": {"current": 40, "previous": 35, "dynamics": 14},
+                }]
+            } for index in range(items)]
+        }
+    }).encode()
+
+class StubHttpClient(BaseHttpClient):
+    def __init__(self, stats_body: bytes = STATS_BODY):
+        self.stats_body = stats_body
+
+    async def send_request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        if "search-report" in url:
+            return httpx.Response(200, content=self.stats_body)
+        return httpx.Response(200, content=b"")
+
+class TickBenchmark:
+    '''
+    Замеры по этапам тика (схемы, DataConverter, JSON, HTTP-заглушка,
+    разбор ответа, решение менеджера) и целиком DefaultBidder.start()
+    для N кампаний: тики/сек, время тика, аллокации.
+    '''
+    STAGE_ITERATIONS = 2000
+    MIN_ROUNDS = 3
+    MIN_TIME = 1.0
+
+    def __init__(self, http_client: BaseHttpClient | None = None):
+        self.http_client = http_client or StubHttpClient()
+        self.limiter = RateLimiter(by_path={}, default=RateLimitRule(rate=1e9, burst=10**9))
+        self.stats_worker = self._create_stats_worker(token="benchmark")
+        self.schema = self._create_position_schema()
+        self.cpm_schema = CPMChangeSchema(advertId=1, cpm=150)
+
+    def get_stages(self) -> dict[str, Callable[[], Awaitable]]:
+        return {
+            "schema": self._stage_schema,
+            "get_clear_data": self._stage_get_clear_data,
+            "json_encode": self._stage_json_encode,
+            "http_round_trip": self._stage_http_round_trip,
+            "parse_response": self._stage_parse_response,
+            "parse_report": self._stage_parse_report,
+            "manager_decision": self._stage_manager_decision,
+        }
+
+    async def bench_stages(self, iterations: int = STAGE_ITERATIONS) -> dict:
+        return {
+            name: await self._measure_stage(stage=stage, iterations=iterations)
+            for name, stage in self.get_stages().items()
+        }
+
+    async def bench_ticks(self, campaigns: int) -> dict:
+        bidders = [self._create_bidder(advert_id=advert_id) for advert_id in range(campaigns)]
+
+        durations = []
+        started_at = time.perf_counter()
+        while len(durations) < self.MIN_ROUNDS or time.perf_counter() - started_at < self.MIN_TIME:
+            round_started_at = time.perf_counter()
+            await asyncio.gather(*(bidder.start() for bidder in bidders))
+            durations.append(time.perf_counter() - round_started_at)
+
+        allocations = await self._measure_allocations(bidders=bidders)
+        mean_round = statistics.mean(durations)
+        return {
+            "campaigns": campaigns,
+            "rounds": len(durations),
+            "ticks_per_sec": campaigns / mean_round,
+            "mean_tick_us": mean_round / campaigns * 1e6,
+            "allocated_kib_per_tick": allocations["allocated"] / campaigns / 1024,
+            "peak_kib_per_round": allocations["peak"] / 1024,
+        }
+
+    def bench_report_parsing(self, items: int = 1000, iterations: int = 50) -> dict:
+        '''
+        Разбор search-report на items карточек: response.json() + обход dict,
+        orjson + массивы и частичный разбор PositionReport.from_content.
+        '''
+        body = create_report_body(items=items)
+        return {
+            "items": items,
+            "json": self._measure_parser(parser=self._parse_report_json, body=body, iterations=iterations),
+            "orjson": self._measure_parser(parser=self._parse_report_orjson, body=body, iterations=iterations),
+            "scan": self._measure_parser(parser=PositionReport.from_content, body=body, iterations=iterations),
+        }
+
+    @staticmethod
+    def _parse_report_json(body: bytes) -> dict:
+        stats = httpx.Response(200, content=body).json()
+        return {
+            item['nmId']: item['avgPosition']['current']
+            for group in stats['data']['groups']
+            for item in group['items']
+        }
+
+    @staticmethod
+    def _parse_report_orjson(body: bytes) -> PositionReport:
+        return PositionReport.from_stats(stats=orjson.loads(body))
+
+    @staticmethod
+    def _measure_parser(parser: Callable[[bytes], object], body: bytes, iterations: int) -> dict:
+        timings = []
+        for _ in range(iterations):
+            started_at = time.perf_counter()
+            parser(body)
+            timings.append(time.perf_counter() - started_at)
+
+        tracemalloc.start()
+        try:
+            parser(body)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        return {"mean_ms": statistics.mean(timings) * 1e3, "peak_kib": peak / 1024}
+
+    async def _measure_stage(self, stage: Callable[[], Awaitable], iterations: int) -> dict:
+        timings = []
+        for _ in range(iterations):
+            started_at = time.perf_counter()
+            await stage()
+            timings.append(time.perf_counter() - started_at)
+
+        timings.sort()
+        return {
+            "mean_us": statistics.mean(timings) * 1e6,
+            "p50_us": timings[len(timings) // 2] * 1e6,
+            "p99_us": timings[int(len(timings) * 0.99)] * 1e6,
+        }
+
+    async def _measure_allocations(self, bidders: list) -> dict:
+        tracemalloc.start()
+        try:
+            before = tracemalloc.take_snapshot()
+            await asyncio.gather(*(bidder.start() for bidder in bidders))
+            after = tracemalloc.take_snapshot()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        allocated = sum(max(stat.size_diff, 0) for stat in after.compare_to(before, "filename"))
+        return {"allocated": allocated, "peak": peak}
+
+    async def _stage_schema(self) -> None:
+        self._create_position_schema()
+        CPMChangeSchema(advertId=1, cpm=150)
+
+    async def _stage_get_clear_data(self) -> None:
+        DataConverter.get_clear_data(self.schema)
+
+    async def _stage_json_encode(self) -> None:
+        json.dumps(self.schema.model_dump())
+
+    async def _stage_http_round_trip(self) -> None:
+        await self.http_client.send_request(method="post", url=self.stats_worker.url)
+
+    async def _stage_parse_response(self) -> None:
+        response = httpx.Response(200, content=STATS_BODY)
+        self.stats_worker._get_json_from_response(response=response)
+
+    async def _stage_parse_report(self) -> None:
+        PositionReport.from_content(STATS_BODY)
+
+    async def _stage_manager_decision(self) -> None:
+        ManagerCPMFabric.create_obj(
+            "default", ManagerCPMRegistry,
+            cpm=150,
+            step=2,
+            current_position=50,
+            wish_position=10
+        ).increase_cpm()
+
+    def _create_bidder(self, advert_id: int) -> DefaultBidder:
+        bidder = DefaultBidder(
+            bidder_data=BidderData(
+                advertId=advert_id,
+                max_cpm_campaign=10**9,
+                min_cpm_campaign=150,
+                wish_place_in_top=1
+            ),
+            http_client=self.http_client,
+            token="benchmark",
+            articuls=[240664574]
+        )
+        bidder.stats_handler = self._create_stats_worker(token="benchmark")
+        bidder.cpm_handler = WildberriesBidderCPMWorker(
+            token="benchmark",
+            http_client=self.http_client,
+            limiter=self.limiter,
+            coalesce_window=0
+        )
+        return bidder
+
+    def _create_stats_worker(self, token: str) -> WildberriesBidderStatsWorker:
+        return WildberriesBidderStatsWorker(
+            token=token,
+            http_client=self.http_client,
+            limiter=self.limiter,
+            cache=None
+        )
+
+    @staticmethod
+    def _create_position_schema() -> CurrentPositionSchema:
+        return CurrentPositionSchema(
+            currentPeriod=PeriodTime(start="2025-03-07", end="2025-03-07"),
+            nmIds=[240664574],
+            orderBy=OrderBy()
+        )
+
+async def run_benchmarks(sizes: list[int]) -> dict:
+    benchmark = TickBenchmark()
+    return {
+        "stages": await benchmark.bench_stages(),
+        "ticks": {str(size): await benchmark.bench_ticks(campaigns=size) for size in sizes},
+        "report_parsing": benchmark.bench_report_parsing(),
+    }
+
+def compare_with_baseline(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    regressions = []
+    for name, stage in results["stages"].items():
+        old = baseline.get("stages", {}).get(name)
+        if old and stage["mean_us"] > old["mean_us"] * (1 + tolerance):
+            regressions.append(f"stage {name}: {old['mean_us']:.1f}us -> {stage['mean_us']:.1f}us")
+
+    for size, ticks in results["ticks"].items():
+        old = baseline.get("ticks", {}).get(size)
+        if old and ticks["ticks_per_sec"] < old["ticks_per_sec"] * (1 - tolerance):
+            regressions.append(
+                f"ticks x{size}: {old['ticks_per_sec']:.0f}/s -> {ticks['ticks_per_sec']:.0f}/s"
+            )
+    return regressions
+
+def print_results(results: dict) -> None:
+    for name, stage in results["stages"].items():
+        print(f"{name:<20} mean {stage['mean_us']:>9.1f}us  p50 {stage['p50_us']:>9.1f}us  p99 {stage['p99_us']:>9.1f}us")
+    for size, ticks in results["ticks"].items():
+        print(
+            f"campaigns {size:>6}: {ticks['ticks_per_sec']:>10.0f} ticks/s  "
+            f"{ticks['mean_tick_us']:>8.1f}us/tick  {ticks['allocated_kib_per_tick']:>7.2f}KiB/tick  "
+            f"peak {ticks['peak_kib_per_round']:>9.1f}KiB"
+        )
+    parsing = results.get("report_parsing")
+    if parsing:
+        for name in ("json", "orjson", "scan"):
+            print(
+                f"report x{parsing['items']} {name:<7} {parsing[name]['mean_ms']:>8.2f}ms  "
+                f"peak {parsing[name]['peak_kib']:>9.1f}KiB"
+            )
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Бенчмарк тика биддера")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 100, 10_000])
+    parser.add_argument("--save-baseline")
+    parser.add_argument("--compare")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    results = asyncio.run(run_benchmarks(sizes=args.sizes))
+    print_results(results=results)
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as file:
+            json.dump(results, file, indent=2)
+
+    if args.compare:
+        with open(args.compare) as file:
+            regressions = compare_with_baseline(results=results, baseline=json.load(file), tolerance=args.tolerance)
+        for regression in regressions:
+            print("REGRESSION", regression)
+        if regressions:
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,15 @@
 from abc import ABC, abstractmethod
 from datetime import datetime
 import asyncio
+import logging
 import os
 
 from dotenv import load_dotenv
+import numpy as np
 
 from .schemas import (
     BidderData, CurrentPositionSchema, OrderBy, PeriodTime,
-    ModeBidder, CPMChangeSchema
+    ModeBidder, CPMChangeSchema, BidderStateSchema
 )
 from .manager_cpm import ManagerCPMFabric, ManagerCPMRegistry
 from .calculator_cpm import CalculatorCPMFabric, CalculatorCPMRegisty
@@ -15,9 +17,20 @@ from .wildberries_api import (
     WBApiFabric, WBApiRegistry, 
     WildberriesBidderStatsWorker, WildberriesBidderCPMWorker   
 )
+from .position_aggregator import PositionAggregatorFabric, PositionAggregatorRegistry
+from .position_report import PositionReport
+from .scheduler import BidderScheduler
+from .interval_policy import AdaptiveIntervalPolicy
+from .metrics import MetricsServer, metrics, http_client_collector
+from .stats_aggregator import StatsAggregator, StatsAggregatorPool
+from .state_store import BidderStateStore, SQLAlchemyBidderStateStore
+from .shadow import ShadowEvaluator, ShadowLog
+from .cpm_predictor import CPMPredictor, cpm_predictor
+from .custom_exceptions import WBException
 from .settings import settings
-from utils.http_client import BaseHttpClient, HttpxHttpClient
+from utils.http_client import BaseHttpClient, HttpxHttpClient, get_shared_http_client
 
+logger = logging.getLogger(__name__)
 
 class Bidder(ABC):
 
@@ -25,7 +38,7 @@ class Bidder(ABC):
     @abstractmethod
     async def start(self): ...
 
-class DefaultBidder:
+class DefaultBidder(Bidder):
 
 
     def __init__(
@@ -33,7 +46,10 @@ class DefaultBidder:
         bidder_data: BidderData, 
         http_client: BaseHttpClient,
         token: str,
-        articuls: list
+        articuls: list,
+        stats_aggregator: StatsAggregator | None = None,
+        state_store: BidderStateStore | None = None,
+        shadow: ShadowEvaluator | None = None
     ):  
         self.bidder_data = bidder_data
         self.calculator = CalculatorCPMFabric.create_obj(
@@ -52,36 +68,130 @@ class DefaultBidder:
             http_client=http_client
         )
         self.articuls = articuls
+        self.position_aggregator = PositionAggregatorFabric.create_obj(
+            self.bidder_data.position_aggregation, PositionAggregatorRegistry
+        )
+        self.stats_aggregator = stats_aggregator
+        self.state_store = state_store
+        self.shadow = shadow
+        self.state: BidderStateSchema | None = None
+        self.manager_state: dict = {}
+        self.last_cpm: int | None = None
+        self.last_position: int | None = None
+        self._state_restored = False
 
     async def start(self):
+        await self._restore_state()
         current_position = await self._get_current_position()
-        print("Текущая позиция: ", current_position)
+        self.last_position = current_position
+        logger.info("Текущая позиция: %s", current_position)
         if current_position == self.bidder_data.wish_place_in_top:
-            print("Закончили")
+            logger.info("Закончили")
             return True
         if self.calculator.min_cpm >= self.calculator.max_cpm:
-            print("Закончили, ставка превысила ожидание")
+            logger.info("Закончили, ставка превысила ожидание")
             return True
 
+        shadow_cpm = self._get_base_cpm()
+        current_cpm = self._get_next_cpm(current_position=current_position)
+        if self.shadow is not None and self.shadow.dry_run:
+            self._evaluate_shadow(cpm=shadow_cpm, current_position=current_position, live_cpm=current_cpm)
+            return
+        sent_cpm = await self._change_cpm(current_cpm)
+        self.last_cpm = current_cpm
+        self._evaluate_shadow(cpm=shadow_cpm, current_position=current_position, live_cpm=sent_cpm)
+        self._save_state(cpm=current_cpm, current_position=current_position)
+        logger.info("Изменили ставку до %s", current_cpm)
+
+    def _evaluate_shadow(self, cpm: int, current_position: int, live_cpm: int) -> None:
+        '''
+        cpm - ставка, стоявшая на момент замера позиции (_get_base_cpm).
+        live_cpm - ставка, ушедшая в CPMChangeSchema; в dry_run ничего не
+        отправляется, и пишется ставка, которую отправил бы живой режим.
+        '''
+        if self.shadow is None:
+            return
+        self.shadow.evaluate(
+            bidder_data=self.bidder_data,
+            cpm=cpm,
+            current_position=current_position,
+            live_cpm=live_cpm
+        )
+
+    async def _restore_state(self) -> None:
+        if self._state_restored or self.state_store is None:
+            return
+        self.state = await self.state_store.load(self.bidder_data.advertId)
+        if self.state is not None:
+            self.calculator.min_cpm = self.state.last_cpm
+            self.last_cpm = self.state.last_cpm
+            self.manager_state = dict(self.state.manager_state)
+        self._state_restored = True
+
+    def _save_state(self, cpm: int, current_position: int) -> None:
+        if self.state_store is None:
+            return
+        self.state = BidderStateSchema(
+            advertId=self.bidder_data.advertId,
+            last_cpm=cpm,
+            last_position=current_position,
+            streak=self._get_streak(cpm=cpm),
+            manager_state=dict(self.manager_state)
+        )
+        self.state_store.save(self.state)
+
+    def _get_streak(self, cpm: int) -> int:
+        if self.state is None or cpm == self.state.last_cpm:
+            return 0
+        direction = 1 if cpm > self.state.last_cpm else -1
+        if self.state.streak * direction > 0:
+            return self.state.streak + direction
+        return direction
+
+    def _get_base_cpm(self) -> int:
+        '''
+        Ставка, от которой менеджер считает следующую: последняя
+        отправленная или восстановленная, до первой отправки - стартовая.
+        '''
+        if self.last_cpm is None:
+            return self.calculator.calculate_start_cpm()
+        return self.last_cpm
+
+    def _get_next_cpm(self, current_position: int) -> int:
         manager = self._create_manager_cpm(
             current_position=current_position
         )
-        current_cpm = manager.increase_cpm()
-        await self._change_cpm(current_cpm)
-        print("Изменили ставку до", current_cpm)
+        return self._clamp_cpm(manager.increase_cpm())
+
+    def _get_manager_mode(self) -> ModeBidder:
+        return self.bidder_data.type_work_bidder
 
     def _create_manager_cpm(
         self, current_position
     ):
         return ManagerCPMFabric.create_obj(
-            self.bidder_data.type_work_bidder, ManagerCPMRegistry,
-            cpm=self.calculator.calculate_start_cpm(),
+            self._get_manager_mode(), ManagerCPMRegistry,
+            cpm=self._get_base_cpm(),
             step=self.bidder_data.step,
             current_position=current_position,
-            wish_position=self.bidder_data.wish_place_in_top
+            wish_position=self.bidder_data.wish_place_in_top,
+            min_cpm=self.bidder_data.min_cpm_campaign,
+            max_cpm=self.bidder_data.max_cpm_campaign,
+            state=self.manager_state,
+            gains=self.bidder_data.pid_gains
+        )
+
+    def _clamp_cpm(self, cpm: int) -> int:
+        return min(
+            max(cpm, self.bidder_data.min_cpm_campaign),
+            self.bidder_data.max_cpm_campaign
         )
 
     async def _get_current_position(self):
+        if self.stats_aggregator is not None:
+            positions = await self.stats_aggregator.get_weighted_positions(self.articuls)
+            return self._get_current_position_from_positions(positions)
+
         today = self._get_today_date_with_ymd_format()
         schema = CurrentPositionSchema(
             currentPeriod=PeriodTime(
@@ -91,58 +201,157 @@ class DefaultBidder:
             nmIds=self.articuls,
             orderBy=OrderBy()
         )
-        stats = await self.stats_handler.run(schema)
+        report = await self.stats_handler.run_report(schema)
 
-        return self._get_current_position_from_stats(stats)
+        return self._get_current_position_from_report(report)
 
     @staticmethod
     def _get_today_date_with_ymd_format():
         return datetime.today().strftime("%Y-%m-%d")
 
-    @staticmethod
-    def _get_current_position_from_stats(stats: dict):
-        return stats['data']['groups'][0]['items'][0]['avgPosition']['current']
+    def _get_current_position_from_report(self, report: PositionReport):
+        return self.position_aggregator.aggregate(positions=report.positions, weights=report.weights)
     
-    async def _change_cpm(self, cpm: int):
+    def _get_current_position_from_positions(self, positions: dict[int, tuple[int, float]]):
+        found = [positions[articul] for articul in self.articuls if articul in positions]
+        if not found:
+            raise ValueError(WBException.POSITION_NOT_FOUND)
+        found_positions, weights = np.array(found, dtype=float).T
+        return self.position_aggregator.aggregate(positions=found_positions, weights=weights)
+
+    async def _change_cpm(self, cpm: int) -> int:
         schema = CPMChangeSchema(
             advertId=self.bidder_data.advertId,
             cpm=cpm
         )
         await self.cpm_handler.run(schema)
         self.calculator.min_cpm = cpm
+        return schema.cpm
 
-load_dotenv()
+class NeuroBidder(DefaultBidder):
+    '''
+    Первый тик сразу ставит CPM, предсказанный моделью для wish_place_in_top,
+    дальше от неё докручивает менеджер settings.neuro.fine_tune_mode.
+    Предсказание считается заранее в predict_start_cpm, не в тике.
+    '''
+    FINE_TUNE_MODE = ModeBidder(settings.neuro.fine_tune_mode)
 
-TOKEN = os.getenv("API_TOKEN")
-bidder_data = BidderData(
-    advertId=23636560,
-    max_cpm_campaign=350,
-    min_cpm_campaign=203,
-    wish_place_in_top=32,
-    type_work_bidder=ModeBidder.DEFAULT,
-    step=settings.cpm_var.step_cpm
-)
-http_client = HttpxHttpClient()
-articuls = [240664574]
-
-bidder = DefaultBidder(
-    bidder_data=bidder_data,
-    http_client=http_client,
-    token=TOKEN,
-    articuls=articuls
-)
 
-import time
-for _ in range(10):
+    def __init__(
+        self,
+        bidder_data: BidderData, 
+        http_client: BaseHttpClient,
+        token: str,
+        articuls: list,
+        stats_aggregator: StatsAggregator | None = None,
+        state_store: BidderStateStore | None = None,
+        shadow: ShadowEvaluator | None = None,
+        predicted_cpm: int | None = None
+    ):
+        super().__init__(bidder_data, http_client, token, articuls, stats_aggregator, state_store, shadow)
+        self.predicted_cpm = predicted_cpm
+
+    def _get_next_cpm(self, current_position: int) -> int:
+        if self.predicted_cpm is None:
+            return super()._get_next_cpm(current_position=current_position)
+        cpm, self.predicted_cpm = self.predicted_cpm, None
+        return self._clamp_cpm(cpm)
+
+    def _get_manager_mode(self) -> ModeBidder:
+        return self.FINE_TUNE_MODE
+
+async def predict_start_cpm(bidders: list[Bidder], predictor: CPMPredictor = cpm_predictor) -> None:
+    '''
+    Одно пакетное предсказание на все нейро-кампании в отдельном потоке.
+    Если модель недоступна, кампании просто идут менеджером докрутки.
+    '''
+    bidders = [
+        bidder for bidder in bidders
+        if isinstance(bidder, NeuroBidder) and bidder.bidder_data.product_features is not None
+    ]
+    if not bidders:
+        return
     try:
-        def m():
-            return asyncio.run(bidder.start())
+        predictions = await predictor.apredict(
+            features=[bidder.bidder_data.product_features for bidder in bidders],
+            wish_positions=[bidder.bidder_data.wish_place_in_top for bidder in bidders]
+        )
+    except RuntimeError as e:
+        logger.warning(e)
+        return
+    for bidder, cpm in zip(bidders, predictions):
+        bidder.predicted_cpm = round(float(cpm))
+
+def create_bidder(bidder_data: BidderData, **kwargs) -> DefaultBidder:
+    if bidder_data.type_work_bidder == ModeBidder.NEURO:
+        return NeuroBidder(bidder_data=bidder_data, **kwargs)
+    return DefaultBidder(bidder_data=bidder_data, **kwargs)
+
+async def main(token: str):
+    from app.core.models import database_helper, BidderState
+
+    bidder_data = BidderData(
+        advertId=23636560,
+        max_cpm_campaign=350,
+        min_cpm_campaign=203,
+        wish_place_in_top=32,
+        type_work_bidder=ModeBidder.DEFAULT,
+        step=settings.cpm_var.step_cpm
+    )
+    articuls = [240664574]
+
+    state_store = SQLAlchemyBidderStateStore(
+        session_factory=database_helper.async_session_factory,
+        model=BidderState
+    )
+    async with get_shared_http_client(**settings.http_client.model_dump()) as http_client, state_store:
+        metrics_server = await _start_metrics_server(http_client=http_client)
+        await state_store.preload(advert_ids=[bidder_data.advertId])
+        aggregators = StatsAggregatorPool(http_client=http_client)
+        shadow = _create_shadow_evaluator()
+        bidders = [create_bidder(
+            bidder_data=bidder_data,
+            http_client=http_client,
+            token=token,
+            articuls=articuls,
+            stats_aggregator=aggregators.get(token),
+            state_store=state_store,
+            shadow=shadow
+        )]
+        await predict_start_cpm(bidders=bidders)
+
+        scheduler = BidderScheduler(
+            interval_policy=AdaptiveIntervalPolicy() if settings.adaptive_polling.enabled else None
+        )
+        for bidder in bidders:
+            scheduler.add(bidder)
+        try:
+            await scheduler.run()
+        finally:
+            if metrics_server is not None:
+                await metrics_server.close()
+            if shadow is not None:
+                shadow.log.close()
+
+def _create_shadow_evaluator() -> ShadowEvaluator | None:
+    if not settings.shadow.modes and not settings.shadow.dry_run:
+        return None
+    return ShadowEvaluator(
+        log=ShadowLog(path=settings.shadow.log_path),
+        modes=[ModeBidder(mode) for mode in settings.shadow.modes],
+        dry_run=settings.shadow.dry_run
+    )
 
-        r = m()
-        if r:
-            print("стоп")
-            break
+async def _start_metrics_server(http_client: HttpxHttpClient) -> MetricsServer | None:
+    if not settings.metrics.enabled:
+        return None
+    metrics.add_collector(http_client_collector(http_client=http_client))
+    metrics_server = MetricsServer(registry=metrics)
+    await metrics_server.start()
+    logger.info("Метрики на %s", metrics_server.url)
+    return metrics_server
 
-    except Exception as e:
-        print(e)
-    time.sleep(120)
\ No newline at end of file
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    load_dotenv()
+    asyncio.run(main(token=os.getenv("API_TOKEN")))
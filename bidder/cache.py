@@ -0,0 +1,116 @@
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Hashable
+import asyncio
+import time
+
+from .custom_exceptions import CacheException
+from .schemas import CurrentPositionSchema
+from .settings import settings
+
+
+class TTLCache:
+    '''
+    TTL + LRU кэш ответов. Одновременные запросы одного ключа ждут один
+    запрос в полёте (single-flight), а не идут в API каждый сам. Загрузка
+    идёт в отдельной задаче: отмена одного ждущего (таймаут тика) не
+    отменяет её для остальных.
+    '''
+
+
+    def __init__(self, ttl: float, max_size: int):
+        self.ttl = ttl
+        self.max_size = max_size
+
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._in_flight: dict[Hashable, asyncio.Task] = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.shared = 0
+        self.evictions = 0
+
+    async def get_or_load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        found, value = self._get(key=key)
+        if found:
+            self.hits += 1
+            return value
+
+        if key in self._in_flight:
+            self.shared += 1
+        else:
+            self.misses += 1
+            self._in_flight[key] = self._create_load_task(key=key, loader=loader)
+        return await asyncio.shield(self._in_flight[key])
+
+    @property
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "shared": self.shared,
+            "evictions": self.evictions,
+            "size": len(self._data),
+        }
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def _create_load_task(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> asyncio.Task:
+        task = asyncio.create_task(self._load(key=key, loader=loader))
+        task.add_done_callback(self._retrieve_exception)
+        return task
+
+    async def _load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        try:
+            value = await loader()
+        except asyncio.CancelledError:
+            raise ValueError(CacheException.LOAD_CANCELLED)
+        finally:
+            del self._in_flight[key]
+
+        self._set(key=key, value=value)
+        return value
+
+    @staticmethod
+    def _retrieve_exception(task: asyncio.Task) -> None:
+        if not task.cancelled():
+            task.exception()
+
+    def _get(self, key: Hashable) -> tuple[bool, Any]:
+        if key not in self._data:
+            return False, None
+
+        expires_at, value = self._data[key]
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            return False, None
+
+        self._data.move_to_end(key)
+        return True, value
+
+    def _set(self, key: Hashable, value: Any) -> None:
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+def get_stats_cache_key(token: str, schema: CurrentPositionSchema) -> tuple:
+    return (
+        token,
+        tuple(sorted(schema.nmIds)),
+        schema.currentPeriod.start,
+        schema.currentPeriod.end,
+        (schema.pastPeriod.start, schema.pastPeriod.end) if schema.pastPeriod else None,
+        schema.orderBy.field,
+        schema.orderBy.mode,
+        schema.positionCluster,
+        schema.limit,
+        schema.offset,
+    )
+
+stats_cache = TTLCache(
+    ttl=settings.stats_cache.ttl,
+    max_size=settings.stats_cache.max_size
+) if settings.stats_cache.enabled else None
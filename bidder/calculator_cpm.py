@@ -28,4 +28,8 @@ class CalculatorCPMRegisty(BaseRegistry):
 
 class CalculatorCPMFabric(BaseFabric): ...
 
-CalculatorCPMRegisty.register_obj("default", DefaultCalculatorCPM)
\ No newline at end of file
+CalculatorCPMRegisty.register_obj("default", DefaultCalculatorCPM)
+CalculatorCPMRegisty.register_obj("momentum", DefaultCalculatorCPM)
+CalculatorCPMRegisty.register_obj("bisection", DefaultCalculatorCPM)
+CalculatorCPMRegisty.register_obj("pid", DefaultCalculatorCPM)
+CalculatorCPMRegisty.register_obj("neuro", DefaultCalculatorCPM)
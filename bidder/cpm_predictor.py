@@ -0,0 +1,73 @@
+from abc import ABC, abstractmethod
+import asyncio
+import importlib.util
+import threading
+
+import numpy as np
+
+from .custom_exceptions import NeuroException
+from .schemas import ProductFeaturesSchema
+from .settings import settings
+
+
+class CPMPredictor(ABC):
+
+    @abstractmethod
+    def predict(self, features: list[ProductFeaturesSchema], wish_positions: list[int]) -> np.ndarray: ...
+
+    async def apredict(self, features: list[ProductFeaturesSchema], wish_positions: list[int]) -> np.ndarray:
+        return await asyncio.to_thread(self.predict, features, wish_positions)
+
+class XGBoostCPMPredictor(CPMPredictor):
+    '''
+    Бустер, обученный NeuroAnalytics: CPM карточки по её признакам и месту
+    в выдаче. Признаки идут в порядке NeuroAnalytics._x_concatenate и
+    стандартизуются статистиками обучающей выборки. Модель читается с диска
+    один раз, при первом предсказании.
+    '''
+
+
+    def __init__(
+        self,
+        model_path: str = settings.neuro.model_path,
+        feature_mean: list[float] = settings.neuro.feature_mean,
+        feature_scale: list[float] = settings.neuro.feature_scale
+    ):
+        self.model_path = model_path
+        self.feature_mean = np.asarray(feature_mean)
+        self.feature_scale = np.asarray(feature_scale)
+
+        self._booster = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def is_available() -> bool:
+        return importlib.util.find_spec("xgboost") is not None
+
+    def load(self):
+        with self._lock:
+            if self._booster is None:
+                if not self.is_available():
+                    raise RuntimeError(NeuroException.XGBOOST_NOT_INSTALLED)
+                import xgboost as xgb
+
+                booster = xgb.Booster()
+                booster.load_model(self.model_path)
+                self._booster = booster
+        return self._booster
+
+    def predict(self, features: list[ProductFeaturesSchema], wish_positions: list[int]) -> np.ndarray:
+        booster = self.load()
+        import xgboost as xgb
+
+        x = (self._get_matrix(features=features, wish_positions=wish_positions) - self.feature_mean) / self.feature_scale
+        return booster.predict(xgb.DMatrix(x))
+
+    @staticmethod
+    def _get_matrix(features: list[ProductFeaturesSchema], wish_positions: list[int]) -> np.ndarray:
+        return np.array([
+            [feature.from_value, wish_position, feature.marks, feature.count_marks, feature.fbo]
+            for feature, wish_position in zip(features, wish_positions)
+        ], dtype=float)
+
+cpm_predictor = XGBoostCPMPredictor()
@@ -0,0 +1,250 @@
+'''
+Сбор выдачи WB по многим поисковым запросам через PagePool. Запуск по
+всем запросам из neuro/jeans2.db:
+
+    python -m bidder.crawler --login ... --password ... --pool-size 4 --page-depth 5
+
+Очищенные строки заменяют строки того же запроса в parser_data, откуда
+учится neuro/linealRegression.py.
+'''
+from functools import partial
+from typing import TYPE_CHECKING
+from urllib.parse import quote
+import argparse
+import asyncio
+import logging
+import sqlite3
+
+from .page_pool import PagePool
+from .resource_blocker import ResourceBlocker
+from .schemas import AuthPluginSchema
+from .settings import settings
+
+if TYPE_CHECKING:
+    from playwright.async_api import BrowserContext, Page, Playwright
+
+    from .parser import PlaywrightParser
+
+logger = logging.getLogger(__name__)
+
+
+async def launch_context(
+    playwright: "Playwright",
+    parser: "PlaywrightParser",
+    auth_data: AuthPluginSchema,
+    auth_url: str
+) -> "BrowserContext":
+    '''
+    Persistent context с плагином, авторизованный в плагине.
+    '''
+    from .parser import PluginAuth
+
+    context = await playwright.chromium.launch_persistent_context(**(await parser.get_options()))
+    page = await parser.new_page(browser=context)
+    await parser.goto(page=page, url=auth_url)
+    await PluginAuth(page=page, parser=parser, auth_data=auth_data).auth_in_plugin(goods_wb_url=auth_url)
+    await page.close()
+    return context
+
+def get_search_url(query: str, page: int = 1, search_url: str = settings.parser.search_url) -> str:
+    url = search_url.format(query=quote(query))
+    return url if page == 1 else f"{url}&page={page}"
+
+def load_queries(db_path: str = settings.parser.queries_db) -> list[str]:
+    with sqlite3.connect(db_path) as connection:
+        return [row[0] for row in connection.execute("SELECT DISTINCT query FROM parser_data ORDER BY query")]
+
+def clean_row(row: tuple, query: str, cleaner) -> tuple | None:
+    '''
+    Строка WbParser -> строка parser_data: поля очищает NeuroCleaner, на
+    месте url - текст запроса, как в уже собранных данных. None - поле
+    не очистилось (нет цены, рейтинга).
+    '''
+    try:
+        from_value, price, _, marks, count_marks, fbo, num_of_the_rating = (
+            cleaner.clean(index, value) for index, value in enumerate(row)
+        )
+    except (ValueError, TypeError, IndexError):
+        return None
+    return from_value, price, query, marks, count_marks, fbo, num_of_the_rating
+
+def save_results(results: dict[str, list], db_path: str = settings.parser.queries_db, cleaner=None) -> dict[str, int]:
+    '''
+    Строки запроса заменяются целиком. Если по запросу не очистилось ни
+    одной строки (обход не удался), старые строки остаются.
+    '''
+    if cleaner is None:
+        from neuro.lineal_regression import NeuroCleaner
+        cleaner = NeuroCleaner()
+
+    saved = {}
+    with sqlite3.connect(db_path) as connection:
+        for query, rows in results.items():
+            cleaned = [row for row in (clean_row(row=row, query=query, cleaner=cleaner) for row in rows) if row is not None]
+            if not cleaned:
+                saved[query] = 0
+                continue
+            connection.execute("DELETE FROM parser_data WHERE query = ?", (query,))
+            connection.executemany(
+                "INSERT INTO parser_data (from_value, price, query, marks, count_marks, fbo, num_of_the_rating) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                cleaned
+            )
+            saved[query] = len(cleaned)
+    return saved
+
+class QueryCrawl:
+    '''
+    Страницы 1..page_depth одного запроса открываются напрямую по &page=N,
+    каждая в своей вкладке пула. Первая загрузившаяся страница без
+    карточек сдвигает last_page: более дальние страницы не открываются, а
+    уже собранные отбрасываются. Если карточки есть, а плагин не
+    отрисовался, страница повторяется, как и при ошибке playwright.
+    '''
+
+
+    def __init__(
+        self,
+        pool: PagePool,
+        query: str,
+        page_depth: int = settings.parser.page_depth,
+        retries: int = settings.parser.retries
+    ):
+        self.pool = pool
+        self.query = query
+        self.page_depth = page_depth
+        self.retries = retries
+        self.last_page = page_depth
+
+    async def run(self) -> list:
+        pages = await asyncio.gather(*(self._crawl_page(page=page) for page in range(1, self.page_depth + 1)))
+        return [row for rows in pages[:self.last_page] for row in rows]
+
+    async def _crawl_page(self, page: int) -> list:
+        for attempt in range(self.retries + 1):
+            if page > self.last_page:
+                return []
+            try:
+                async with self.pool.lease() as tab:
+                    rows = await self._get_page_data(tab=tab, page=page)
+            except ValueError as e:
+                logger.warning("Запрос %r, страница %s, попытка %s: %s", self.query, page, attempt + 1, e)
+                continue
+
+            if rows is None:
+                self.last_page = min(self.last_page, page - 1)
+                return []
+            return rows
+        return []
+
+    async def _get_page_data(self, tab: "Page", page: int) -> list | None:
+        if page > self.last_page:
+            return []
+        return await self._read_page(tab=tab, page=page)
+
+    async def _read_page(self, tab: "Page", page: int) -> list | None:
+        '''
+        Ошибка playwright (упала вкладка, таймаут перехода) - ValueError,
+        как и не отрисовавшийся плагин: _crawl_page повторит страницу.
+        '''
+        from playwright.async_api import Error
+
+        from .parser import WbParser
+
+        try:
+            await self.pool.parser.goto(page=tab, url=get_search_url(query=self.query, page=page))
+            rows = await WbParser(page=tab, parser=self.pool.parser).get_page_data(url=get_search_url(query=self.query))
+
+            blocker = self.pool.parser.resource_blocker
+            if blocker is not None:
+                logger.info(
+                    "Запрос %r, страница %s: скачано %s, заблокировано %s",
+                    self.query, page, await blocker.get_traffic(page=tab), blocker.get_blocked(page=tab)
+                )
+        except Error as e:
+            raise ValueError(e.message) from e
+        return rows
+
+async def crawl_queries(
+    pool: PagePool,
+    queries: list[str],
+    page_depth: int = settings.parser.page_depth,
+    retries: int = settings.parser.retries
+) -> dict[str, list]:
+    '''
+    Параллельность ограничена размером пула: задача на каждую страницу
+    каждого запроса, но обходит одновременно не больше pool_size вкладок.
+    '''
+    results = await asyncio.gather(*(
+        QueryCrawl(pool=pool, query=query, page_depth=page_depth, retries=retries).run()
+        for query in queries
+    ))
+    return dict(zip(queries, results))
+
+async def crawl_all(
+    auth_data: AuthPluginSchema,
+    user_data_dir: str,
+    pool_size: int,
+    page_depth: int,
+    block_resources: bool = settings.parser.block_resources,
+    measure_blocking: bool = False
+) -> dict[str, list]:
+    from playwright.async_api import async_playwright
+
+    from .parser import PlaywrightParser
+
+    queries = load_queries()
+    parser = PlaywrightParser(
+        user_data_dir=user_data_dir,
+        path_to_plugin=settings.parser.url_to_plugin,
+        resource_blocker=ResourceBlocker() if block_resources else None
+    )
+    async with async_playwright() as playwright:
+        pool = PagePool(
+            parser=parser,
+            launch_context=partial(
+                launch_context,
+                playwright=playwright,
+                parser=parser,
+                auth_data=auth_data,
+                auth_url=get_search_url(query=queries[0])
+            ),
+            pool_size=pool_size
+        )
+        async with pool:
+            await pool.start()
+            if measure_blocking:
+                savings = await ResourceBlocker().measure_savings(
+                    context=pool.context, url=get_search_url(query=queries[0])
+                )
+                logger.info("Блокировка ресурсов: %s", savings)
+            results = await crawl_queries(pool=pool, queries=queries, page_depth=page_depth)
+            logger.info("Пул: %s", pool.stats)
+    return results
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Сбор выдачи WB по запросам из neuro/jeans2.db")
+    parser.add_argument("--login", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--user-data-dir", default="crawler_profile")
+    parser.add_argument("--pool-size", type=int, default=settings.parser.pool_size)
+    parser.add_argument("--page-depth", type=int, default=settings.parser.page_depth)
+    parser.add_argument("--no-block", action="store_true", help="не блокировать картинки, шрифты и счётчики")
+    parser.add_argument("--measure-blocking", action="store_true", help="сравнить загрузку страницы с блокировкой и без")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    results = asyncio.run(crawl_all(
+        auth_data=AuthPluginSchema(login=args.login, password=args.password),
+        user_data_dir=args.user_data_dir,
+        pool_size=args.pool_size,
+        page_depth=args.page_depth,
+        block_resources=not args.no_block,
+        measure_blocking=args.measure_blocking
+    ))
+    saved = save_results(results=results)
+    for query, rows in results.items():
+        print(query, len(rows), saved[query])
+
+if __name__ == "__main__":
+    main()
@@ -8,4 +8,13 @@ class CPMException(Enum):
     NOT_REGISTER_FABRIC = "This fabric %s not registry"
 
 class WBException(Enum):
-    INVALID_REQUEST = "Invalid request, cannot get/change data"
\ No newline at end of file
+    INVALID_REQUEST = "Invalid request, cannot get/change data"
+    TOO_MANY_REQUESTS = "Too many requests, rate limit for this token is reached"
+    POSITION_NOT_FOUND = "Position for campaign articuls not found in search report"
+
+class CacheException(Enum):
+    LOAD_CANCELLED = "Shared load was cancelled before it returned a result"
+
+class NeuroException(Enum):
+    XGBOOST_NOT_INSTALLED = "xgboost is not installed, neuro bidder cannot predict CPM"
+    FEATURES_MISSING = "Product features are required to predict CPM"
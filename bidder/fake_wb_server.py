@@ -0,0 +1,233 @@
+'''
+Локальная заглушка advert-api и seller-analytics-api для нагрузочных тестов
+биддера без сети. Запуск:
+
+    python -m bidder.fake_wb_server --port 8080 --latency 0.05 --error-rate 0.01
+
+и направить воркеры на неё через окружение:
+
+    WB_API__CPM_URL=http://127.0.0.1:8080/adv/v0/cpm
+    WB_API__STATS_URL=http://127.0.0.1:8080/api/v2/search-report/report
+'''
+from http import HTTPStatus
+import argparse
+import asyncio
+import json
+import math
+import random
+
+from pydantic import BaseModel
+
+from .rate_limiter import TokenBucket
+from .settings import settings
+
+
+class FakeWBConfig(BaseModel):
+    host: str = "127.0.0.1"
+    port: int = 0
+    latency: float = 0.0
+    latency_jitter: float = 0.0
+    error_rate: float = 0.0
+    rate: float | None = None
+    burst: int = 1
+    retry_after: float = 1.0
+    worst_position: int = settings.backtest.worst_position
+    floor_cpm: float = 150.0
+    sensitivity: float = 0.03
+    noise: float = 0.0
+    nm_to_advert: dict[int, int] = {}
+    seed: int | None = None
+
+class FakeAuction:
+    '''
+    Позиция nmId как функция текущей ставки его кампании - та же формула,
+    что у SyntheticAuctionModel в бэктесте.
+    '''
+
+
+    def __init__(self, config: FakeWBConfig):
+        self.config = config
+        self.cpm_by_advert: dict[int, int] = {}
+        self.previous_position: dict[int, int] = {}
+        self._rng = random.Random(config.seed)
+
+    def set_cpm(self, advert_id: int, cpm: int) -> None:
+        self.cpm_by_advert[advert_id] = cpm
+
+    def get_position(self, nm_id: int) -> int:
+        advert_id = self.config.nm_to_advert.get(nm_id, nm_id)
+        cpm = self.cpm_by_advert.get(advert_id, 0)
+        raw = 1 + (self.config.worst_position - 1) * math.exp(
+            -self.config.sensitivity * (cpm - self.config.floor_cpm)
+        )
+        raw += self._rng.gauss(0, self.config.noise) if self.config.noise else 0
+        return int(min(max(round(raw), 1), self.config.worst_position))
+
+    def get_report(self, nm_ids: list, limit: int, offset: int) -> dict:
+        groups = [self._get_group(nm_id=nm_id) for nm_id in nm_ids[offset:offset + limit]]
+        return {"data": {"groups": groups}}
+
+    def _get_group(self, nm_id: int) -> dict:
+        current = self.get_position(nm_id=nm_id)
+        previous = self.previous_position.get(nm_id, current)
+        self.previous_position[nm_id] = current
+        return {
+            "items": [{
+                "nmId": nm_id,
+                "avgPosition": {"current": current, "previous": previous},
+            }]
+        }
+
+class FakeWBServer:
+    CPM_PATH = "/adv/v0/cpm"
+    STATS_PATH = "/api/v2/search-report/report"
+
+    def __init__(self, config: FakeWBConfig = FakeWBConfig()):
+        self.config = config
+        self.auction = FakeAuction(config=config)
+        self.stats = {"requests": 0, "errors": 0, "too_many_requests": 0}
+
+        self._server: asyncio.Server | None = None
+        self._buckets: dict[tuple[str, str], TokenBucket] = {}
+        self._rng = random.Random(config.seed)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.sockets[0].getsockname()[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def cpm_url(self) -> str:
+        return self.base_url + self.CPM_PATH
+
+    @property
+    def stats_url(self) -> str:
+        return self.base_url + self.STATS_PATH
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(
+            self._handle_connection, host=self.config.host, port=self.config.port
+        )
+
+    async def close(self) -> None:
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def serve_forever(self) -> None:
+        await self.start()
+        print("Fake WB API на", self.base_url)
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.close()
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                request = await self._read_request(reader=reader)
+                if request is None:
+                    break
+                status, headers, body = await self._handle_request(*request)
+                self._write_response(writer=writer, status=status, headers=headers, body=body)
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            ...
+        finally:
+            writer.close()
+
+    async def _read_request(self, reader: asyncio.StreamReader) -> tuple | None:
+        request_line = await reader.readline()
+        if not request_line:
+            return None
+        method, path, _ = request_line.decode("latin-1").split(" ", 2)
+
+        headers = {}
+        while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+            name, value = line.decode("latin-1").split(":", 1)
+            headers[name.strip().lower()] = value.strip()
+
+        body = await reader.readexactly(int(headers.get("content-length", 0)))
+        return method, path.split("?", 1)[0], headers, body
+
+    async def _handle_request(self, method: str, path: str, headers: dict, body: bytes) -> tuple:
+        self.stats["requests"] += 1
+        await self._wait_latency()
+
+        if method != "POST" or path not in (self.CPM_PATH, self.STATS_PATH):
+            return HTTPStatus.NOT_FOUND, {}, b""
+        if not self._acquire(token=headers.get("authorization", ""), path=path):
+            self.stats["too_many_requests"] += 1
+            return HTTPStatus.TOO_MANY_REQUESTS, {"X-Ratelimit-Retry": str(self.config.retry_after)}, b""
+        if self._rng.random() < self.config.error_rate:
+            self.stats["errors"] += 1
+            return HTTPStatus.INTERNAL_SERVER_ERROR, {}, b""
+
+        try:
+            data = self._parse_body(path=path, body=body)
+        except (ValueError, KeyError, TypeError):
+            return HTTPStatus.BAD_REQUEST, {}, b""
+
+        if path == self.CPM_PATH:
+            self.auction.set_cpm(advert_id=data["advertId"], cpm=data["cpm"])
+            return HTTPStatus.OK, {}, b""
+
+        report = self.auction.get_report(
+            nm_ids=data.get("nmIds", []),
+            limit=data.get("limit", 100),
+            offset=data.get("offset", 0)
+        )
+        return HTTPStatus.OK, {"Content-Type": "application/json"}, json.dumps(report).encode()
+
+    def _parse_body(self, path: str, body: bytes) -> dict:
+        '''
+        Битый JSON или POST cpm без advertId/cpm - 400, как отвечает WB.
+        '''
+        data = json.loads(body or b"{}")
+        if not isinstance(data, dict):
+            raise TypeError(data)
+        if path == self.CPM_PATH:
+            data["advertId"], data["cpm"] = int(data["advertId"]), int(data["cpm"])
+        return data
+
+    async def _wait_latency(self) -> None:
+        if not self.config.latency:
+            return
+        jitter = self._rng.lognormvariate(0, self.config.latency_jitter) if self.config.latency_jitter else 1
+        await asyncio.sleep(self.config.latency * jitter)
+
+    def _acquire(self, token: str, path: str) -> bool:
+        if self.config.rate is None:
+            return True
+        key = (token, path)
+        if key not in self._buckets:
+            self._buckets[key] = TokenBucket(rate=self.config.rate, burst=self.config.burst)
+        return self._buckets[key].try_acquire()
+
+    @staticmethod
+    def _write_response(writer: asyncio.StreamWriter, status: HTTPStatus, headers: dict, body: bytes) -> None:
+        head = [f"HTTP/1.1 {status.value} {status.phrase}", f"Content-Length: {len(body)}"]
+        head += [f"{name}: {value}" for name, value in headers.items()]
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Fake WB API для нагрузочных тестов биддера")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--latency-jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate", type=float, default=None)
+    parser.add_argument("--burst", type=int, default=1)
+    parser.add_argument("--noise", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    asyncio.run(FakeWBServer(config=FakeWBConfig(**vars(args))).serve_forever())
+
+if __name__ == "__main__":
+    main()
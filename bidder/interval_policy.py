@@ -0,0 +1,127 @@
+from abc import ABC, abstractmethod
+from datetime import datetime
+
+from .settings import settings
+
+
+class IntervalPolicy(ABC):
+
+    @abstractmethod
+    def next_interval(self, bidder) -> float: ...
+
+    def forget(self, bidder) -> None:
+        ...
+
+class FixedIntervalPolicy(IntervalPolicy):
+    def __init__(self, interval: float = settings.scheduler.tick_interval):
+        self.interval = interval
+
+    def next_interval(self, bidder) -> float:
+        return self.interval
+
+class AdaptiveIntervalPolicy(IntervalPolicy):
+    '''
+    Интервал до следующего тика кампании по её last_position:
+    - далеко от wish_place_in_top или позиция скачет (EWMA |dp|) - интервал
+      сжимается от base_interval к min_interval;
+    - кампания стоит у цели - интервал растёт в backoff_factor раз за тик
+      до max_interval;
+    - до campaign_end остаётся хотя бы min_ticks_before_end тиков, после
+      campaign_end кампания опрашивается раз в max_interval.
+    Общий поток requests_per_tick / interval по всем кампаниям держится в
+    request_budget (запросов в секунду): кампании, которым не хватает
+    бюджета, получают интервал не меньше равной доли.
+    '''
+
+
+    def __init__(
+        self,
+        base_interval: float = settings.scheduler.tick_interval,
+        min_interval: float = settings.adaptive_polling.min_interval,
+        max_interval: float = settings.adaptive_polling.max_interval,
+        backoff_factor: float = settings.adaptive_polling.backoff_factor,
+        stable_distance: int = settings.adaptive_polling.stable_distance,
+        stable_volatility: float = settings.adaptive_polling.stable_volatility,
+        volatility_alpha: float = settings.adaptive_polling.volatility_alpha,
+        distance_scale: float = settings.adaptive_polling.distance_scale,
+        volatility_scale: float = settings.adaptive_polling.volatility_scale,
+        min_ticks_before_end: int = settings.adaptive_polling.min_ticks_before_end,
+        request_budget: float | None = settings.adaptive_polling.request_budget,
+        requests_per_tick: float = settings.adaptive_polling.requests_per_tick
+    ):
+        self.base_interval = base_interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff_factor = backoff_factor
+        self.stable_distance = stable_distance
+        self.stable_volatility = stable_volatility
+        self.volatility_alpha = volatility_alpha
+        self.distance_scale = distance_scale
+        self.volatility_scale = volatility_scale
+        self.min_ticks_before_end = min_ticks_before_end
+        self.request_budget = request_budget
+        self.requests_per_tick = requests_per_tick
+
+        self._states: dict[int, dict] = {}
+        self._request_rate = 0.0
+
+    def next_interval(self, bidder) -> float:
+        state = self._states.setdefault(id(bidder), {"interval": self.base_interval, "rate": 0.0, "volatility": 0.0})
+        position = getattr(bidder, "last_position", None)
+        bidder_data = getattr(bidder, "bidder_data", None)
+
+        if position is None or bidder_data is None:
+            interval = self.base_interval
+        else:
+            self._update_volatility(state=state, position=position)
+            interval = self._get_interval(
+                state=state,
+                distance=abs(position - bidder_data.wish_place_in_top)
+            )
+            interval = self._limit_by_campaign_end(
+                interval=interval,
+                campaign_end=getattr(bidder_data, "campaign_end", None)
+            )
+        return self._apply_budget(state=state, interval=interval)
+
+    def forget(self, bidder) -> None:
+        state = self._states.pop(id(bidder), None)
+        if state is not None:
+            self._request_rate -= state["rate"]
+
+    @property
+    def request_rate(self) -> float:
+        return self._request_rate
+
+    def _update_volatility(self, state: dict, position: int) -> None:
+        previous = state.get("position")
+        if previous is not None:
+            state["volatility"] += self.volatility_alpha * (abs(position - previous) - state["volatility"])
+        state["position"] = position
+
+    def _get_interval(self, state: dict, distance: int) -> float:
+        if distance <= self.stable_distance and state["volatility"] <= self.stable_volatility:
+            return min(max(state["interval"], self.base_interval) * self.backoff_factor, self.max_interval)
+
+        urgency = 1 + distance / self.distance_scale + state["volatility"] / self.volatility_scale
+        return max(self.base_interval / urgency, self.min_interval)
+
+    def _limit_by_campaign_end(self, interval: float, campaign_end: datetime | None) -> float:
+        if campaign_end is None:
+            return interval
+        remaining = (campaign_end - datetime.now(campaign_end.tzinfo)).total_seconds()
+        if remaining <= 0:
+            return self.max_interval
+        return max(min(interval, remaining / self.min_ticks_before_end), self.min_interval)
+
+    def _apply_budget(self, state: dict, interval: float) -> float:
+        self._request_rate -= state["rate"]
+        if self.request_budget:
+            rate = self.requests_per_tick / interval
+            available = self.request_budget - self._request_rate
+            if rate > available:
+                interval = self.requests_per_tick / max(available, self.request_budget / max(len(self._states), 1))
+        state["interval"] = interval
+        state["rate"] = self.requests_per_tick / interval
+        self._request_rate += state["rate"]
+        return interval
@@ -1,6 +1,7 @@
 from abc import ABC, abstractmethod
 import os
 
+from .schemas import PIDGains
 from .settings import *
 from .utils import BaseRegistry, BaseFabric
 
@@ -19,12 +20,20 @@ class BaseManagerCPM(ManagerCPM):
         cpm: int, 
         step: int,
         current_position: int,
-        wish_position: int
+        wish_position: int,
+        min_cpm: int | None = None,
+        max_cpm: int | None = None,
+        state: dict | None = None,
+        gains: PIDGains | None = None
     ):
         self.cpm = cpm
         self.step = step
         self.current_position = current_position
         self.wish_position = wish_position
+        self.min_cpm = min_cpm
+        self.max_cpm = max_cpm
+        self.state = state if state is not None else {}
+        self.gains = gains if gains is not None else PIDGains()
 
     def _get_positive_or_negative_step_increase_of_position_dif(self, step):
         return -step if self.wish_position > self.current_position else step
@@ -37,9 +46,13 @@ class DefaultManagerCPM(BaseManagerCPM):
         cpm: int, 
         step: int,
         current_position: int,
-        wish_position: int
+        wish_position: int,
+        min_cpm: int | None = None,
+        max_cpm: int | None = None,
+        state: dict | None = None,
+        gains: PIDGains | None = None
     ):
-        super().__init__(cpm, step, current_position, wish_position)
+        super().__init__(cpm, step, current_position, wish_position, min_cpm, max_cpm, state, gains)
 
     def increase_cpm(self):
         return self.cpm + self._get_positive_or_negative_step_increase_of_position_dif(self.step)
@@ -53,9 +66,13 @@ class MomentumManagerCPM(BaseManagerCPM):
         cpm: int, 
         step: int,
         current_position: int,
-        wish_position: int
+        wish_position: int,
+        min_cpm: int | None = None,
+        max_cpm: int | None = None,
+        state: dict | None = None,
+        gains: PIDGains | None = None
     ):
-        super().__init__(cpm, step, current_position, wish_position)
+        super().__init__(cpm, step, current_position, wish_position, min_cpm, max_cpm, state, gains)
 
 
     def increase_cpm(self):
@@ -67,10 +84,122 @@ class MomentumManagerCPM(BaseManagerCPM):
     def _check_dif_between_positions(self):
         return abs(self.wish_position - self.current_position) < self.DEFAULT_DIF_PLACES
 
+class BisectionManagerCPM(BaseManagerCPM):
+    '''
+    Держит в state вилку [lo, hi]: lo - ставка, с которой позиция хуже
+    желаемой, hi - ставка, с которой позиция не хуже. Следующая ставка -
+    середина вилки, сходимость за O(log(max - min)) тиков. Если аукцион
+    уехал и ставка вышла за вилку, вилка расширяется до min/max кампании.
+    '''
+    
+
+    def __init__(
+        self, 
+        cpm: int, 
+        step: int,
+        current_position: int,
+        wish_position: int,
+        min_cpm: int | None = None,
+        max_cpm: int | None = None,
+        state: dict | None = None,
+        gains: PIDGains | None = None
+    ):
+        super().__init__(cpm, step, current_position, wish_position, min_cpm, max_cpm, state, gains)
+        self.min_cpm = self.min_cpm if self.min_cpm is not None else settings.cpm_var.min_cpm
+        self.max_cpm = self.max_cpm if self.max_cpm is not None else self.cpm
+
+    def increase_cpm(self):
+        cpm = self.state.get("last_cpm", self.cpm)
+        lo, hi = self._update_bracket(cpm=cpm)
+
+        next_cpm = self._ensure_move(cpm=cpm, next_cpm=(lo + hi) // 2)
+        self.state.update(lo=lo, hi=hi, last_cpm=next_cpm)
+        return next_cpm
+
+    def _update_bracket(self, cpm: int) -> tuple[int, int]:
+        lo = self.state.get("lo", self.min_cpm)
+        hi = self.state.get("hi", self.max_cpm)
+
+        if self._is_position_worse():
+            lo = max(lo, cpm)
+            if lo >= hi:
+                hi = self.max_cpm
+        else:
+            hi = min(hi, cpm)
+            if hi <= lo:
+                lo = self.min_cpm
+        return lo, hi
+
+    def _ensure_move(self, cpm: int, next_cpm: int) -> int:
+        if abs(next_cpm - cpm) >= self.step:
+            return next_cpm
+        next_cpm = cpm + self._get_positive_or_negative_step_increase_of_position_dif(self.step)
+        return min(max(next_cpm, self.min_cpm), self.max_cpm)
+
+    def _is_position_worse(self) -> bool:
+        return self.current_position > self.wish_position
+
+class PIDManagerCPM(BaseManagerCPM):
+    '''
+    ПИД-регулятор по ошибке позиции (current - wish, в местах). В state
+    хранятся опорная ставка, интеграл и прошлая ошибка. Anti-windup:
+    когда ставка упирается в min/max кампании, интеграл урезается ровно
+    до границы и дальше в ту же сторону не копится.
+    '''
+    
+
+    def __init__(
+        self, 
+        cpm: int, 
+        step: int,
+        current_position: int,
+        wish_position: int,
+        min_cpm: int | None = None,
+        max_cpm: int | None = None,
+        state: dict | None = None,
+        gains: PIDGains | None = None
+    ):
+        super().__init__(cpm, step, current_position, wish_position, min_cpm, max_cpm, state, gains)
+        self.min_cpm = self.min_cpm if self.min_cpm is not None else settings.cpm_var.min_cpm
+        self.max_cpm = self.max_cpm if self.max_cpm is not None else float("inf")
+
+    def increase_cpm(self):
+        bias = self.state.setdefault("bias", self.cpm)
+        last_cpm = self.state.get("last_cpm", self.cpm)
+        error = self.current_position - self.wish_position
+        derivative = error - self.state.get("error", error)
+
+        integral = self.state.get("integral", 0) + error
+        output = self._get_output(bias=bias, error=error, integral=integral, derivative=derivative)
+        if self._is_windup(output=output, error=error) and self.gains.ki:
+            limit = self.max_cpm if error > 0 else self.min_cpm
+            integral += (limit - output) / self.gains.ki
+            output = limit
+
+        next_cpm = self._ensure_move(cpm=last_cpm, next_cpm=round(self._clamp(output)))
+        self.state.update(integral=integral, error=error, last_cpm=next_cpm)
+        return next_cpm
+
+    def _get_output(self, bias: int, error: int, integral: float, derivative: int) -> float:
+        return bias + self.gains.kp * error + self.gains.ki * integral + self.gains.kd * derivative
+
+    def _is_windup(self, output: float, error: int) -> bool:
+        return (output > self.max_cpm and error > 0) or (output < self.min_cpm and error < 0)
+
+    def _ensure_move(self, cpm: int, next_cpm: int) -> int:
+        if next_cpm != cpm:
+            return next_cpm
+        return round(self._clamp(cpm + self._get_positive_or_negative_step_increase_of_position_dif(self.step)))
+
+    def _clamp(self, cpm: float) -> float:
+        return min(max(cpm, self.min_cpm), self.max_cpm)
+
 class ManagerCPMRegistry(BaseRegistry): 
     _registry = {}
 
 class ManagerCPMFabric(BaseFabric): ...
 
 ManagerCPMRegistry.register_obj('default', DefaultManagerCPM)
-ManagerCPMRegistry.register_obj('momentum', MomentumManagerCPM)
\ No newline at end of file
+ManagerCPMRegistry.register_obj('momentum', MomentumManagerCPM)
+ManagerCPMRegistry.register_obj('bisection', BisectionManagerCPM)
+ManagerCPMRegistry.register_obj('pid', PIDManagerCPM)
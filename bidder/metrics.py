@@ -0,0 +1,243 @@
+'''
+Метрики биддера в текстовом формате Prometheus без внешних зависимостей.
+Когда settings.metrics.enabled = False, metrics - NullMetricsRegistry и
+все inc/observe/set - пустые вызовы.
+'''
+from abc import ABC, abstractmethod
+from typing import Callable, Iterable
+import asyncio
+import bisect
+
+from .settings import settings
+
+
+def format_sample(name: str, labels: dict, value: float) -> str:
+    if not labels:
+        return f"{name} {value}"
+    label_text = ",".join(f'{key}="{_escape(str(label))}"' for key, label in labels.items())
+    return f"{name}{{{label_text}}} {value}"
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+class Metric(ABC):
+    TYPE: str
+
+    def __init__(self, name: str, description: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.description = description
+        self.labelnames = labelnames
+
+    def render(self) -> list[str]:
+        return [
+            f"# HELP {self.name} {self.description}",
+            f"# TYPE {self.name} {self.TYPE}",
+            *self._samples(),
+        ]
+
+    def _get_key(self, labels: dict) -> tuple:
+        return tuple(labels.get(name, "") for name in self.labelnames)
+
+    def _get_labels(self, key: tuple) -> dict:
+        return dict(zip(self.labelnames, key))
+
+    @abstractmethod
+    def _samples(self) -> Iterable[str]: ...
+
+class Counter(Metric):
+    TYPE = "counter"
+
+    def __init__(self, name: str, description: str, labelnames: tuple[str, ...] = ()):
+        super().__init__(name, description, labelnames)
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, value: float = 1, **labels) -> None:
+        key = self._get_key(labels)
+        self._values[key] = self._values.get(key, 0) + value
+
+    def get(self, **labels) -> float:
+        return self._values.get(self._get_key(labels), 0)
+
+    def _samples(self) -> Iterable[str]:
+        for key, value in self._values.items():
+            yield format_sample(self.name, self._get_labels(key), value)
+
+class Gauge(Metric):
+    TYPE = "gauge"
+
+    def __init__(self, name: str, description: str, labelnames: tuple[str, ...] = ()):
+        super().__init__(name, description, labelnames)
+        self._values: dict[tuple, float] = {}
+
+    def set(self, value: float, **labels) -> None:
+        self._values[self._get_key(labels)] = value
+
+    def _samples(self) -> Iterable[str]:
+        for key, value in self._values.items():
+            yield format_sample(self.name, self._get_labels(key), value)
+
+class Histogram(Metric):
+    TYPE = "histogram"
+    BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = BUCKETS
+    ):
+        super().__init__(name, description, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._counts: dict[tuple, list[int]] = {}
+        self._sums: dict[tuple, float] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._get_key(labels)
+        if key not in self._counts:
+            self._counts[key] = [0] * (len(self.buckets) + 1)
+            self._sums[key] = 0.0
+        self._counts[key][bisect.bisect_left(self.buckets, value)] += 1
+        self._sums[key] += value
+
+    def get_count(self, **labels) -> int:
+        return sum(self._counts.get(self._get_key(labels), []))
+
+    def _samples(self) -> Iterable[str]:
+        for key, counts in self._counts.items():
+            labels = self._get_labels(key)
+            cumulative = 0
+            for bound, count in zip((*self.buckets, "+Inf"), counts):
+                cumulative += count
+                yield format_sample(f"{self.name}_bucket", {**labels, "le": bound}, cumulative)
+            yield format_sample(f"{self.name}_sum", labels, self._sums[key])
+            yield format_sample(f"{self.name}_count", labels, cumulative)
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: dict[str, Metric] = {}
+        self._collectors: list[Callable[[], Iterable[str]]] = []
+
+    def counter(self, name: str, description: str, labelnames: tuple[str, ...] = ()) -> Counter:
+        return self._register(Counter, name, description, labelnames)
+
+    def gauge(self, name: str, description: str, labelnames: tuple[str, ...] = ()) -> Gauge:
+        return self._register(Gauge, name, description, labelnames)
+
+    def histogram(self, name: str, description: str, labelnames: tuple[str, ...] = (), **kwargs) -> Histogram:
+        return self._register(Histogram, name, description, labelnames, **kwargs)
+
+    def add_collector(self, collector: Callable[[], Iterable[str]]) -> None:
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        lines = [line for metric in self._metrics.values() for line in metric.render()]
+        for collector in self._collectors:
+            lines.extend(collector())
+        return "\n".join(lines) + "\n"
+
+    def _register(self, metric_class: type[Metric], name: str, *args, **kwargs) -> Metric:
+        if name not in self._metrics:
+            self._metrics[name] = metric_class(name, *args, **kwargs)
+        return self._metrics[name]
+
+class NullMetric:
+    def inc(self, value: float = 1, **labels) -> None: ...
+
+    def set(self, value: float, **labels) -> None: ...
+
+    def observe(self, value: float, **labels) -> None: ...
+
+class NullMetricsRegistry:
+    NULL_METRIC = NullMetric()
+
+    def counter(self, *args, **kwargs) -> NullMetric:
+        return self.NULL_METRIC
+
+    def gauge(self, *args, **kwargs) -> NullMetric:
+        return self.NULL_METRIC
+
+    def histogram(self, *args, **kwargs) -> NullMetric:
+        return self.NULL_METRIC
+
+    def add_collector(self, collector: Callable[[], Iterable[str]]) -> None: ...
+
+    def render(self) -> str:
+        return ""
+
+def http_client_collector(http_client) -> Callable[[], Iterable[str]]:
+    '''
+    Счётчики ретраев и состояние circuit breaker из HttpxHttpClient.metrics.
+    '''
+    def collect() -> Iterable[str]:
+        for host, host_metrics in http_client.metrics.items():
+            labels = {"host": host}
+            for name in ("requests", "retries", "failures", "rejected"):
+                yield format_sample(f"http_client_{name}_total", labels, host_metrics.get(name, 0))
+            yield format_sample("http_client_circuit_opened_total", labels, host_metrics["circuit_opened"])
+            yield format_sample("http_client_circuit_open", labels, int(host_metrics["circuit_state"] != "closed"))
+    return collect
+
+class MetricsServer:
+    '''
+    GET /metrics на host:port, один ответ на соединение.
+    '''
+    PATH = "/metrics"
+    CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+    def __init__(
+        self,
+        registry: MetricsRegistry | NullMetricsRegistry,
+        host: str = settings.metrics.host,
+        port: int = settings.metrics.port
+    ):
+        self.registry = registry
+        self.host = host
+        self.port = port
+        self._server: asyncio.Server | None = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.sockets[0].getsockname()[:2]
+        return f"http://{host}:{port}{self.PATH}"
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(self._handle_connection, host=self.host, port=self.port)
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.close()
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            request_line = await reader.readline()
+            while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                ...
+            parts = request_line.decode("latin-1").split(" ")
+            if len(parts) >= 2 and parts[0] == "GET" and parts[1].split("?", 1)[0] == self.PATH:
+                self._write_response(writer=writer, status="200 OK", body=self.registry.render().encode())
+            else:
+                self._write_response(writer=writer, status="404 Not Found", body=b"")
+            await writer.drain()
+        except ConnectionError:
+            ...
+        finally:
+            writer.close()
+
+    def _write_response(self, writer: asyncio.StreamWriter, status: str, body: bytes) -> None:
+        head = (
+            f"HTTP/1.1 {status}\r\nContent-Type: {self.CONTENT_TYPE}\r\n"
+            f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n"
+        )
+        writer.write(head.encode("latin-1") + body)
+
+metrics = MetricsRegistry() if settings.metrics.enabled else NullMetricsRegistry()
@@ -0,0 +1,137 @@
+from contextlib import asynccontextmanager
+from typing import Awaitable, Callable
+import asyncio
+import logging
+
+from .settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+class PagePool:
+    '''
+    Один браузерный context (профиль с плагином, авторизация один раз) и
+    pool_size вкладок в очереди. Задача берёт вкладку через lease() и
+    возвращает её; вкладка пересоздаётся после max_page_uses обходов или
+    если обход упал, context - если закрылся сам браузер. launch_context
+    поднимает и авторизует context, parser открывает в нём вкладки.
+    '''
+
+
+    def __init__(
+        self,
+        parser,
+        launch_context: Callable[[], Awaitable],
+        pool_size: int = settings.parser.pool_size,
+        max_page_uses: int = settings.parser.max_page_uses
+    ):
+        self.parser = parser
+        self.launch_context = launch_context
+        self.pool_size = pool_size
+        self.max_page_uses = max_page_uses
+
+        self.stats = {"leases": 0, "recycled": 0, "restarts": 0}
+
+        self._context = None
+        self._pages: asyncio.Queue = asyncio.Queue()
+        self._uses: dict = {}
+        self._restart_lock = asyncio.Lock()
+        self._generation = 0
+
+    @property
+    def context(self):
+        return self._context
+
+    @property
+    def size(self) -> int:
+        return self._pages.qsize()
+
+    async def start(self) -> None:
+        await self._launch()
+        for _ in range(self.pool_size):
+            self._pages.put_nowait(await self._new_page())
+
+    async def close(self) -> None:
+        if self._context is not None:
+            await self.parser.close_browser(browser=self._context)
+            self._context = None
+
+    @asynccontextmanager
+    async def lease(self):
+        '''
+        В очереди всегда pool_size мест: если вкладку не удалось
+        пересоздать, вместо неё кладётся None, и она открывается заново при
+        следующей выдаче.
+        '''
+        page = await self._pages.get()
+        if page is None:
+            try:
+                page = await self._open_page()
+            except BaseException:
+                self._pages.put_nowait(None)
+                raise
+
+        self.stats["leases"] += 1
+        broken = False
+        try:
+            yield page
+        except BaseException:
+            broken = True
+            raise
+        finally:
+            await self._release(page=page, broken=broken)
+
+    async def _release(self, page, broken: bool) -> None:
+        self._uses[page] = self._uses.get(page, 0) + 1
+        if not (broken or page.is_closed() or self._uses[page] >= self.max_page_uses):
+            self._pages.put_nowait(page)
+            return
+
+        replacement = None
+        try:
+            replacement = await self._recycle(page=page)
+        except Exception as e:
+            logger.warning("Вкладку пула не удалось пересоздать: %s", e)
+        finally:
+            self._pages.put_nowait(replacement)
+
+    async def _launch(self) -> None:
+        self._generation += 1
+        self._context = await self.launch_context()
+
+    async def _new_page(self):
+        page = await self.parser.new_page(browser=self._context)
+        self._uses[page] = 0
+        return page
+
+    async def _recycle(self, page):
+        self.stats["recycled"] += 1
+        self._uses.pop(page, None)
+        try:
+            await page.close()
+        except Exception:
+            ...
+        return await self._open_page()
+
+    async def _open_page(self):
+        generation = self._generation
+        try:
+            return await self._new_page()
+        except Exception:
+            await self._restart(generation=generation)
+            return await self._new_page()
+
+    async def _restart(self, generation: int) -> None:
+        async with self._restart_lock:
+            if generation != self._generation:
+                return
+            self.stats["restarts"] += 1
+            logger.warning("Браузер пула упал, перезапуск")
+            self._uses.clear()
+            await self._launch()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.close()
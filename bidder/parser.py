@@ -8,6 +8,8 @@ import urllib
 
 from .schemas import AuthPluginSchema, AuthPluginSelectors, WbSelectors
 from .custom_exceptions import AlreadyAuthenticatedException
+from .resource_blocker import ResourceBlocker
+from .settings import settings
 from utils.exceptions import (
     ALREADY_AUTH_PLUGIN, TIMEOUT, NOT_AVAILABLE_NEURO, DOES_NOT_EXISTS,
     BAD_DATA_TO_AUTH
@@ -60,6 +62,10 @@ class Parser(ABC):
     async def do_js(self, page: Page, script: str) -> None:
         ...
 
+    @abstractmethod
+    async def evaluate(self, page: Page, script: str, arg=None):
+        ...
+
     @abstractmethod
     async def get_text(self, locator: Locator) -> str:
         ...
@@ -75,10 +81,11 @@ class Parser(ABC):
 class PlaywrightParser(Parser):
     TIMEOUT = 10_000
 
-    def __init__(self, user_data_dir: str, path_to_plugin: str):
+    def __init__(self, user_data_dir: str, path_to_plugin: str, resource_blocker: ResourceBlocker | None = None):
         self.user_data_dir = user_data_dir
         self.path_to_plugin = os.path.expanduser(path_to_plugin)
         self.headless = False
+        self.resource_blocker = resource_blocker
 
     def __del__(self):
         os.rmdir(self.user_data_dir)
@@ -97,7 +104,10 @@ class PlaywrightParser(Parser):
         await page.goto(url)
 
     async def new_page(self, browser: Browser) -> Page:
-        return await browser.new_page()
+        page = await browser.new_page()
+        if self.resource_blocker is not None:
+            await self.resource_blocker.attach(page=page)
+        return page
 
     async def close_browser(self, browser: Browser) -> None:
         await browser.close()
@@ -131,6 +141,9 @@ class PlaywrightParser(Parser):
     async def do_js(self, page: Page, script: str) -> None:
         await page.evaluate(script)
 
+    async def evaluate(self, page: Page, script: str, arg=None):
+        return await page.evaluate(script, arg)
+
     async def get_text(self, locator: Locator) -> str:
         return await locator.text_content()
     
@@ -259,27 +272,90 @@ class PluginAuth:
 
 
 class WbParser:
-    SCROLL_WAITING = 10_000
+    SCROLL_STABLE_TIME = 1_500
+    SCROLL_MAX_TIME = 30_000
     SCRIPT = """
-        (async function() {
-            const scrollHeight = 15000;
-            let scrollPosition = 0;
-            const scrollStep = 50;
-
-            while (scrollPosition < scrollHeight) {
-                window.scrollTo(0, scrollPosition);
-                scrollPosition += scrollStep;
-
-                await new Promise(resolve => setTimeout(resolve, 100));
+        async ({widget, card, stableTime, maxTime}) => {
+            const startedAt = performance.now();
+            let lastState = null;
+            let changedAt = startedAt;
+            let reachedBottom = false;
+            let reason = "timeout";
+            let widgets = 0;
+
+            let wake = null;
+            const observer = new MutationObserver(() => wake && wake());
+            observer.observe(document.body, {childList: true, subtree: true});
+            const waitMutation = (timeout) => new Promise(resolve => {
+                wake = resolve;
+                setTimeout(resolve, timeout);
+            });
+
+            try {
+                while (performance.now() - startedAt < maxTime) {
+                    window.scrollBy(0, window.innerHeight);
+                    await waitMutation(200);
+
+                    widgets = document.querySelectorAll(widget).length;
+                    const cards = document.querySelectorAll(card).length;
+                    const height = document.body.scrollHeight;
+                    const atBottom = window.innerHeight + window.scrollY >= height - 1;
+                    const now = performance.now();
+
+                    const state = `${widgets}/${cards}/${height}`;
+                    if (state !== lastState || (atBottom && !reachedBottom)) {
+                        lastState = state;
+                        changedAt = now;
+                    }
+                    reachedBottom = atBottom;
+
+                    if (atBottom && cards > 0 && widgets >= cards) {
+                        reason = "complete";
+                        break;
+                    }
+                    if (atBottom && now - changedAt > stableTime) {
+                        reason = "stable";
+                        break;
+                    }
+                }
+            } finally {
+                observer.disconnect();
             }
-        })();
-    """ 
+            return {widgets, reason, elapsed: performance.now() - startedAt};
+        }
+    """
     SHOW_PAGE = 2
+    EXTRACT_SCRIPT = """
+        ({goods, articulAttribute, fromValue, price, card}) => {
+            const text = (root, selector) => {
+                const element = root && root.querySelector(selector);
+                return element ? element.textContent : null;
+            };
+            const rows = [];
+            for (const item of document.querySelectorAll(goods)) {
+                const articul = (item.getAttribute(articulAttribute) || "").split("-").pop();
+                const cardElement = document.getElementById(articul);
+                const row = [
+                    text(item, fromValue),
+                    text(item, price),
+                    text(cardElement, card.marks),
+                    text(cardElement, card.count_marks),
+                    text(cardElement, card.fbo),
+                    text(cardElement, card.num_of_the_rating),
+                ];
+                if (!row.includes(null)) {
+                    rows.push(row);
+                }
+            }
+            return rows;
+        }
+    """
 
-    def __init__(self, page: Page, parser: Parser):
+    def __init__(self, page: Page, parser: Parser, extract_in_page: bool = True):
         self.page = page
         self.selectors = WbSelectors()
         self.parser = parser
+        self.extract_in_page = extract_in_page
 
     async def get_data(self, url: str) -> list:
         if not await self._can_parse():
@@ -294,6 +370,29 @@ class WbParser:
 
         return data_parsed
 
+    async def get_page_data(self, url: str) -> list | None:
+        '''
+        Одна уже открытая страница выдачи без перехода на следующую. url -
+        адрес первой страницы запроса (без &page=N): он пишется в строки
+        как запрос, и все страницы запроса попадают в одну категорию.
+        None - страница загрузилась, но карточек на ней нет (выдача
+        кончилась). Если карточки есть, а плагин так и не отрисовался
+        (медленный плагин, слетела авторизация) - ValueError, как в get_data.
+        '''
+        if not await self._can_parse():
+            if await self._has_product_cards():
+                raise ValueError(NOT_AVAILABLE_NEURO)
+            return None
+        await self._scrolling_page()
+        return await self._collect_data(current_url=url)
+
+    async def _has_product_cards(self) -> bool:
+        return await self.parser.evaluate(
+            page=self.page,
+            script="(selector) => document.querySelectorAll(selector).length > 0",
+            arg=self.selectors.product_card
+        )
+
     async def _can_parse(self) -> bool:
         try:
             await self.parser.wait_selector(page=self.page, selector=self.selectors.can_parse_data)
@@ -301,9 +400,25 @@ class WbParser:
             return False
         return True
 
-    async def _scrolling_page(self) -> None:
-        await self.parser.do_js(page=self.page, script=self.SCRIPT)
-        await self.parser.wait_time(page=self.page, time=self.SCROLL_WAITING)
+    async def _scrolling_page(self) -> dict:
+        '''
+        Прокрутка по экрану, MutationObserver будит цикл сразу после
+        отрисовки. Обычный выход - "stable": низ страницы достигнут и
+        SCROLL_STABLE_TIME мс не меняются ни число виджетов, ни число
+        карточек, ни высота страницы (подгрузка внизу тоже сбрасывает
+        таймер). "complete" - ранний выход, если виджет плагина есть на
+        каждой карточке (бывает не всегда), "timeout" - SCROLL_MAX_TIME.
+        '''
+        return await self.parser.evaluate(
+            page=self.page,
+            script=self.SCRIPT,
+            arg={
+                "widget": self.selectors.goods_on_page,
+                "card": self.selectors.product_card,
+                "stableTime": self.SCROLL_STABLE_TIME,
+                "maxTime": self.SCROLL_MAX_TIME,
+            }
+        )
     
     async def _go_to_next_page(self) -> None:
         next_button = await self.parser.get_element_by_selector(
@@ -314,6 +429,51 @@ class WbParser:
         await self.parser.click(element=next_button)
 
     async def _collect_data(self, current_url: str) -> list:
+        if self.extract_in_page:
+            try:
+                return await self._collect_data_in_page(current_url=current_url)
+            except Exception as e:
+                print("Сбор карточек одним evaluate не удался, собираем по полям:", e)
+        return await self._collect_data_by_fields(current_url=current_url)
+
+    async def _collect_data_in_page(self, current_url: str) -> list:
+        '''
+        Все карточки страницы одним page.evaluate: поля читаются в браузере
+        и возвращаются списком строк, без round trip на каждое поле.
+        Карточки без какого-либо поля пропускаются, как в сборе по полям.
+        '''
+        rows = await self.parser.evaluate(
+            page=self.page,
+            script=self.EXTRACT_SCRIPT,
+            arg=self._get_extract_arg()
+        )
+        url = self._get_urL(url=current_url)
+        return [
+            (from_value, price, url, marks, count_marks, fbo, num_of_the_rating)
+            for from_value, price, marks, count_marks, fbo, num_of_the_rating in rows
+        ]
+
+    def _get_extract_arg(self) -> dict:
+        return {
+            "goods": self.selectors.goods_on_page,
+            "articulAttribute": self.selectors.wb_articul,
+            "fromValue": self.selectors.from_value,
+            "price": self.selectors.price,
+            "card": {
+                name: self._get_card_relative_selector(selector=getattr(self.selectors, name))
+                for name in ("marks", "count_marks", "fbo", "num_of_the_rating")
+            },
+        }
+
+    @staticmethod
+    def _get_card_relative_selector(selector: str) -> str:
+        '''
+        "#{articul_wb} > div..." -> ":scope > div...": артикул начинается с
+        цифры, поэтому карточка ищется через getElementById, а не по #id.
+        '''
+        return ":scope" + selector.split("}", 1)[1]
+
+    async def _collect_data_by_fields(self, current_url: str) -> list:
         data_to_save = []
         try:
             items = self.parser.get_element_by_locator(
@@ -427,7 +587,8 @@ async def parse_plugin_data(url: str, user_data_dir: str, path_to_plugin: str, a
     '''
     playwright_parser = PlaywrightParser(
         user_data_dir=user_data_dir, 
-        path_to_plugin=path_to_plugin
+        path_to_plugin=path_to_plugin,
+        resource_blocker=ResourceBlocker() if settings.parser.block_resources else None
     )
 
     async with async_playwright() as p:
@@ -0,0 +1,51 @@
+from abc import ABC, abstractmethod
+
+import numpy as np
+
+from .custom_exceptions import WBException
+from .utils import BaseRegistry, BaseFabric
+
+
+class PositionAggregator(ABC):
+
+    @abstractmethod
+    def aggregate(self, positions: np.ndarray, weights: np.ndarray) -> int: ...
+
+class BasePositionAggregator(PositionAggregator):
+    def aggregate(self, positions: np.ndarray, weights: np.ndarray) -> int:
+        if not len(positions):
+            raise ValueError(WBException.POSITION_NOT_FOUND)
+        return int(round(float(self._aggregate(positions=positions, weights=weights))))
+
+    @abstractmethod
+    def _aggregate(self, positions: np.ndarray, weights: np.ndarray) -> float: ...
+
+class MinPositionAggregator(BasePositionAggregator):
+    def _aggregate(self, positions: np.ndarray, weights: np.ndarray) -> float:
+        return positions.min()
+
+class MedianPositionAggregator(BasePositionAggregator):
+    def _aggregate(self, positions: np.ndarray, weights: np.ndarray) -> float:
+        return np.median(positions)
+
+class WeightedPositionAggregator(BasePositionAggregator):
+    '''
+    Средняя позиция с весами по показам (weight_field). Если у всех
+    артикулов вес нулевой - медиана.
+    '''
+
+
+    def _aggregate(self, positions: np.ndarray, weights: np.ndarray) -> float:
+        total = weights.sum()
+        if total <= 0:
+            return np.median(positions)
+        return (positions * weights).sum() / total
+
+class PositionAggregatorRegistry(BaseRegistry):
+    _registry = {}
+
+class PositionAggregatorFabric(BaseFabric): ...
+
+PositionAggregatorRegistry.register_obj("min", MinPositionAggregator)
+PositionAggregatorRegistry.register_obj("median", MedianPositionAggregator)
+PositionAggregatorRegistry.register_obj("weighted", WeightedPositionAggregator)
@@ -0,0 +1,174 @@
+from functools import lru_cache
+import re
+
+import numpy as np
+import orjson
+
+from .settings import settings
+
+
+WEIGHT_FIELD = settings.position_aggregation.weight_field
+
+NM_ID_PATTERN = re.compile(rb'"nmId"\s*:\s*(\d+)')
+ITEMS_PATTERN = re.compile(rb'"items"\s*:')
+CURRENT_PATTERN = re.compile(rb'"current"\s*:\s*([^,}\s]+)')
+PREVIOUS_PATTERN = re.compile(rb'"previous"\s*:\s*([^,}\s]+)')
+INVALID_NUMBER_PATTERN = re.compile(rb'[^\d. -]|(?<![ \d])\.|-(?!\d)')
+
+@lru_cache
+def get_object_pattern(field: str) -> re.Pattern:
+    return re.compile(rb'"' + re.escape(field.encode()) + rb'"\s*:\s*\{([^{}]*)\}')
+
+class PositionReport:
+    '''
+    Ответ search-report, сжатый до нужных биддеру полей: nmId,
+    avgPosition.current/previous и вес (weight_field.current) - по массиву
+    на поле вместо дерева dict на каждый item. groups_count нужен
+    агрегатору для постраничного обхода.
+    '''
+
+
+    def __init__(
+        self,
+        nm_ids: np.ndarray,
+        positions: np.ndarray,
+        previous: np.ndarray,
+        weights: np.ndarray,
+        groups_count: int
+    ):
+        self.nm_ids = nm_ids
+        self.positions = positions
+        self.previous = previous
+        self.weights = weights
+        self.groups_count = groups_count
+
+    def __len__(self) -> int:
+        return len(self.nm_ids)
+
+    @classmethod
+    def from_content(cls, content: bytes, weight_field: str = WEIGHT_FIELD) -> "PositionReport":
+        '''
+        Сначала частичный разбор: регулярками по байтам достаются только
+        nmId, avgPosition и weight_field, дерево dict не строится. Если
+        число найденных полей не сходится (нестандартный ответ) - полный
+        разбор orjson.
+        '''
+        report = cls._scan(content=content, weight_field=weight_field)
+        if report is not None:
+            return report
+        stats = orjson.loads(content) if content else {}
+        return cls.from_stats(stats=stats, weight_field=weight_field)
+
+    @classmethod
+    def _scan(cls, content: bytes, weight_field: str) -> "PositionReport | None":
+        '''
+        None - ответ нельзя надёжно разобрать регулярками: поле не число
+        (null, экспонента), avgPosition/вес стоят не внутри объекта своего
+        nmId (на уровне группы, пропущены у карточки) или их число не
+        сходится с числом nmId.
+        '''
+        nm_ids = list(NM_ID_PATTERN.finditer(content))
+        positions = list(get_object_pattern("avgPosition").finditer(content))
+        weights = list(get_object_pattern(weight_field).finditer(content))
+        if len(positions) != len(nm_ids) or len(weights) not in (0, len(nm_ids)):
+            return None
+        if not nm_ids:
+            return cls.empty(groups_count=len(ITEMS_PATTERN.findall(content)))
+
+        if not cls._is_aligned(content=content, keys=nm_ids, values=positions):
+            return None
+        if weights and not cls._is_aligned(content=content, keys=nm_ids, values=weights):
+            return None
+
+        current = [cls._get_value(CURRENT_PATTERN, position.group(1)) for position in positions]
+        previous = [
+            cls._get_value(PREVIOUS_PATTERN, position.group(1), default=value)
+            for position, value in zip(positions, current)
+        ]
+        weight_values = [cls._get_value(CURRENT_PATTERN, weight.group(1)) for weight in weights]
+        if None in current or None in weight_values:
+            return None
+        if INVALID_NUMBER_PATTERN.search(b" ".join(current + previous + weight_values)):
+            return None
+
+        return cls(
+            nm_ids=np.array([match.group(1) for match in nm_ids], dtype=np.int64),
+            positions=np.array(current, dtype=np.float64).astype(np.int32),
+            previous=np.array(previous, dtype=np.float64).astype(np.int32),
+            weights=np.array(weight_values, dtype=np.float64) if weights else np.ones(len(nm_ids)),
+            groups_count=len(ITEMS_PATTERN.findall(content))
+        )
+
+    @staticmethod
+    def _get_value(pattern: re.Pattern, body: bytes, default: bytes | None = None) -> bytes | None:
+        match = pattern.search(body)
+        return match.group(1) if match is not None else default
+
+    @staticmethod
+    def _is_aligned(content: bytes, keys: list[re.Match], values: list[re.Match]) -> bool:
+        '''
+        values[i] лежит после keys[i] и до keys[i + 1], а скобки {} между
+        ними сбалансированы - то есть в объекте той же карточки, а не на
+        уровне группы или во вложенном объекте.
+        '''
+        bounds = [key.start() for key in keys[1:]] + [len(content)]
+        for key, value, bound in zip(keys, values, bounds):
+            start, end = key.end(), value.start()
+            if not start < end < bound:
+                return False
+            if content.count(b"{", start, end) != content.count(b"}", start, end):
+                return False
+        return True
+
+    @classmethod
+    def from_stats(cls, stats: dict, weight_field: str = WEIGHT_FIELD) -> "PositionReport":
+        '''
+        previous: null - берётся current; вес null - 0 (карточка не влияет
+        на средневзвешенную позицию), поля веса нет совсем - 1.
+        '''
+        groups = (stats.get('data') or {}).get('groups') or []
+        rows = [
+            (
+                item['nmId'],
+                item['avgPosition']['current'],
+                item['avgPosition'].get('previous') or item['avgPosition']['current'],
+                (item.get(weight_field) or {}).get('current', 1) or 0
+            )
+            for group in groups
+            for item in group.get('items') or []
+            if (item.get('avgPosition') or {}).get('current') is not None
+        ]
+        if not rows:
+            return cls.empty(groups_count=len(groups))
+
+        nm_ids, positions, previous, weights = zip(*rows)
+        return cls(
+            nm_ids=np.array(nm_ids, dtype=np.int64),
+            positions=np.array(positions, dtype=np.int32),
+            previous=np.array(previous, dtype=np.int32),
+            weights=np.array(weights, dtype=np.float64),
+            groups_count=len(groups)
+        )
+
+    @classmethod
+    def empty(cls, groups_count: int = 0) -> "PositionReport":
+        return cls(
+            nm_ids=np.empty(0, dtype=np.int64),
+            positions=np.empty(0, dtype=np.int32),
+            previous=np.empty(0, dtype=np.int32),
+            weights=np.empty(0, dtype=np.float64),
+            groups_count=groups_count
+        )
+
+    def select(self, nm_ids: list) -> "PositionReport":
+        mask = np.isin(self.nm_ids, nm_ids)
+        return PositionReport(
+            nm_ids=self.nm_ids[mask],
+            positions=self.positions[mask],
+            previous=self.previous[mask],
+            weights=self.weights[mask],
+            groups_count=self.groups_count
+        )
+
+    def to_weighted_positions(self) -> dict[int, tuple[int, float]]:
+        return dict(zip(self.nm_ids.tolist(), zip(self.positions.tolist(), self.weights.tolist())))
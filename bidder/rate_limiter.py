@@ -0,0 +1,108 @@
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+from datetime import datetime, timezone
+import asyncio
+import time
+
+from .settings import settings, RateLimitRule
+
+
+class TokenBucket:
+    '''
+    Асинхронный token bucket. Ожидающие обслуживаются по очереди (FIFO через
+    asyncio.Lock), поэтому одна активная кампания не выедает квоту остальных.
+    После 429 скорость снижается и плавно восстанавливается на успешных ответах.
+    '''
+    SLOW_DOWN_FACTOR = settings.rate_limit.slow_down_factor
+    RECOVERY_FACTOR = settings.rate_limit.recovery_factor
+    MIN_RATE_FACTOR = settings.rate_limit.min_rate_factor
+
+    def __init__(self, rate: float, burst: int):
+        self.max_rate = rate
+        self.rate = rate
+        self.burst = burst
+
+        self._tokens = float(burst)
+        self._updated_at = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock: asyncio.Lock | None = None
+
+    async def acquire(self) -> None:
+        async with self._get_lock():
+            while (wait := self._reserve()) > 0:
+                await asyncio.sleep(wait)
+
+    def try_acquire(self) -> bool:
+        return self._reserve() == 0
+
+    def slow_down(self, retry_after: float | None = None) -> None:
+        self.rate = max(self.rate * self.SLOW_DOWN_FACTOR, self.max_rate * self.MIN_RATE_FACTOR)
+        self._tokens = 0.0
+        self._blocked_until = time.monotonic() + (retry_after if retry_after is not None else 1 / self.rate)
+        self._updated_at = self._blocked_until
+
+    def speed_up(self) -> None:
+        self.rate = min(self.rate + self.max_rate * self.RECOVERY_FACTOR, self.max_rate)
+
+    def _reserve(self) -> float:
+        now = time.monotonic()
+        self._refill(now=now)
+
+        if now < self._blocked_until:
+            return self._blocked_until - now
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return 0
+        return (1 - self._tokens) / self.rate
+
+    def _refill(self, now: float) -> None:
+        if now <= self._updated_at:
+            return
+        self._tokens = min(self._tokens + (now - self._updated_at) * self.rate, self.burst)
+        self._updated_at = now
+
+    def _get_lock(self) -> asyncio.Lock:
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        return self._lock
+
+class RateLimiter:
+    '''
+    Бакеты по ключу (token, url): лимиты WB считаются на токен и на метод.
+    '''
+
+
+    def __init__(
+        self,
+        by_path: dict[str, RateLimitRule] = settings.rate_limit.by_path,
+        default: RateLimitRule = settings.rate_limit.default
+    ):
+        self.by_path = by_path
+        self.default = default
+        self._buckets: dict[tuple[str, str], TokenBucket] = {}
+
+    def get_bucket(self, token: str, url: str) -> TokenBucket:
+        key = (token, url)
+        if key not in self._buckets:
+            self._buckets[key] = self._create_bucket(url=url)
+        return self._buckets[key]
+
+    def _create_bucket(self, url: str) -> TokenBucket:
+        rule = self.by_path.get(urlparse(url).path, self.default)
+        return TokenBucket(rate=rule.rate, burst=rule.burst)
+
+def get_retry_after(headers) -> float | None:
+    value = headers.get("X-Ratelimit-Retry") or headers.get("Retry-After")
+    if value is None:
+        return None
+    try:
+        return max(float(value), 0)
+    except ValueError:
+        ...
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0)
+
+rate_limiter = RateLimiter()
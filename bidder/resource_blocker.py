@@ -0,0 +1,154 @@
+from collections import Counter
+from typing import TYPE_CHECKING
+import statistics
+
+from .settings import settings
+
+if TYPE_CHECKING:
+    from playwright.async_api import BrowserContext, Page, Request, Route
+
+
+class ResourceBlocker:
+    '''
+    page.route на все запросы страницы: картинки, шрифты, видео и счётчики
+    не грузятся, парсер читает только текст карточек и виджета плагина.
+    allow_patterns проверяются первыми, поэтому плагин eggheads и API
+    каталога WB проходят, даже если подпадают под блокировку.
+    '''
+    LOAD_TIME_SCRIPT = """
+        () => {
+            const [navigation] = performance.getEntriesByType("navigation");
+            return navigation ? navigation.loadEventEnd - navigation.startTime : null;
+        }
+    """
+
+
+    def __init__(
+        self,
+        block_resource_types: list[str] = settings.parser.block_resource_types,
+        block_patterns: list[str] = settings.parser.block_patterns,
+        allow_patterns: list[str] = settings.parser.allow_patterns
+    ):
+        self.block_resource_types = set(block_resource_types)
+        self.block_patterns = block_patterns
+        self.allow_patterns = allow_patterns
+
+        self._blocked: dict["Page", Counter] = {}
+        self._traffic: dict["Page", Counter] = {}
+
+    def is_allowed(self, url: str, resource_type: str) -> bool:
+        if any(pattern in url for pattern in self.allow_patterns):
+            return True
+        if resource_type in self.block_resource_types:
+            return False
+        return not any(pattern in url for pattern in self.block_patterns)
+
+    async def attach(self, page: "Page") -> None:
+        self._blocked[page] = Counter()
+        await self.track_traffic(page=page)
+        await page.route("**/*", lambda route: self._handle(page=page, route=route))
+
+    async def track_traffic(self, page: "Page") -> None:
+        '''
+        Байты считаются по CDP Network.loadingFinished.encodedDataLength:
+        Resource Timing отдаёт transferSize 0 для чужих доменов без
+        Timing-Allow-Origin (картинки basket, CDN) и хранит только 250
+        записей. Счётчик сбрасывается на каждой навигации главного фрейма.
+        '''
+        self._traffic[page] = Counter()
+        page.once("close", self._forget)
+        page.on("request", lambda request: self._reset_on_navigation(page=page, request=request))
+        session = await page.context.new_cdp_session(page)
+        session.on("Network.loadingFinished", lambda event: self._count_traffic(page=page, event=event))
+        await session.send("Network.enable")
+
+    def get_blocked(self, page: "Page") -> dict[str, int]:
+        '''
+        Заблокировано с последнего перехода вкладки: счётчик сбрасывается
+        на каждой навигации главного фрейма, вкладки пула переиспользуются.
+        '''
+        return dict(self._blocked.get(page, {}))
+
+    async def get_traffic(self, page: "Page") -> dict:
+        '''
+        Что страница скачала по сети с последнего перехода: байты, число
+        запросов и время до load. Заблокированные запросы и ответы из
+        HTTP-кэша байт не добавляют.
+        '''
+        traffic = self._traffic.get(page, Counter())
+        return {
+            "bytes": traffic["bytes"],
+            "load_ms": await page.evaluate(self.LOAD_TIME_SCRIPT),
+            "requests": traffic["requests"],
+        }
+
+    async def measure_savings(self, context: "BrowserContext", url: str, runs: int = 3) -> dict:
+        '''
+        Один и тот же url без блокировки и с ней, runs пар, порядок в паре
+        чередуется, каждая загрузка - в новой вкладке. page.route выключает
+        HTTP-кэш вкладки, поэтому сравнение как в проде: без блокировки - с
+        прогретым кэшем (первая загрузка только прогревает его), с
+        блокировкой - без кэша. Возвращает медианы: сколько байт и мс
+        загрузки экономит политика.
+        '''
+        await self._load(context=context, url=url, block=False)
+        plain, blocked, blocked_requests = [], [], Counter()
+        for run in range(runs):
+            for block in ((False, True) if run % 2 == 0 else (True, False)):
+                traffic, requests = await self._load(context=context, url=url, block=block)
+                (blocked if block else plain).append(traffic)
+                blocked_requests.update(requests)
+
+        plain_bytes = statistics.median(traffic["bytes"] for traffic in plain)
+        blocked_bytes = statistics.median(traffic["bytes"] for traffic in blocked)
+        plain_load = [traffic["load_ms"] for traffic in plain if traffic["load_ms"] is not None]
+        blocked_load = [traffic["load_ms"] for traffic in blocked if traffic["load_ms"] is not None]
+        return {
+            "bytes_saved": plain_bytes - blocked_bytes,
+            "load_ms_saved": (
+                statistics.median(plain_load) - statistics.median(blocked_load)
+                if plain_load and blocked_load else None
+            ),
+            "blocked_requests": {resource_type: count / runs for resource_type, count in blocked_requests.items()},
+            "plain_bytes": plain_bytes,
+            "blocked_bytes": blocked_bytes,
+            "runs": runs,
+        }
+
+    async def _load(self, context: "BrowserContext", url: str, block: bool) -> tuple[dict, dict]:
+        page = await context.new_page()
+        try:
+            if block:
+                await self.attach(page=page)
+            else:
+                await self.track_traffic(page=page)
+            await page.goto(url, wait_until="load")
+            return await self.get_traffic(page=page), self.get_blocked(page=page)
+        finally:
+            await page.close()
+
+    async def _handle(self, page: "Page", route: "Route") -> None:
+        request = route.request
+        if self._is_main_navigation(request=request):
+            self._blocked[page] = Counter()
+        if self.is_allowed(url=request.url, resource_type=request.resource_type):
+            await route.continue_()
+            return
+        self._blocked.setdefault(page, Counter())[request.resource_type] += 1
+        await route.abort("blockedbyclient")
+
+    def _reset_on_navigation(self, page: "Page", request: "Request") -> None:
+        if self._is_main_navigation(request=request):
+            self._traffic[page] = Counter()
+
+    def _count_traffic(self, page: "Page", event: dict) -> None:
+        if page in self._traffic:
+            self._traffic[page].update(bytes=event["encodedDataLength"], requests=1)
+
+    def _forget(self, page: "Page") -> None:
+        self._blocked.pop(page, None)
+        self._traffic.pop(page, None)
+
+    @staticmethod
+    def _is_main_navigation(request: "Request") -> bool:
+        return request.is_navigation_request() and request.frame.parent_frame is None
@@ -0,0 +1,169 @@
+from abc import ABC, abstractmethod
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+
+from .interval_policy import IntervalPolicy, FixedIntervalPolicy
+from .metrics import metrics
+from .settings import settings
+
+logger = logging.getLogger(__name__)
+
+TICKS = metrics.counter("bidder_ticks_total", "Bidder ticks by result", ("result",))
+TICK_DURATION = metrics.histogram("bidder_tick_seconds", "Bidder tick duration", ("result",))
+SCHEDULER_LAG = metrics.histogram("bidder_scheduler_lag_seconds", "Delay between tick deadline and its start")
+CAMPAIGNS = metrics.gauge("bidder_campaigns", "Campaigns on the schedule")
+
+
+class Scheduler(ABC):
+
+    @abstractmethod
+    def add(self, bidder, delay: float = 0) -> None: ...
+
+    @abstractmethod
+    async def run(self) -> None: ...
+
+    @abstractmethod
+    def stop(self) -> None: ...
+
+class BidderScheduler(Scheduler):
+    '''
+    Крутит все биддеры в одном event loop: у каждой кампании свой дедлайн
+    следующего тика, одновременно выполняется не больше max_concurrent_ticks
+    тиков. Кампания снимается с расписания, когда start() вернул True.
+    Интервал до следующего тика выдаёт interval_policy (по умолчанию
+    фиксированный tick_interval).
+    '''
+
+
+    def __init__(
+        self,
+        tick_interval: float = settings.scheduler.tick_interval,
+        tick_timeout: float = settings.scheduler.tick_timeout,
+        max_concurrent_ticks: int = settings.scheduler.max_concurrent_ticks,
+        interval_policy: IntervalPolicy | None = None
+    ):
+        self.tick_interval = tick_interval
+        self.interval_policy = interval_policy or FixedIntervalPolicy(interval=tick_interval)
+        self.tick_timeout = tick_timeout
+        self.max_concurrent_ticks = max_concurrent_ticks
+
+        self._queue: list[tuple[float, int, object]] = []
+        self._counter = itertools.count()
+        self._running: set[asyncio.Task] = set()
+        self._semaphore: asyncio.Semaphore | None = None
+        self._wakeup: asyncio.Event | None = None
+        self._pending: list[tuple[object, float]] = []
+        self._stopped = False
+
+    def add(self, bidder, delay: float = 0) -> None:
+        if self._wakeup is None:
+            self._pending.append((bidder, delay))
+            return
+        self._push(bidder=bidder, deadline=self._now() + delay)
+
+    async def run(self) -> None:
+        self._semaphore = asyncio.Semaphore(self.max_concurrent_ticks)
+        self._wakeup = asyncio.Event()
+        self._stopped = False
+        self._push_pending()
+
+        try:
+            while not self._stopped and (self._queue or self._running):
+                await self._dispatch_next()
+        finally:
+            await self._cancel_running()
+
+    def stop(self) -> None:
+        self._stopped = True
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    @property
+    def campaigns_count(self) -> int:
+        return len(self._queue) + len(self._running)
+
+    async def _dispatch_next(self) -> None:
+        if not self._queue:
+            await self._wait_wakeup(timeout=None)
+            return
+
+        deadline = self._queue[0][0]
+        delay = deadline - self._now()
+        if delay > 0:
+            await self._wait_wakeup(timeout=delay)
+            return
+
+        await self._semaphore.acquire()
+        if self._stopped:
+            self._semaphore.release()
+            return
+        deadline, _, bidder = heapq.heappop(self._queue)
+        SCHEDULER_LAG.observe(self._now() - deadline)
+        self._start_tick(bidder=bidder, deadline=deadline)
+
+    def _start_tick(self, bidder, deadline: float) -> None:
+        task = asyncio.create_task(self._tick(bidder=bidder, deadline=deadline))
+        self._running.add(task)
+        task.add_done_callback(self._on_tick_done)
+
+    def _on_tick_done(self, task: asyncio.Task) -> None:
+        self._running.discard(task)
+        self._wakeup.set()
+
+    async def _tick(self, bidder, deadline: float) -> None:
+        finished = False
+        result = "error"
+        started_at = time.perf_counter()
+        try:
+            finished = await asyncio.wait_for(bidder.start(), timeout=self.tick_timeout)
+            result = "finished" if finished else "ok"
+        except asyncio.CancelledError:
+            result = "cancelled"
+            raise
+        except asyncio.TimeoutError:
+            result = "timeout"
+            logger.warning("Tick timed out after %s s", self.tick_timeout)
+        except Exception as e:
+            logger.error(e)
+        finally:
+            self._semaphore.release()
+            TICKS.inc(result=result)
+            TICK_DURATION.observe(time.perf_counter() - started_at, result=result)
+            CAMPAIGNS.set(self.campaigns_count)
+
+        if finished:
+            self.interval_policy.forget(bidder)
+            return
+        self._push(bidder=bidder, deadline=self._next_deadline(bidder=bidder, deadline=deadline))
+
+    def _next_deadline(self, bidder, deadline: float) -> float:
+        return max(deadline + self.interval_policy.next_interval(bidder), self._now())
+
+    def _push(self, bidder, deadline: float) -> None:
+        heapq.heappush(self._queue, (deadline, next(self._counter), bidder))
+        self._wakeup.set()
+
+    def _push_pending(self) -> None:
+        for bidder, delay in self._pending:
+            self._push(bidder=bidder, deadline=self._now() + delay)
+        self._pending.clear()
+
+    async def _wait_wakeup(self, timeout: float | None) -> None:
+        self._wakeup.clear()
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            ...
+
+    async def _cancel_running(self) -> None:
+        for task in list(self._running):
+            task.cancel()
+        if self._running:
+            await asyncio.gather(*self._running, return_exceptions=True)
+
+    @staticmethod
+    def _now() -> float:
+        return asyncio.get_running_loop().time()
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, field_validator, ValidationError, model_validator, model_serializer
+from pydantic import BaseModel, Field, field_validator, ValidationError, model_validator, model_serializer
 
 from enum import Enum
 from typing import Self
@@ -11,8 +11,15 @@ from .settings import settings
 class ModeBidder(Enum):
     DEFAULT = "default"
     MOMENTUM = "momentum"
+    BISECTION = "bisection"
+    PID = "pid"
     NEURO = "neuro"
 
+class PositionAggregation(Enum):
+    MIN = "min"
+    MEDIAN = "median"
+    WEIGHTED = "weighted"
+
 class TypeCampaign(Enum):
     AUTOMATIC = "automatic"
     AUCTION = "auction"
@@ -44,12 +51,27 @@ class BidderAndCPMSchemaMixin(BaseModel):
         except:
             raise ValueError(INVALID_DATA_FOR_TYPE_CAMPAIGN.format(value=value))
 
+class PIDGains(BaseModel):
+    kp: float = settings.pid.kp
+    ki: float = settings.pid.ki
+    kd: float = settings.pid.kd
+
+class ProductFeaturesSchema(BaseModel):
+    from_value: int
+    marks: float
+    count_marks: int
+    fbo: int
+
 class BidderData(BidderAndCPMSchemaMixin):
     max_cpm_campaign: int
     min_cpm_campaign: int = settings.cpm_var.min_cpm
     wish_place_in_top: int
     type_work_bidder: ModeBidder = ModeBidder.DEFAULT
     step: int = settings.cpm_var.step_cpm
+    pid_gains: PIDGains = PIDGains()
+    product_features: ProductFeaturesSchema | None = None
+    campaign_end: datetime | None = None
+    position_aggregation: PositionAggregation = PositionAggregation.MIN
 
     @model_validator(mode="after")
     def check_max_relative_min(self) -> Self:
@@ -66,6 +88,14 @@ class BidderData(BidderAndCPMSchemaMixin):
             return cpm_default
         return value
 
+class BidderStateSchema(BaseModel):
+    advertId: int
+    last_cpm: int
+    last_position: int | None = None
+    streak: int = 0
+    manager_state: dict = {}
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
 class CPMChangeSchema(BidderAndCPMSchemaMixin):
     cpm: int
     param: int = None
@@ -134,6 +164,7 @@ class WbSelectors(BaseModel):
 
     can_parse_data: str = ".cpm-card-widget.eggheads-bootstrap"
     goods_on_page: str = ".cpm-card-widget.eggheads-bootstrap"
+    product_card: str = ".product-card"
     wb_articul: str = "id"
     marks: str = "#{articul_wb} > div.product-card__wrapper > div.product-card__bottom-wrap > p.product-card__rating-wrap > span.address-rate-mini.address-rate-mini--sm"
     count_marks: str = "#{articul_wb} > div.product-card__wrapper > div.product-card__bottom-wrap > p.product-card__rating-wrap > span.product-card__count"
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from pydantic_settings import BaseSettings
+from pydantic_settings import BaseSettings, SettingsConfigDict
 
 import os
 
@@ -8,14 +8,161 @@ class SettingsCPM(BaseModel):
     step_cpm: int = 2
     min_cpm: int = 100
     default_dif_between_position_momentum_mode: int = 10
+    coalesce_window: float = 0
+
+class SettingsPID(BaseModel):
+    kp: float = 0.5
+    ki: float = 0.05
+    kd: float = 0.2
+
+class SettingsNeuro(BaseModel):
+    model_path: str = os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "xgboost_model.json"
+    )
+    # from_value, num_of_the_rating, marks, count_marks, fbo - статистики выборки обучения (neuro/jeans2.db)
+    feature_mean: list[float] = [7896.908, 239.113, 4.668, 3333.649, 517.774]
+    feature_scale: list[float] = [12064.773, 243.254, 0.204, 12451.009, 1583.418]
+    fine_tune_mode: str = "default"
+
+class SettingsScheduler(BaseModel):
+    tick_interval: int = 120
+    tick_timeout: int = 60
+    max_concurrent_ticks: int = 100
+
+class SettingsAdaptivePolling(BaseModel):
+    enabled: bool = True
+    min_interval: float = 30
+    max_interval: float = 1800
+    backoff_factor: float = 2
+    stable_distance: int = 1
+    stable_volatility: float = 1.0
+    volatility_alpha: float = 0.3
+    distance_scale: float = 20
+    volatility_scale: float = 5
+    min_ticks_before_end: int = 3
+    request_budget: float | None = 5
+    requests_per_tick: float = 2
+
+class SettingsStatsAggregator(BaseModel):
+    batch_window: float = 0.5
+    page_limit: int = 1000
+
+class SettingsPositionAggregation(BaseModel):
+    # поле item search-report с {"current": ...}, которым взвешиваются позиции
+    weight_field: str = "visibility"
+
+class SettingsWBApi(BaseModel):
+    cpm_url: str = "https://advert-api.wildberries.ru/adv/v0/cpm"
+    stats_url: str = "https://seller-analytics-api.wildberries.ru/api/v2/search-report/report"
+
+class SettingsStatsCache(BaseModel):
+    enabled: bool = True
+    ttl: float = 60
+    max_size: int = 10_000
+
+class RateLimitRule(BaseModel):
+    rate: float
+    burst: int = 1
+
+class SettingsRateLimit(BaseModel):
+    default: RateLimitRule = RateLimitRule(rate=1, burst=1)
+    by_path: dict[str, RateLimitRule] = {
+        "/adv/v0/cpm": RateLimitRule(rate=5, burst=5),
+        "/api/v2/search-report/report": RateLimitRule(rate=0.05, burst=3),
+    }
+    slow_down_factor: float = 0.5
+    recovery_factor: float = 0.1
+    min_rate_factor: float = 0.1
+
+class RetryRule(BaseModel):
+    max_attempts: int = 3
+    backoff_base: float = 0.2
+    backoff_max: float = 5.0
+    retry_statuses: list[int] = [500, 502, 503, 504]
+    retry_on_timeout: bool = True
+    retry_on_connection_error: bool = True
+
+class SettingsHttpClient(BaseModel):
+    timeout: float = 10
+    max_connections: int = 200
+    max_keepalive_connections: int = 100
+    keepalive_expiry: float = 60
+    http2: bool = True
+    host_max_connections: dict[str, int] = {
+        "advert-api.wildberries.ru": 50,
+        "seller-analytics-api.wildberries.ru": 50,
+    }
+    # POST повторяется только если запрос не дошёл до WB (ошибка соединения);
+    # после 5xx или таймаута чтения ставка могла уже примениться
+    retry_policies: dict[str, RetryRule] = {
+        "default": RetryRule(),
+        "post": RetryRule(retry_statuses=[], retry_on_timeout=False),
+    }
+    failure_threshold: int = 5
+    recovery_timeout: float = 30
+
+class SettingsMetrics(BaseModel):
+    enabled: bool = True
+    host: str = "127.0.0.1"
+    port: int = 9108
+
+class SettingsShadow(BaseModel):
+    modes: list[str] = []
+    dry_run: bool = False
+    log_path: str = "shadow.log"
+    flush_every: int = 100
+
+class SettingsStateStore(BaseModel):
+    flush_interval: float = 5
+    max_batch: int = 1000
+
+class SettingsBacktest(BaseModel):
+    ticks_per_day: int = 720
+    worst_position: int = 300
+    noise: float = 1.0
+    floor_drift: float = 0.5
 
 class SettingsParser(BaseModel):
     url_to_plugin: str = os.path.expanduser(
     "~/Library/Application Support/Google/Chrome/Default/Extensions/eabmbhjdihhkdkkmadkeoggelbafdcdd/2.15.5_0"
     )
+    pool_size: int = 4
+    max_page_uses: int = 20
+    retries: int = 1
+    page_depth: int = 2
+    block_resources: bool = True
+    block_resource_types: list[str] = ["image", "media", "font"]
+    block_patterns: list[str] = [
+        "google-analytics.com", "googletagmanager.com", "doubleclick.net",
+        "mc.yandex.ru", "top-fwz1.mail.ru", "vk.com/rtrg", "/analytics/",
+    ]
+    allow_patterns: list[str] = [
+        "chrome-extension://", "eggheads", "search.wb.ru", "catalog.wb.ru", "card.wb.ru",
+    ]
+    search_url: str = "https://www.wildberries.ru/catalog/0/search.aspx?search={query}"
+    queries_db: str = os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "neuro", "jeans2.db"
+    )
 
 
 class Settings(BaseSettings):
+    model_config = SettingsConfigDict(env_nested_delimiter="__")
+
+    wb_api: SettingsWBApi = SettingsWBApi()
     cpm_var: SettingsCPM = SettingsCPM()
+    pid: SettingsPID = SettingsPID()
+    neuro: SettingsNeuro = SettingsNeuro()
+    scheduler: SettingsScheduler = SettingsScheduler()
+    adaptive_polling: SettingsAdaptivePolling = SettingsAdaptivePolling()
+    http_client: SettingsHttpClient = SettingsHttpClient()
+    stats_aggregator: SettingsStatsAggregator = SettingsStatsAggregator()
+    position_aggregation: SettingsPositionAggregation = SettingsPositionAggregation()
+    rate_limit: SettingsRateLimit = SettingsRateLimit()
+    stats_cache: SettingsStatsCache = SettingsStatsCache()
+    backtest: SettingsBacktest = SettingsBacktest()
+    state_store: SettingsStateStore = SettingsStateStore()
+    metrics: SettingsMetrics = SettingsMetrics()
+    shadow: SettingsShadow = SettingsShadow()
+    parser: SettingsParser = SettingsParser()
 
 settings = Settings()
\ No newline at end of file
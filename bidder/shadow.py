@@ -0,0 +1,139 @@
+'''
+Теневой прогон стратегий: на той же позиции, что получил живой биддер,
+считаются ставки кандидатов ManagerCPM и пишутся в append-only лог
+фиксированных записей вместо POST в WB. Лог читается load_shadow_log и
+превращается в записи для RecordedAuctionModel бэктеста.
+'''
+from typing import Iterable
+import time
+
+import numpy as np
+
+from .manager_cpm import ManagerCPMFabric, ManagerCPMRegistry
+from .schemas import BidderData, ModeBidder
+from .settings import settings
+
+
+LIVE_MODE = "live"
+MODES = [LIVE_MODE, *(mode.value for mode in ModeBidder)]
+RECORD_DTYPE = np.dtype([
+    ("timestamp", "<f8"),
+    ("advert_id", "<i8"),
+    ("mode", "<u1"),
+    ("position", "<i4"),
+    ("wish_position", "<i4"),
+    ("cpm", "<i4"),
+    ("proposed_cpm", "<i4"),
+])
+
+class ShadowLog:
+    '''
+    Бинарный лог записей RECORD_DTYPE, открыт на дозапись. Записи копятся
+    в буфере и уходят на диск пачкой раз в flush_every записей и при close().
+    '''
+
+
+    def __init__(self, path: str, flush_every: int = settings.shadow.flush_every):
+        self.path = path
+        self.flush_every = flush_every
+        self._buffer: list[tuple] = []
+        self._file = open(path, "ab")
+
+    def append(self, records: Iterable[tuple]) -> None:
+        self._buffer.extend(records)
+        if len(self._buffer) >= self.flush_every:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self._buffer:
+            return
+        self._file.write(np.array(self._buffer, dtype=RECORD_DTYPE).tobytes())
+        self._file.flush()
+        self._buffer.clear()
+
+    def close(self) -> None:
+        self.flush()
+        self._file.close()
+
+class ShadowEvaluator:
+    '''
+    На каждую позицию живого биддера прогоняет менеджеры modes от его
+    текущей ставки и пишет предложенные ставки в ShadowLog. У каждой пары
+    (кампания, режим) своё состояние менеджера, как у живого биддера.
+    dry_run - живая ставка тоже только логируется, в WB ничего не уходит.
+    '''
+
+
+    def __init__(self, log: ShadowLog, modes: list[ModeBidder], dry_run: bool = False):
+        self.log = log
+        self.modes = modes
+        self.dry_run = dry_run
+        self._states: dict[tuple[int, ModeBidder], dict] = {}
+
+    def evaluate(self, bidder_data: BidderData, cpm: int, current_position: int, live_cpm: int | None = None) -> dict:
+        proposals = {
+            mode: self._propose(bidder_data=bidder_data, mode=mode, cpm=cpm, current_position=current_position)
+            for mode in self.modes
+        }
+        timestamp = time.time()
+        records = [
+            self._get_record(timestamp, bidder_data, MODES.index(mode.value), cpm, current_position, proposed_cpm)
+            for mode, proposed_cpm in proposals.items()
+        ]
+        if live_cpm is not None:
+            records.append(self._get_record(timestamp, bidder_data, MODES.index(LIVE_MODE), cpm, current_position, live_cpm))
+        self.log.append(records)
+        return proposals
+
+    def _propose(self, bidder_data: BidderData, mode: ModeBidder, cpm: int, current_position: int) -> int:
+        state = self._states.setdefault((bidder_data.advertId, mode), {})
+        if "last_cpm" in state:
+            state["last_cpm"] = cpm
+        manager = ManagerCPMFabric.create_obj(
+            mode, ManagerCPMRegistry,
+            cpm=cpm,
+            step=bidder_data.step,
+            current_position=current_position,
+            wish_position=bidder_data.wish_place_in_top,
+            min_cpm=bidder_data.min_cpm_campaign,
+            max_cpm=bidder_data.max_cpm_campaign,
+            state=state,
+            gains=bidder_data.pid_gains
+        )
+        return min(max(manager.increase_cpm(), bidder_data.min_cpm_campaign), bidder_data.max_cpm_campaign)
+
+    @staticmethod
+    def _get_record(
+        timestamp: float, bidder_data: BidderData, mode: int, cpm: int, current_position: int, proposed_cpm: int
+    ) -> tuple:
+        return (
+            timestamp, bidder_data.advertId, mode, current_position,
+            bidder_data.wish_place_in_top, cpm, proposed_cpm
+        )
+
+def load_shadow_log(path: str) -> np.ndarray:
+    return np.fromfile(path, dtype=RECORD_DTYPE)
+
+def get_auction_records(log: np.ndarray) -> dict[int, list[tuple]]:
+    '''
+    Наблюдения (timestamp, position, cpm) по кампаниям для RecordedAuctionModel:
+    одна точка на позицию, ставка - та, что стояла в момент замера.
+    '''
+    records: dict[int, list[tuple]] = {}
+    observations = np.unique(log[["advert_id", "timestamp", "position", "cpm"]])
+    for advert_id, timestamp, position, cpm in observations.tolist():
+        records.setdefault(advert_id, []).append((timestamp, position, cpm))
+    return records
+
+def summarize_shadow_log(log: np.ndarray) -> dict[str, dict]:
+    summary = {}
+    for index in np.unique(log["mode"]):
+        rows = log[log["mode"] == index]
+        change = rows["proposed_cpm"].astype(int) - rows["cpm"]
+        summary[MODES[index]] = {
+            "proposals": int(len(rows)),
+            "mean_proposed_cpm": float(rows["proposed_cpm"].mean()),
+            "mean_change": float(change.mean()),
+            "mean_abs_change": float(np.abs(change).mean()),
+        }
+    return summary
@@ -0,0 +1,154 @@
+from abc import ABC, abstractmethod
+import asyncio
+import logging
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from .schemas import BidderStateSchema
+from .settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+class BidderStateStore(ABC):
+
+    @abstractmethod
+    async def load(self, advert_id: int) -> BidderStateSchema | None: ...
+
+    @abstractmethod
+    def save(self, state: BidderStateSchema) -> None: ...
+
+    async def start(self) -> None:
+        ...
+
+    async def close(self) -> None:
+        ...
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.close()
+
+class SQLAlchemyBidderStateStore(BidderStateStore):
+    '''
+    Состояние кампаний в таблице bidderstates. save() только кладёт
+    состояние в буфер (последнее на кампанию), фоновая задача раз в
+    flush_interval или при max_batch записях сбрасывает буфер одним
+    INSERT ... ON CONFLICT DO UPDATE.
+    '''
+
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        model,
+        flush_interval: float = settings.state_store.flush_interval,
+        max_batch: int = settings.state_store.max_batch
+    ):
+        self.session_factory = session_factory
+        self.model = model
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+
+        self._loaded: dict[int, BidderStateSchema] = {}
+        self._pending: dict[int, BidderStateSchema] = {}
+        self._flush_requested: asyncio.Event | None = None
+        self._flush_task: asyncio.Task | None = None
+
+    async def start(self) -> None:
+        self._flush_requested = asyncio.Event()
+        self._flush_task = asyncio.create_task(self._flush_periodically())
+
+    async def close(self) -> None:
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            await asyncio.gather(self._flush_task, return_exceptions=True)
+            self._flush_task = None
+        await self.flush()
+
+    async def preload(self, advert_ids: list[int]) -> None:
+        async with self.session_factory() as session:
+            rows = await session.scalars(
+                select(self.model).where(self.model.advert_id.in_(advert_ids))
+            )
+            for row in rows:
+                self._loaded[row.advert_id] = self._to_schema(row=row)
+
+    async def load(self, advert_id: int) -> BidderStateSchema | None:
+        if advert_id in self._pending:
+            return self._pending[advert_id]
+        if advert_id not in self._loaded:
+            await self.preload(advert_ids=[advert_id])
+        return self._loaded.get(advert_id)
+
+    def save(self, state: BidderStateSchema) -> None:
+        self._pending[state.advertId] = state
+        if len(self._pending) >= self.max_batch and self._flush_requested is not None:
+            self._flush_requested.set()
+
+    async def flush(self) -> None:
+        if not self._pending:
+            return
+        states, self._pending = self._pending, {}
+
+        try:
+            await self._upsert(states=list(states.values()))
+        except Exception as e:
+            logger.error(e)
+            self._pending = states | self._pending
+            return
+        except BaseException:
+            self._pending = states | self._pending
+            raise
+        self._loaded.update(states)
+
+    async def _flush_periodically(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._flush_requested.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                ...
+            self._flush_requested.clear()
+            await self.flush()
+
+    async def _upsert(self, states: list[BidderStateSchema]) -> None:
+        statement = insert(self.model).values([self._to_row(state=state) for state in states])
+        statement = statement.on_conflict_do_update(
+            index_elements=[self.model.advert_id],
+            set_={
+                "last_cpm": statement.excluded.last_cpm,
+                "last_position": statement.excluded.last_position,
+                "streak": statement.excluded.streak,
+                "manager_state": statement.excluded.manager_state,
+                "updated_at": statement.excluded.updated_at,
+            }
+        )
+        async with self.session_factory() as session:
+            await session.execute(statement)
+            await session.commit()
+
+    @staticmethod
+    def _to_row(state: BidderStateSchema) -> dict:
+        return {
+            "advert_id": state.advertId,
+            "last_cpm": state.last_cpm,
+            "last_position": state.last_position,
+            "streak": state.streak,
+            "manager_state": state.manager_state,
+            "updated_at": state.updated_at,
+        }
+
+    @staticmethod
+    def _to_schema(row) -> BidderStateSchema:
+        return BidderStateSchema(
+            advertId=row.advert_id,
+            last_cpm=row.last_cpm,
+            last_position=row.last_position,
+            streak=row.streak,
+            manager_state=row.manager_state,
+            updated_at=row.updated_at
+        )
@@ -0,0 +1,118 @@
+from abc import ABC, abstractmethod
+from datetime import datetime
+import asyncio
+
+from utils.http_client import BaseHttpClient
+from .schemas import CurrentPositionSchema, PeriodTime, OrderBy
+from .settings import settings
+from .wildberries_api import WBApiFabric, WBApiRegistry, WildberriesBidderStatsWorker
+
+
+class StatsAggregator(ABC):
+
+    @abstractmethod
+    async def get_weighted_positions(self, nm_ids: list) -> dict[int, tuple[int, float]]: ...
+
+    async def get_positions(self, nm_ids: list) -> dict[int, int]:
+        positions = await self.get_weighted_positions(nm_ids)
+        return {nm_id: position for nm_id, (position, _) in positions.items()}
+
+class WildberriesStatsAggregator(StatsAggregator):
+    '''
+    Собирает nmIds всех кампаний одного токена, пришедших в течение
+    batch_window, и забирает их позиции несколькими большими запросами
+    search-report (limit/offset), а не одним запросом на кампанию.
+    '''
+
+
+    def __init__(
+        self,
+        stats_worker: WildberriesBidderStatsWorker,
+        batch_window: float = settings.stats_aggregator.batch_window,
+        page_limit: int = settings.stats_aggregator.page_limit
+    ):
+        self.stats_worker = stats_worker
+        self.batch_window = batch_window
+        self.page_limit = page_limit
+
+        self._waiting_nm_ids: set = set()
+        self._batch: asyncio.Future | None = None
+        self._flush_task: asyncio.Task | None = None
+
+    async def get_weighted_positions(self, nm_ids: list) -> dict[int, tuple[int, float]]:
+        batch = self._join_batch(nm_ids=nm_ids)
+        positions = await asyncio.shield(batch)
+
+        return {nm_id: positions[nm_id] for nm_id in nm_ids if nm_id in positions}
+
+    def _join_batch(self, nm_ids: list) -> asyncio.Future:
+        self._waiting_nm_ids.update(nm_ids)
+        if self._batch is None:
+            self._batch = asyncio.get_running_loop().create_future()
+            self._flush_task = asyncio.create_task(self._flush_later(batch=self._batch))
+        return self._batch
+
+    async def _flush_later(self, batch: asyncio.Future) -> None:
+        await asyncio.sleep(self.batch_window)
+
+        nm_ids = sorted(self._waiting_nm_ids)
+        self._waiting_nm_ids = set()
+        self._batch = None
+
+        try:
+            batch.set_result(await self.fetch_positions(nm_ids=nm_ids))
+        except Exception as e:
+            batch.set_exception(e)
+            batch.exception()
+
+    async def fetch_positions(self, nm_ids: list) -> dict[int, tuple[int, float]]:
+        positions = {}
+        offset = 0
+        while True:
+            report = await self.stats_worker.run_report(self._create_schema(nm_ids=nm_ids, offset=offset))
+            positions.update(report.to_weighted_positions())
+
+            if report.groups_count < self.page_limit:
+                return positions
+            offset += self.page_limit
+
+    def _create_schema(self, nm_ids: list, offset: int) -> CurrentPositionSchema:
+        today = self._get_today_date_with_ymd_format()
+        return CurrentPositionSchema(
+            currentPeriod=PeriodTime(
+                start=today,
+                end=today
+            ),
+            nmIds=nm_ids,
+            orderBy=OrderBy(),
+            limit=self.page_limit,
+            offset=offset
+        )
+
+    @staticmethod
+    def _get_today_date_with_ymd_format() -> str:
+        return datetime.today().strftime("%Y-%m-%d")
+
+class StatsAggregatorPool:
+    '''
+    Один агрегатор на токен продавца: кампании с общим токеном делят батчи.
+    '''
+
+
+    def __init__(self, http_client: BaseHttpClient, **kwargs):
+        self.http_client = http_client
+        self.kwargs = kwargs
+        self._aggregators: dict[str, WildberriesStatsAggregator] = {}
+
+    def get(self, token: str) -> WildberriesStatsAggregator:
+        if token not in self._aggregators:
+            self._aggregators[token] = self._create_aggregator(token=token)
+        return self._aggregators[token]
+
+    def _create_aggregator(self, token: str) -> WildberriesStatsAggregator:
+        stats_worker = WBApiFabric.create_obj(
+            "stats", WBApiRegistry,
+            token=token,
+            http_client=self.http_client
+        )
+        return WildberriesStatsAggregator(stats_worker=stats_worker, **self.kwargs)
@@ -0,0 +1,90 @@
+import unittest
+
+import numpy as np
+
+from ..backtest import BatchBacktester, BidderBacktester, SyntheticAuctionModel, RecordedAuctionModel, compare_modes
+from ..batch_manager_cpm import DefaultBatchManagerCPM
+from ..schemas import BidderData, ModeBidder
+
+
+class TestBacktest(unittest.TestCase):
+
+    def setUp(self):
+        self.count = 20
+        self.ticks = 100
+        rng = np.random.default_rng(42)
+
+        self.floor_cpm = rng.uniform(100, 250, self.count)
+        self.sensitivity = rng.uniform(0.01, 0.05, self.count)
+        self.wish_position = rng.integers(5, 50, self.count)
+        self.min_cpm = np.full(self.count, 150)
+        self.max_cpm = np.full(self.count, 350)
+        self.step = np.full(self.count, 2)
+
+    def test_batch_same_as_bidder(self):
+        batch_result = self._when_run_batch()
+        bidder_result = self._when_run_bidder()
+
+        np.testing.assert_array_equal(batch_result.final_cpm, bidder_result.final_cpm)
+        np.testing.assert_array_equal(batch_result.bid_changes, bidder_result.bid_changes)
+        np.testing.assert_array_equal(batch_result.time_to_target, bidder_result.time_to_target)
+
+    def test_recorded_model_replays_positions(self):
+        records = [[(0, 100, 150), (1, 50, 200), (2, 10, 250)]]
+
+        model = RecordedAuctionModel(records=records, min_cpm=100, max_cpm=350)
+
+        self.assertEqual(model.position(cpm=np.array([200]), tick=1).tolist(), [50])
+        self.assertEqual(model.required_cpm(wish_position=np.array([10]), tick=2).tolist(), [250])
+
+    def _given_model(self) -> SyntheticAuctionModel:
+        return SyntheticAuctionModel(
+            floor_cpm=self.floor_cpm,
+            sensitivity=self.sensitivity,
+            noise=0,
+            floor_drift=0
+        )
+
+    def _when_run_batch(self):
+        return BatchBacktester(
+            manager=DefaultBatchManagerCPM(),
+            model=self._given_model(),
+            step=self.step,
+            wish_position=self.wish_position,
+            min_cpm=self.min_cpm,
+            max_cpm=self.max_cpm
+        ).run(ticks=self.ticks)
+
+    def _when_run_bidder(self):
+        bidders_data = [
+            BidderData(
+                advertId=index,
+                max_cpm_campaign=int(self.max_cpm[index]),
+                min_cpm_campaign=int(self.min_cpm[index]),
+                wish_place_in_top=int(self.wish_position[index]),
+                step=int(self.step[index])
+            )
+            for index in range(self.count)
+        ]
+        return BidderBacktester(bidders_data=bidders_data, model=self._given_model()).run(ticks=self.ticks)
+
+    def test_pid_reaches_target_faster_than_default(self):
+        bidders_data = [
+            BidderData(
+                advertId=index,
+                max_cpm_campaign=1000,
+                min_cpm_campaign=int(self.min_cpm[index]),
+                wish_place_in_top=int(self.wish_position[index])
+            )
+            for index in range(self.count)
+        ]
+
+        summary = compare_modes(
+            bidders_data=bidders_data,
+            model=self._given_model(),
+            modes=[ModeBidder.DEFAULT, ModeBidder.PID],
+            ticks=self.ticks
+        )
+
+        self.assertEqual(summary["pid"]["reached_share"], 1.0)
+        self.assertLess(summary["pid"]["mean_time_to_target"], summary["default"]["mean_time_to_target"])
@@ -0,0 +1,57 @@
+import unittest
+
+import numpy as np
+
+from ..batch_manager_cpm import BatchDecisionEngine
+from ..manager_cpm import ManagerCPMFabric, ManagerCPMRegistry
+
+
+class TestBatchDecisionEngine(unittest.TestCase):
+
+    def setUp(self):
+        self.count = 1000
+        rng = np.random.default_rng(42)
+
+        self.cpm = rng.integers(100, 350, self.count)
+        self.step = rng.integers(1, 10, self.count)
+        self.current_position = rng.integers(1, 100, self.count)
+        self.wish_position = rng.integers(1, 100, self.count)
+        self.min_cpm = np.full(self.count, 150)
+        self.max_cpm = np.full(self.count, 300)
+        self.modes = rng.choice(["default", "momentum"], self.count)
+
+    def test_same_as_scalar_managers(self):
+        result = self._when_increase_cpm()
+
+        expected = self._given_scalar_result()
+        np.testing.assert_array_equal(result, expected)
+
+    def test_result_is_clamped(self):
+        result = self._when_increase_cpm()
+
+        self.assertTrue(np.all(result >= self.min_cpm))
+        self.assertTrue(np.all(result <= self.max_cpm))
+
+    def _given_scalar_result(self) -> np.ndarray:
+        result = []
+        for i in range(self.count):
+            manager = ManagerCPMFabric.create_obj(
+                str(self.modes[i]), ManagerCPMRegistry,
+                cpm=int(self.cpm[i]),
+                step=int(self.step[i]),
+                current_position=int(self.current_position[i]),
+                wish_position=int(self.wish_position[i])
+            )
+            result.append(min(max(manager.increase_cpm(), self.min_cpm[i]), self.max_cpm[i]))
+        return np.array(result)
+
+    def _when_increase_cpm(self) -> np.ndarray:
+        return BatchDecisionEngine().increase_cpm(
+            self.modes,
+            cpm=self.cpm,
+            step=self.step,
+            current_position=self.current_position,
+            wish_position=self.wish_position,
+            min_cpm=self.min_cpm,
+            max_cpm=self.max_cpm
+        )
@@ -0,0 +1,120 @@
+import unittest
+import asyncio
+
+from ..cache import TTLCache, get_stats_cache_key
+from ..schemas import CurrentPositionSchema, PeriodTime, OrderBy
+
+
+class TestTTLCache(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.calls = 0
+
+    async def test_hit_after_miss(self):
+        cache = self._given_cache(ttl=60, max_size=10)
+
+        first = await cache.get_or_load("key", self._loader)
+        second = await cache.get_or_load("key", self._loader)
+
+        self.assertEqual((first, second), (1, 1))
+        self._then_stats(cache, hits=1, misses=1)
+
+    async def test_single_flight(self):
+        cache = self._given_cache(ttl=60, max_size=10)
+
+        results = await asyncio.gather(*(
+            cache.get_or_load("key", self._slow_loader) for _ in range(5)
+        ))
+
+        self.assertEqual(results, [1] * 5)
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(cache.stats["shared"], 4)
+
+    async def test_ttl_expired(self):
+        cache = self._given_cache(ttl=0.01, max_size=10)
+
+        await cache.get_or_load("key", self._loader)
+        await asyncio.sleep(0.02)
+        result = await cache.get_or_load("key", self._loader)
+
+        self.assertEqual(result, 2)
+        self._then_stats(cache, hits=0, misses=2)
+
+    async def test_lru_eviction(self):
+        cache = self._given_cache(ttl=60, max_size=2)
+
+        await cache.get_or_load("a", self._loader)
+        await cache.get_or_load("b", self._loader)
+        await cache.get_or_load("a", self._loader)
+        await cache.get_or_load("c", self._loader)
+        result = await cache.get_or_load("b", self._loader)
+
+        self.assertEqual(result, 4)
+        self.assertEqual(cache.stats["evictions"], 2)
+
+    async def test_error_is_not_cached(self):
+        cache = self._given_cache(ttl=60, max_size=10)
+
+        with self.assertRaises(ValueError):
+            await cache.get_or_load("key", self._failing_loader)
+        result = await cache.get_or_load("key", self._loader)
+
+        self.assertEqual(result, 1)
+
+    async def test_cancelled_caller_does_not_cancel_other_waiters(self):
+        cache = self._given_cache(ttl=60, max_size=10)
+
+        first = asyncio.create_task(cache.get_or_load("key", self._slow_loader))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(cache.get_or_load("key", self._slow_loader))
+        await asyncio.sleep(0)
+        first.cancel()
+
+        result = await second
+
+        self.assertTrue(first.cancelled())
+        self.assertEqual(result, 1)
+        self.assertEqual(self.calls, 1)
+
+    async def test_cancelled_load_is_normal_error(self):
+        cache = self._given_cache(ttl=60, max_size=10)
+
+        with self.assertRaises(ValueError):
+            await cache.get_or_load("key", self._cancelled_loader)
+        result = await cache.get_or_load("key", self._loader)
+
+        self.assertEqual(result, 1)
+
+    def test_key_ignores_nm_ids_order(self):
+        first = get_stats_cache_key(token="token", schema=self._given_schema(nm_ids=[2, 1]))
+        second = get_stats_cache_key(token="token", schema=self._given_schema(nm_ids=[1, 2]))
+
+        self.assertEqual(first, second)
+
+    def _given_cache(self, ttl: float, max_size: int) -> TTLCache:
+        return TTLCache(ttl=ttl, max_size=max_size)
+
+    def _given_schema(self, nm_ids: list) -> CurrentPositionSchema:
+        return CurrentPositionSchema(
+            currentPeriod=PeriodTime(start="2025-03-07", end="2025-03-07"),
+            nmIds=nm_ids,
+            orderBy=OrderBy()
+        )
+
+    async def _loader(self) -> int:
+        self.calls += 1
+        return self.calls
+
+    async def _slow_loader(self) -> int:
+        await asyncio.sleep(0.01)
+        return await self._loader()
+
+    async def _cancelled_loader(self) -> int:
+        raise asyncio.CancelledError()
+
+    async def _failing_loader(self) -> int:
+        raise ValueError("Invalid request")
+
+    def _then_stats(self, cache: TTLCache, hits: int, misses: int) -> None:
+        self.assertEqual(cache.stats["hits"], hits)
+        self.assertEqual(cache.stats["misses"], misses)
@@ -0,0 +1,116 @@
+import unittest
+import asyncio
+import os
+import sqlite3
+import tempfile
+
+from ..crawler import QueryCrawl, save_results
+from ..page_pool import PagePool
+from .test_page_pool import FakeContext, FakeParser
+
+
+class ScriptedQueryCrawl(QueryCrawl):
+    def __init__(self, pages: dict, delays: dict | None = None, **kwargs):
+        super().__init__(query="джинсы", **kwargs)
+        self.pages = {page: list(results) for page, results in pages.items()}
+        self.delays = delays or {}
+        self.opened = []
+
+    async def _read_page(self, tab, page: int) -> list | None:
+        self.opened.append(page)
+        await asyncio.sleep(self.delays.get(page, 0))
+        result = self.pages[page].pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+class IntCleaner:
+    def clean(self, index, value):
+        return value if index == 2 else int(value)
+
+class TestQueryCrawl(unittest.IsolatedAsyncioTestCase):
+
+    async def test_empty_page_stops_deeper_pages(self):
+        crawl = ScriptedQueryCrawl(
+            pool=await self._given_pool(pool_size=1),
+            pages={1: [["a"]], 2: [["b"]], 3: [None], 4: [["d"]], 5: [["e"]]},
+            page_depth=5
+        )
+
+        rows = await crawl.run()
+
+        self.assertEqual(rows, ["a", "b"])
+        self.assertEqual(crawl.last_page, 2)
+        self.assertEqual(crawl.opened, [1, 2, 3])
+
+    async def test_pages_past_last_page_are_discarded(self):
+        crawl = ScriptedQueryCrawl(
+            pool=await self._given_pool(pool_size=3),
+            pages={1: [["a"]], 2: [None], 3: [["c"]]},
+            delays={2: 0.01},
+            page_depth=3
+        )
+
+        rows = await crawl.run()
+
+        self.assertEqual(rows, ["a"])
+        self.assertEqual(sorted(crawl.opened), [1, 2, 3])
+
+    async def test_failed_page_is_retried_on_new_tab(self):
+        pool = await self._given_pool(pool_size=1)
+        crawl = ScriptedQueryCrawl(
+            pool=pool,
+            pages={1: [ValueError("plugin did not render"), ["a"]], 2: [ValueError("page crashed")] * 3},
+            page_depth=2,
+            retries=2
+        )
+
+        rows = await crawl.run()
+
+        self.assertEqual(rows, ["a"])
+        self.assertEqual(crawl.last_page, 2)
+        self.assertEqual(crawl.opened, [1, 1, 2, 2, 2])
+        self.assertEqual(pool.stats["recycled"], 4)
+
+    async def _given_pool(self, pool_size: int) -> PagePool:
+        async def launch_context() -> FakeContext:
+            return FakeContext()
+
+        pool = PagePool(parser=FakeParser(), launch_context=launch_context, pool_size=pool_size)
+        await pool.start()
+        return pool
+
+class TestSaveResults(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.directory.name, "jeans.db")
+        with sqlite3.connect(self.db_path) as connection:
+            connection.execute(
+                "CREATE TABLE parser_data (id INTEGER PRIMARY KEY AUTOINCREMENT, from_value INT, price INT, "
+                "query TEXT, marks TEXT, count_marks INT, fbo INT, num_of_the_rating INT)"
+            )
+            connection.executemany(
+                "INSERT INTO parser_data (from_value, price, query, marks, count_marks, fbo, num_of_the_rating) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(1, 1, "джинсы", 4, 1, 1, 1), (2, 2, "шорты", 4, 1, 1, 1)]
+            )
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_replaces_query_rows_with_cleaned_rows(self):
+        url = "https://www.wildberries.ru/catalog/0/search.aspx?search=джинсы"
+        results = {
+            "джинсы": [("500", "900", url, "5", "10", "20", "1"), ("нет", "900", url, "5", "10", "20", "2")],
+            "шорты": [],
+        }
+
+        saved = save_results(results=results, db_path=self.db_path, cleaner=IntCleaner())
+
+        with sqlite3.connect(self.db_path) as connection:
+            rows = connection.execute(
+                "SELECT from_value, price, query, num_of_the_rating FROM parser_data ORDER BY query"
+            ).fetchall()
+        self.assertEqual(saved, {"джинсы": 1, "шорты": 0})
+        self.assertEqual(rows, [(500, 900, "джинсы", 1), (2, 2, "шорты", 1)])
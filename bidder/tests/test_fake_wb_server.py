@@ -0,0 +1,78 @@
+from http import HTTPStatus
+import unittest
+
+import httpx
+
+from ..custom_exceptions import WBException
+from ..fake_wb_server import FakeWBServer, FakeWBConfig
+from ..rate_limiter import RateLimiter
+from ..schemas import CPMChangeSchema, CurrentPositionSchema, PeriodTime, OrderBy
+from ..settings import RateLimitRule
+from ..wildberries_api import WildberriesBidderCPMWorker, WildberriesBidderStatsWorker
+from utils.http_client import HttpxHttpClient
+
+
+class TestFakeWBServer(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.advert_id = 1234
+        self.limiter = RateLimiter(by_path={}, default=RateLimitRule(rate=1000, burst=1000))
+
+    async def test_position_follows_cpm(self):
+        async with FakeWBServer(config=FakeWBConfig()) as server, HttpxHttpClient() as http_client:
+            cpm_worker, stats_worker = self._given_workers(server=server, http_client=http_client)
+
+            await cpm_worker.run(CPMChangeSchema(advertId=self.advert_id, cpm=150))
+            low_cpm_position = await self._when_get_position(stats_worker=stats_worker)
+            await cpm_worker.run(CPMChangeSchema(advertId=self.advert_id, cpm=250))
+            high_cpm_position = await self._when_get_position(stats_worker=stats_worker)
+
+        self.assertLess(high_cpm_position, low_cpm_position)
+
+    async def test_too_many_requests(self):
+        config = FakeWBConfig(rate=0.001, burst=1)
+        async with FakeWBServer(config=config) as server, HttpxHttpClient() as http_client:
+            cpm_worker, _ = self._given_workers(server=server, http_client=http_client)
+
+            await cpm_worker.run(CPMChangeSchema(advertId=self.advert_id, cpm=150))
+            with self.assertRaises(ValueError) as context:
+                await cpm_worker.run(CPMChangeSchema(advertId=self.advert_id, cpm=152))
+
+        self.assertIn(str(WBException.TOO_MANY_REQUESTS), str(context.exception))
+        self.assertEqual(server.stats["too_many_requests"], 1)
+
+    async def test_bad_request(self):
+        bodies = [b"{not json", b"[]", b'{"advertId": 1}', b'{"advertId": 1, "cpm": null}']
+        async with FakeWBServer(config=FakeWBConfig()) as server, HttpxHttpClient() as http_client:
+            async with httpx.AsyncClient() as client:
+                statuses = [(await client.post(server.cpm_url, content=body)).status_code for body in bodies]
+            cpm_worker, _ = self._given_workers(server=server, http_client=http_client)
+            await cpm_worker.run(CPMChangeSchema(advertId=self.advert_id, cpm=150))
+
+        self.assertEqual(statuses, [HTTPStatus.BAD_REQUEST] * len(bodies))
+        self.assertEqual(server.auction.cpm_by_advert, {self.advert_id: 150})
+
+    def _given_workers(self, server: FakeWBServer, http_client: HttpxHttpClient) -> tuple:
+        cpm_worker = WildberriesBidderCPMWorker(
+            token="token",
+            http_client=http_client,
+            limiter=self.limiter,
+            coalesce_window=0,
+            url=server.cpm_url
+        )
+        stats_worker = WildberriesBidderStatsWorker(
+            token="token",
+            http_client=http_client,
+            limiter=self.limiter,
+            cache=None,
+            url=server.stats_url
+        )
+        return cpm_worker, stats_worker
+
+    async def _when_get_position(self, stats_worker: WildberriesBidderStatsWorker) -> int:
+        stats = await stats_worker.run(CurrentPositionSchema(
+            currentPeriod=PeriodTime(start="2025-03-07", end="2025-03-07"),
+            nmIds=[self.advert_id],
+            orderBy=OrderBy()
+        ))
+        return stats["data"]["groups"][0]["items"][0]["avgPosition"]["current"]
@@ -0,0 +1,107 @@
+import unittest
+import asyncio
+
+import httpx
+
+from ..settings import settings
+from utils.exceptions import CIRCUIT_IS_OPEN, TIME_LIMIT_IS_REACHED
+from utils.http_client import HttpxHttpClient
+from utils.retry import RetryPolicy, CircuitBreaker
+
+
+class TestHttpxHttpClient(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.url = "https://advert-api.wildberries.ru/adv/v0/cpm"
+        self.host = "advert-api.wildberries.ru"
+        self.calls = 0
+
+    async def test_retries_server_error(self):
+        client = self._given_client(responses=[503, 503, 200])
+
+        response = await client.send_request(method="post", url=self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(client.metrics[self.host]["retries"], 2)
+
+    async def test_each_retry_waits_before_retry_hook(self):
+        client = self._given_client(responses=[503, 503, 200])
+        acquired = []
+
+        async def acquire():
+            acquired.append(self.calls)
+
+        await client.send_request(method="post", url=self.url, before_retry=acquire)
+
+        self.assertEqual(acquired, [1, 2])
+
+    async def test_post_is_not_retried_on_read_timeout_by_default(self):
+        client = self._given_client(
+            responses=[httpx.ReadTimeout("timeout"), 200],
+            retry_policies=settings.http_client.model_dump()["retry_policies"]
+        )
+
+        with self.assertRaises(ValueError):
+            await client.send_request(method="post", url=self.url)
+
+        self.assertEqual(self.calls, 1)
+
+    async def test_post_is_not_retried_on_server_error_by_default(self):
+        client = self._given_client(
+            responses=[503, 200],
+            retry_policies=settings.http_client.model_dump()["retry_policies"]
+        )
+
+        response = await client.send_request(method="post", url=self.url)
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(self.calls, 1)
+
+    async def test_post_is_retried_on_connect_timeout(self):
+        client = self._given_client(
+            responses=[httpx.ConnectTimeout("timeout"), 200],
+            retry_policies={"post": RetryPolicy(backoff_base=0.001, retry_on_timeout=False)}
+        )
+
+        response = await client.send_request(method="post", url=self.url)
+
+        self.assertEqual(response.status_code, 200)
+
+    async def test_timeout_is_not_reported_as_invalid_request(self):
+        client = self._given_client(responses=[httpx.ReadTimeout("timeout")] * 3)
+
+        with self.assertRaises(ValueError) as context:
+            await client.send_request(method="post", url=self.url)
+
+        self.assertEqual(str(context.exception), TIME_LIMIT_IS_REACHED)
+        self.assertEqual(self.calls, 3)
+
+    async def test_circuit_breaker_fails_fast_and_recovers(self):
+        client = self._given_client(responses=[503, 503, 200], failure_threshold=2, recovery_timeout=0.05)
+
+        with self.assertRaises(ValueError):
+            await client.send_request(method="post", url=self.url)
+        with self.assertRaises(ValueError) as context:
+            await client.send_request(method="post", url=self.url)
+        calls_while_open = self.calls
+        await asyncio.sleep(0.06)
+        response = await client.send_request(method="post", url=self.url)
+
+        self.assertEqual(str(context.exception), CIRCUIT_IS_OPEN.format(host=self.host))
+        self.assertEqual(calls_while_open, 2)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(client.metrics[self.host]["circuit_state"], CircuitBreaker.CLOSED)
+        self.assertEqual(client.metrics[self.host]["circuit_opened"], 1)
+
+    def _given_client(self, responses: list, **kwargs) -> HttpxHttpClient:
+        def handler(request: httpx.Request) -> httpx.Response:
+            result = responses[min(self.calls, len(responses) - 1)]
+            self.calls += 1
+            if isinstance(result, Exception):
+                raise result
+            return httpx.Response(result)
+
+        kwargs.setdefault("retry_policies", {"post": RetryPolicy(max_attempts=3, backoff_base=0.001)})
+        client = HttpxHttpClient(**kwargs)
+        client.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        return client
@@ -0,0 +1,85 @@
+import unittest
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from ..interval_policy import AdaptiveIntervalPolicy
+
+
+class FakeBidder:
+    def __init__(self, wish_position: int = 10, campaign_end: datetime | None = None):
+        self.bidder_data = SimpleNamespace(wish_place_in_top=wish_position, campaign_end=campaign_end)
+        self.last_position = None
+
+
+class TestAdaptiveIntervalPolicy(unittest.TestCase):
+
+    def setUp(self):
+        self.policy = AdaptiveIntervalPolicy(
+            base_interval=120,
+            min_interval=30,
+            max_interval=1800,
+            backoff_factor=2,
+            request_budget=None
+        )
+
+    def test_stable_campaign_backs_off_exponentially(self):
+        bidder = FakeBidder()
+
+        intervals = self._when_tick(bidder=bidder, positions=[11, 11, 11, 11, 11])
+
+        self.assertEqual(intervals, [240, 480, 960, 1800, 1800])
+
+    def test_drifting_campaign_tightens(self):
+        bidder = FakeBidder()
+        self._when_tick(bidder=bidder, positions=[11, 11, 11])
+
+        interval = self._when_tick(bidder=bidder, positions=[40])[0]
+
+        self.assertLess(interval, 120)
+        self.assertGreaterEqual(interval, 30)
+
+    def test_interval_does_not_pass_campaign_end(self):
+        bidder = FakeBidder(campaign_end=datetime.now() + timedelta(seconds=300))
+
+        intervals = self._when_tick(bidder=bidder, positions=[11, 11, 11])
+
+        self.assertTrue(all(interval <= 100 for interval in intervals))
+
+    def test_ended_campaign_is_polled_rarely(self):
+        bidder = FakeBidder(campaign_end=datetime.now() - timedelta(seconds=1))
+
+        intervals = self._when_tick(bidder=bidder, positions=[200, 150])
+
+        self.assertEqual(intervals, [1800, 1800])
+
+    def test_request_budget(self):
+        policy = AdaptiveIntervalPolicy(base_interval=120, min_interval=1, request_budget=1, requests_per_tick=2)
+        bidders = [FakeBidder() for _ in range(100)]
+
+        for _ in range(3):
+            for bidder in bidders:
+                bidder.last_position = 200
+                policy.next_interval(bidder)
+
+        self.assertLessEqual(policy.request_rate, 1 + 1e-9)
+
+    def test_request_budget_holds_for_many_campaigns(self):
+        policy = AdaptiveIntervalPolicy(base_interval=120, min_interval=30, request_budget=5, requests_per_tick=2)
+        bidders = [FakeBidder() for _ in range(1000)]
+
+        for tick in range(3):
+            intervals = []
+            for index, bidder in enumerate(bidders):
+                bidder.last_position = 10 + (index * 7 + tick * 13) % 290
+                intervals.append(policy.next_interval(bidder))
+
+        rate = sum(2 / interval for interval in intervals)
+        self.assertLessEqual(rate, 5 + 1e-9)
+        self.assertAlmostEqual(policy.request_rate, rate)
+
+    def _when_tick(self, bidder: FakeBidder, positions: list[int]) -> list[float]:
+        intervals = []
+        for position in positions:
+            bidder.last_position = position
+            intervals.append(self.policy.next_interval(bidder))
+        return intervals
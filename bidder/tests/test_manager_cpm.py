@@ -0,0 +1,83 @@
+import unittest
+
+from ..manager_cpm import ManagerCPMFabric, ManagerCPMRegistry
+
+
+class TestBisectionManagerCPM(unittest.TestCase):
+
+    def setUp(self):
+        self.min_cpm = 150
+        self.max_cpm = 10_000
+        self.wish_position = 10
+        self.state = {}
+
+    def test_converges_in_log_ticks(self):
+        cpm = self._when_bid_until_wish(required_cpm=4321, cpm=self.min_cpm)
+
+        self.assertLessEqual(self.ticks, 16)
+        self.assertGreaterEqual(cpm, 4321)
+
+    def test_rewidens_bracket_on_drift(self):
+        cpm = self._when_bid_until_wish(required_cpm=1000, cpm=self.min_cpm)
+        cpm = self._when_bid_until_wish(required_cpm=8000, cpm=cpm)
+
+        self.assertGreaterEqual(cpm, 8000)
+        self.assertLessEqual(self.ticks, 16)
+
+    def _when_bid_until_wish(self, required_cpm: int, cpm: int, max_ticks: int = 50) -> int:
+        self.ticks = 0
+        while self.ticks < max_ticks:
+            position = self.wish_position if cpm >= required_cpm else self.wish_position + 5
+            if position == self.wish_position and cpm - required_cpm < 2 * 2:
+                break
+            cpm = self._when_increase_cpm(cpm=cpm, current_position=position)
+            self.ticks += 1
+        return cpm
+
+    def _when_increase_cpm(self, cpm: int, current_position: int) -> int:
+        return ManagerCPMFabric.create_obj(
+            "bisection", ManagerCPMRegistry,
+            cpm=cpm,
+            step=2,
+            current_position=current_position,
+            wish_position=self.wish_position,
+            min_cpm=self.min_cpm,
+            max_cpm=self.max_cpm,
+            state=self.state
+        ).increase_cpm()
+
+class TestPIDManagerCPM(unittest.TestCase):
+
+    def setUp(self):
+        self.min_cpm = 150
+        self.max_cpm = 300
+        self.wish_position = 10
+        self.state = {}
+
+    def test_bid_grows_with_error(self):
+        small = self._when_increase_cpm(current_position=12, state={})
+        large = self._when_increase_cpm(current_position=60, state={})
+
+        self.assertGreater(large, small)
+        self.assertGreater(small, 200)
+
+    def test_integral_does_not_wind_up_at_max(self):
+        for _ in range(20):
+            cpm = self._when_increase_cpm(current_position=200, state=self.state)
+        integral = self.state["integral"]
+        cpm = self._when_increase_cpm(current_position=200, state=self.state)
+
+        self.assertEqual(cpm, self.max_cpm)
+        self.assertEqual(self.state["integral"], integral)
+
+    def _when_increase_cpm(self, current_position: int, state: dict) -> int:
+        return ManagerCPMFabric.create_obj(
+            "pid", ManagerCPMRegistry,
+            cpm=200,
+            step=2,
+            current_position=current_position,
+            wish_position=self.wish_position,
+            min_cpm=self.min_cpm,
+            max_cpm=self.max_cpm,
+            state=state
+        ).increase_cpm()
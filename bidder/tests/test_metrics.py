@@ -0,0 +1,74 @@
+import unittest
+from unittest.mock import patch
+
+import httpx
+
+from ..metrics import MetricsRegistry, MetricsServer, NullMetricsRegistry
+from ..rate_limiter import RateLimiter
+from ..schemas import CPMChangeSchema
+from ..settings import RateLimitRule
+from .. import wildberries_api
+from ..wildberries_api import WildberriesBidderCPMWorker
+from .test_wildberries_api import FakeHttpClient
+
+
+class TestMetricsRegistry(unittest.TestCase):
+
+    def test_prometheus_text(self):
+        registry = MetricsRegistry()
+        counter = registry.counter("requests_total", "Requests", ("endpoint", "status"))
+        histogram = registry.histogram("request_seconds", "Latency", buckets=(0.1, 1))
+
+        counter.inc(endpoint="/adv/v0/cpm", status=200)
+        counter.inc(endpoint="/adv/v0/cpm", status=200)
+        histogram.observe(0.05)
+        histogram.observe(0.5)
+
+        text = registry.render()
+        self.assertIn('requests_total{endpoint="/adv/v0/cpm",status="200"} 2', text)
+        self.assertIn('request_seconds_bucket{le="0.1"} 1', text)
+        self.assertIn('request_seconds_bucket{le="+Inf"} 2', text)
+        self.assertIn("request_seconds_count 2", text)
+
+    def test_disabled_registry_is_noop(self):
+        registry = NullMetricsRegistry()
+
+        registry.counter("requests_total", "Requests").inc(status=200)
+        registry.histogram("request_seconds", "Latency").observe(0.5)
+
+        self.assertEqual(registry.render(), "")
+
+class TestMetricsInstrumentation(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.registry = MetricsRegistry()
+        self.requests = self.registry.counter("wb_api_requests_total", "Requests", ("endpoint", "status"))
+        self.skipped = self.registry.counter("bidder_bids_skipped_total", "Skipped", ("reason",))
+        for name, metric in (("WB_API_REQUESTS", self.requests), ("BIDS_SKIPPED", self.skipped)):
+            patcher = patch.object(wildberries_api, name, metric)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    async def test_cpm_worker_counts_requests_and_skips(self):
+        worker = WildberriesBidderCPMWorker(
+            token="token",
+            http_client=FakeHttpClient(),
+            limiter=RateLimiter(by_path={}, default=RateLimitRule(rate=1000, burst=1000)),
+            coalesce_window=0
+        )
+
+        await worker.run(CPMChangeSchema(advertId=1, cpm=150))
+        await worker.run(CPMChangeSchema(advertId=1, cpm=150))
+
+        self.assertEqual(self.requests.get(endpoint=worker.endpoint, status=200), 1)
+        self.assertEqual(self.skipped.get(reason="applied"), 1)
+
+    async def test_metrics_endpoint(self):
+        registry = MetricsRegistry()
+        registry.counter("ticks_total", "Ticks").inc()
+
+        async with MetricsServer(registry=registry, port=0) as server, httpx.AsyncClient() as client:
+            response = await client.get(server.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("ticks_total 1", response.text)
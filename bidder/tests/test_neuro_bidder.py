@@ -0,0 +1,93 @@
+import unittest
+
+import numpy as np
+
+from ..backtest import NoHttpClient
+from ..bidder_2 import NeuroBidder, predict_start_cpm
+from ..cpm_predictor import CPMPredictor, XGBoostCPMPredictor
+from ..schemas import BidderData, ModeBidder, ProductFeaturesSchema
+
+
+class ConstantCPMPredictor(CPMPredictor):
+    def __init__(self, cpm: float):
+        self.cpm = cpm
+        self.calls = 0
+
+    def predict(self, features, wish_positions) -> np.ndarray:
+        self.calls += 1
+        return np.full(len(features), self.cpm)
+
+class TestNeuroBidder(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.features = ProductFeaturesSchema(from_value=1800, marks=4.7, count_marks=500, fbo=300)
+
+    async def test_jumps_to_predicted_cpm_then_fine_tunes(self):
+        bidder = self._given_bidder(position=40)
+        predictor = ConstantCPMPredictor(cpm=251.6)
+
+        await predict_start_cpm(bidders=[bidder], predictor=predictor)
+        await bidder.start()
+        first_cpm = bidder.applied_cpm
+        await bidder.start()
+
+        self.assertEqual(predictor.calls, 1)
+        self.assertEqual(first_cpm, 252)
+        self.assertEqual(bidder.applied_cpm, 252 + bidder.bidder_data.step)
+
+    async def test_fine_tune_starts_from_prediction_below_start_cpm(self):
+        bidder = self._given_bidder(position=40, max_cpm=1200)
+        sent = []
+
+        await predict_start_cpm(bidders=[bidder], predictor=ConstantCPMPredictor(cpm=250))
+        for _ in range(3):
+            await bidder.start()
+            sent.append(bidder.applied_cpm)
+
+        step = bidder.bidder_data.step
+        self.assertGreater(bidder.bidder_data.max_cpm_campaign // 3, 250)
+        self.assertEqual(sent, [250, 250 + step, 250 + 2 * step])
+
+    async def test_prediction_is_clamped(self):
+        bidder = self._given_bidder(position=40)
+
+        await predict_start_cpm(bidders=[bidder], predictor=ConstantCPMPredictor(cpm=10_000))
+        await bidder.start()
+
+        self.assertEqual(bidder.applied_cpm, bidder.bidder_data.max_cpm_campaign)
+
+    @unittest.skipUnless(XGBoostCPMPredictor.is_available(), "xgboost is not installed")
+    def test_model_predicts_higher_cpm_for_better_position(self):
+        top, bottom = XGBoostCPMPredictor().predict(
+            features=[self.features, self.features],
+            wish_positions=[1, 300]
+        )
+
+        self.assertGreater(top, bottom)
+
+    def _given_bidder(self, position: int, max_cpm: int = 400) -> NeuroBidder:
+        bidder = NeuroBidder(
+            bidder_data=BidderData(
+                advertId=1,
+                max_cpm_campaign=max_cpm,
+                min_cpm_campaign=150,
+                wish_place_in_top=10,
+                type_work_bidder=ModeBidder.NEURO,
+                product_features=self.features
+            ),
+            http_client=NoHttpClient(),
+            token="token",
+            articuls=[]
+        )
+        bidder.applied_cpm = None
+
+        async def get_current_position():
+            return position
+
+        async def change_cpm(cpm: int):
+            bidder.applied_cpm = cpm
+            bidder.calculator.min_cpm = cpm
+
+        bidder._get_current_position = get_current_position
+        bidder._change_cpm = change_cpm
+        return bidder
@@ -0,0 +1,127 @@
+import unittest
+import asyncio
+
+from ..page_pool import PagePool
+
+
+class FakePage:
+    def __init__(self):
+        self.closed = False
+
+    def is_closed(self) -> bool:
+        return self.closed
+
+    async def close(self) -> None:
+        self.closed = True
+
+class FakeContext:
+    def __init__(self):
+        self.crashed = False
+
+class FakeParser:
+    def __init__(self):
+        self.pages = []
+
+    async def new_page(self, browser: FakeContext) -> FakePage:
+        if browser.crashed:
+            raise ConnectionError("browser has been closed")
+        page = FakePage()
+        self.pages.append(page)
+        return page
+
+    async def close_browser(self, browser: FakeContext) -> None:
+        browser.crashed = True
+
+class TestPagePool(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.parser = FakeParser()
+        self.contexts = []
+        self.launch_error: Exception | None = None
+        self.launch_block: asyncio.Event | None = None
+
+    async def test_page_is_recycled_after_max_uses(self):
+        pool = await self._given_pool(pool_size=1, max_page_uses=2)
+
+        pages = []
+        for _ in range(3):
+            async with pool.lease() as page:
+                pages.append(page)
+
+        self.assertIs(pages[0], pages[1])
+        self.assertIsNot(pages[1], pages[2])
+        self.assertTrue(pages[0].closed)
+
+    async def test_failed_crawl_replaces_page(self):
+        pool = await self._given_pool(pool_size=1)
+
+        with self.assertRaises(ValueError):
+            async with pool.lease() as broken:
+                raise ValueError("crawl failed")
+        async with pool.lease() as page:
+            ...
+
+        self.assertIsNot(page, broken)
+        self.assertEqual(pool.stats["recycled"], 1)
+
+    async def test_crashed_browser_is_restarted_once(self):
+        pool = await self._given_pool(pool_size=2)
+        self.contexts[0].crashed = True
+
+        await asyncio.gather(*(self._when_crawl_fails(pool=pool) for _ in range(2)))
+
+        self.assertEqual(len(self.contexts), 2)
+        self.assertEqual(pool.stats["restarts"], 1)
+        self.assertEqual(pool.size, 2)
+
+    async def test_failed_restart_keeps_pool_size(self):
+        pool = await self._given_pool(pool_size=1)
+        self.contexts[0].crashed = True
+        self.launch_error = ConnectionError("cannot launch browser")
+
+        await self._when_crawl_fails(pool=pool)
+        self.assertEqual(pool.size, 1)
+        self.launch_error = None
+        async with pool.lease() as page:
+            ...
+
+        self.assertFalse(page.closed)
+        self.assertEqual(pool.size, 1)
+
+    async def test_cancelled_recycle_keeps_pool_size(self):
+        pool = await self._given_pool(pool_size=1)
+        self.contexts[0].crashed = True
+        self.launch_block = asyncio.Event()
+
+        task = asyncio.create_task(self._when_crawl_fails(pool=pool))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+        self.assertEqual(pool.size, 1)
+
+    async def _given_pool(self, pool_size: int, max_page_uses: int = 10) -> PagePool:
+        pool = PagePool(
+            parser=self.parser,
+            launch_context=self._launch_context,
+            pool_size=pool_size,
+            max_page_uses=max_page_uses
+        )
+        await pool.start()
+        return pool
+
+    async def _launch_context(self) -> FakeContext:
+        if self.launch_block is not None:
+            await self.launch_block.wait()
+        if self.launch_error is not None:
+            raise self.launch_error
+        context = FakeContext()
+        self.contexts.append(context)
+        return context
+
+    async def _when_crawl_fails(self, pool: PagePool) -> None:
+        try:
+            async with pool.lease():
+                raise ValueError("page crashed")
+        except ValueError:
+            ...
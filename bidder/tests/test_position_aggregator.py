@@ -0,0 +1,69 @@
+import unittest
+
+from ..bidder_2 import DefaultBidder
+from ..position_report import PositionReport
+from ..schemas import BidderData, PositionAggregation
+from .test_wildberries_api import FakeHttpClient
+
+
+class TestPositionAggregation(unittest.TestCase):
+
+    def setUp(self):
+        self.articuls = [1, 2, 3]
+        self.stats = {
+            "data": {
+                "groups": [
+                    {"items": [
+                        {"nmId": 1, "avgPosition": {"current": 5}, "visibility": {"current": 10}},
+                        {"nmId": 2, "avgPosition": {"current": 20}, "visibility": {"current": 80}},
+                    ]},
+                    {"items": [
+                        {"nmId": 3, "avgPosition": {"current": 50}, "visibility": {"current": 10}},
+                    ]},
+                ]
+            }
+        }
+
+    def test_aggregation_modes_use_all_items(self):
+        result = {
+            mode: self._given_bidder(mode=mode)._get_current_position_from_report(PositionReport.from_stats(self.stats))
+            for mode in PositionAggregation
+        }
+
+        self.assertEqual(result, {
+            PositionAggregation.MIN: 5,
+            PositionAggregation.MEDIAN: 20,
+            PositionAggregation.WEIGHTED: 22,
+        })
+
+    def test_aggregator_positions_use_weights(self):
+        bidder = self._given_bidder(mode=PositionAggregation.WEIGHTED)
+
+        result = bidder._get_current_position_from_positions({1: (5, 10), 2: (20, 80), 4: (1, 1000)})
+
+        self.assertEqual(result, 18)
+
+    def test_missing_weights_count_as_equal(self):
+        stats = {"data": {"groups": [{"items": [
+            {"nmId": 1, "avgPosition": {"current": 10}},
+            {"nmId": 2, "avgPosition": {"current": 20}},
+        ]}]}}
+
+        result = self._given_bidder(mode=PositionAggregation.WEIGHTED)._get_current_position_from_report(
+            PositionReport.from_stats(stats)
+        )
+
+        self.assertEqual(result, 15)
+
+    def _given_bidder(self, mode: PositionAggregation) -> DefaultBidder:
+        return DefaultBidder(
+            bidder_data=BidderData(
+                advertId=1,
+                max_cpm_campaign=400,
+                wish_place_in_top=10,
+                position_aggregation=mode
+            ),
+            http_client=FakeHttpClient(),
+            token="token",
+            articuls=self.articuls
+        )
@@ -0,0 +1,74 @@
+import unittest
+
+import orjson
+
+from ..benchmark import create_report_body
+from ..position_aggregator import WeightedPositionAggregator
+from ..position_report import PositionReport
+
+
+class TestPositionReport(unittest.TestCase):
+
+    def test_scan_matches_full_parse(self):
+        content = create_report_body(items=50)
+
+        report = PositionReport.from_content(content)
+        expected = PositionReport.from_stats(orjson.loads(content))
+
+        self.assertEqual(report.to_weighted_positions(), expected.to_weighted_positions())
+        self.assertEqual(report.previous.tolist(), expected.previous.tolist())
+        self.assertEqual(report.groups_count, expected.groups_count)
+
+    def test_falls_back_when_weights_are_partial(self):
+        content = orjson.dumps({"data": {"groups": [{"items": [
+            {"nmId": 1, "avgPosition": {"current": 5}, "visibility": {"current": 10}},
+            {"nmId": 2, "avgPosition": {"current": 20}},
+        ]}]}})
+
+        report = PositionReport.from_content(content)
+
+        self.assertEqual(report.to_weighted_positions(), {1: (5, 10.0), 2: (20, 1.0)})
+
+    def test_group_level_fields_do_not_shift_items(self):
+        content = orjson.dumps({"data": {"groups": [{
+            "items": [
+                {"nmId": 1, "visibility": {"current": 10}},
+                {"nmId": 2, "avgPosition": {"current": 20}, "visibility": {"current": 80}},
+            ],
+            "avgPosition": {"current": 7},
+        }]}})
+
+        report = PositionReport.from_content(content)
+
+        self.assertEqual(report.to_weighted_positions(), {2: (20, 80.0)})
+
+    def test_falls_back_on_exponent_and_null(self):
+        content = (
+            b'{"data": {"groups": [{"items": ['
+            b'{"nmId": 1, "avgPosition": {"current": 5}, "visibility": {"current": 1e-05}},'
+            b'{"nmId": 2, "avgPosition": {"current": null}, "visibility": {"current": 3}}'
+            b']}]}}'
+        )
+
+        report = PositionReport.from_content(content)
+
+        self.assertEqual(report.nm_ids.tolist(), [1])
+        self.assertAlmostEqual(report.weights[0], 1e-05)
+
+    def test_null_previous_and_weight(self):
+        content = orjson.dumps({"data": {"groups": [{"items": [
+            {"nmId": 1, "avgPosition": {"current": 5, "previous": None}, "visibility": {"current": None}},
+            {"nmId": 2, "avgPosition": {"current": 20, "previous": 30}, "visibility": {"current": 10}},
+        ]}]}})
+
+        report = PositionReport.from_content(content)
+        position = WeightedPositionAggregator().aggregate(positions=report.positions, weights=report.weights)
+
+        self.assertEqual(report.previous.tolist(), [5, 30])
+        self.assertEqual(report.weights.tolist(), [0, 10])
+        self.assertEqual(position, 20)
+
+    def test_empty_content(self):
+        report = PositionReport.from_content(b"")
+
+        self.assertEqual((len(report), report.groups_count), (0, 0))
@@ -0,0 +1,26 @@
+import unittest
+from unittest.mock import patch
+import time
+
+from ..rate_limiter import TokenBucket
+
+
+class TestTokenBucket(unittest.TestCase):
+
+    def setUp(self):
+        self.now = 0.0
+        patcher = patch.object(time, "monotonic", lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_no_burst_after_retry_after_block(self):
+        bucket = TokenBucket(rate=10, burst=5)
+        bucket.slow_down(retry_after=2)
+
+        self.now = 2.0
+        acquired_at_unblock = bucket.try_acquire()
+        self.now = 2.0 + 1 / bucket.rate
+        acquired = [bucket.try_acquire() for _ in range(bucket.burst)]
+
+        self.assertFalse(acquired_at_unblock)
+        self.assertEqual(acquired.count(True), 1)
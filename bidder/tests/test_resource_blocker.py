@@ -0,0 +1,78 @@
+import unittest
+from types import SimpleNamespace
+
+from ..resource_blocker import ResourceBlocker
+
+
+class FakeEmitter:
+    def __init__(self):
+        self.handlers = {}
+
+    def on(self, event: str, handler) -> None:
+        self.handlers.setdefault(event, []).append(handler)
+
+    def once(self, event: str, handler) -> None:
+        self.on(event, handler)
+
+    def emit(self, event: str, payload) -> None:
+        for handler in self.handlers.get(event, []):
+            handler(payload)
+
+class FakeCDPSession(FakeEmitter):
+    async def send(self, method: str, params: dict | None = None) -> None:
+        ...
+
+class FakePage(FakeEmitter):
+    def __init__(self):
+        super().__init__()
+        self.session = FakeCDPSession()
+        self.context = SimpleNamespace(new_cdp_session=self._new_cdp_session)
+
+    async def _new_cdp_session(self, page) -> FakeCDPSession:
+        return self.session
+
+    async def evaluate(self, script: str) -> float:
+        return 120.0
+
+    def navigate(self) -> None:
+        frame = SimpleNamespace(parent_frame=None)
+        self.emit("request", SimpleNamespace(is_navigation_request=lambda: True, frame=frame))
+
+    def load(self, *sizes: int) -> None:
+        for size in sizes:
+            self.session.emit("Network.loadingFinished", {"encodedDataLength": size})
+
+class TestResourceBlocker(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.blocker = ResourceBlocker(
+            block_resource_types=["image", "font"],
+            block_patterns=["mc.yandex.ru"],
+            allow_patterns=["eggheads", "search.wb.ru"]
+        )
+
+    def test_blocks_resource_types_and_trackers(self):
+        self.assertFalse(self.blocker.is_allowed("https://basket-01.wbbasket.ru/1.webp", "image"))
+        self.assertFalse(self.blocker.is_allowed("https://static.wb.ru/font.woff2", "font"))
+        self.assertFalse(self.blocker.is_allowed("https://mc.yandex.ru/watch/1", "script"))
+
+    def test_allows_page_plugin_and_catalog(self):
+        self.assertTrue(self.blocker.is_allowed("https://www.wildberries.ru/catalog/0/search.aspx", "document"))
+        self.assertTrue(self.blocker.is_allowed("https://api.eggheads.solutions/logo.png", "image"))
+        self.assertTrue(self.blocker.is_allowed("https://search.wb.ru/exactmatch/ru/common/v4/search", "fetch"))
+
+    async def test_traffic_is_counted_per_navigation_from_cdp(self):
+        page = FakePage()
+        await self.blocker.track_traffic(page=page)
+
+        page.navigate()
+        page.load(1000, 250_000)
+        first = await self.blocker.get_traffic(page=page)
+        page.navigate()
+        page.load(2000)
+        second = await self.blocker.get_traffic(page=page)
+
+        self.assertEqual(first, {"bytes": 251_000, "load_ms": 120.0, "requests": 2})
+        self.assertEqual(second["bytes"], 2000)
+        page.emit("close", page)
+        self.assertEqual(await self.blocker.get_traffic(page=page), {"bytes": 0, "load_ms": 120.0, "requests": 0})
@@ -0,0 +1,82 @@
+import unittest
+import asyncio
+
+from ..scheduler import BidderScheduler
+
+
+class FakeBidder:
+    def __init__(self, ticks_to_finish: int, counter: dict | None = None, sleep: float = 0):
+        self.ticks_to_finish = ticks_to_finish
+        self.ticks = 0
+        self.counter = counter
+        self.sleep = sleep
+
+    async def start(self):
+        if self.counter is not None:
+            self.counter["active"] += 1
+            self.counter["max_active"] = max(self.counter["max_active"], self.counter["active"])
+        await asyncio.sleep(self.sleep)
+        if self.counter is not None:
+            self.counter["active"] -= 1
+
+        self.ticks += 1
+        if self.ticks >= self.ticks_to_finish:
+            return True
+
+class FailingBidder:
+    def __init__(self):
+        self.ticks = 0
+
+    async def start(self):
+        self.ticks += 1
+        if self.ticks >= 2:
+            return True
+        raise ValueError("Invalid request")
+
+
+class TestBidderScheduler(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.tick_interval = 0.01
+        self.tick_timeout = 1
+        self.max_concurrent_ticks = 3
+
+    async def test_campaign_stops_when_finished(self):
+        bidders = self._given_bidders(count=5, ticks_to_finish=3)
+
+        await self._when_run(bidders=bidders)
+
+        self._then_assert_ticks(bidders=bidders, ticks=3)
+
+    async def test_max_concurrent_ticks(self):
+        counter = {"active": 0, "max_active": 0}
+        bidders = self._given_bidders(count=10, ticks_to_finish=2, counter=counter, sleep=0.01)
+
+        await self._when_run(bidders=bidders)
+
+        self.assertLessEqual(counter["max_active"], self.max_concurrent_ticks)
+        self._then_assert_ticks(bidders=bidders, ticks=2)
+
+    async def test_exception_does_not_stop_campaign(self):
+        bidders = [FailingBidder()]
+
+        await self._when_run(bidders=bidders)
+
+        self._then_assert_ticks(bidders=bidders, ticks=2)
+
+    def _given_bidders(self, count: int, ticks_to_finish: int, **kwargs) -> list[FakeBidder]:
+        return [FakeBidder(ticks_to_finish=ticks_to_finish, **kwargs) for _ in range(count)]
+
+    async def _when_run(self, bidders: list) -> None:
+        scheduler = BidderScheduler(
+            tick_interval=self.tick_interval,
+            tick_timeout=self.tick_timeout,
+            max_concurrent_ticks=self.max_concurrent_ticks
+        )
+        for bidder in bidders:
+            scheduler.add(bidder)
+        await asyncio.wait_for(scheduler.run(), timeout=5)
+
+    def _then_assert_ticks(self, bidders: list, ticks: int) -> None:
+        for bidder in bidders:
+            self.assertEqual(bidder.ticks, ticks)
@@ -3,7 +3,7 @@ from pydantic import BaseModel
 from unittest.mock import patch
 import unittest
 
-from ..schemas import TypeCampaign, BidderData, ModeBidder
+from ..schemas import TypeCampaign, BidderData, ModeBidder, PIDGains, PositionAggregation
 from utils.exceptions import *
 from ..settings import settings 
 
@@ -96,7 +96,11 @@ class TestBidderData(unittest.TestCase):
             "min_cpm_campaign": self.min_cpm_campaign_good,
             "wish_place_in_top": self.wish_place_in_top,
             "type_work_bidder": ModeBidder(self.type_work_bidder),
-            "step": self.step
+            "step": self.step,
+            "pid_gains": PIDGains().model_dump(),
+            "product_features": None,
+            "campaign_end": None,
+            "position_aggregation": PositionAggregation.MIN
         }
         self._then_assert(result, data_to_check)
 
@@ -0,0 +1,112 @@
+import unittest
+import json
+import os
+import tempfile
+
+from ..backtest import RecordedAuctionModel
+from ..bidder_2 import DefaultBidder
+from ..schemas import BidderData, BidderStateSchema, ModeBidder
+from ..shadow import LIVE_MODE, MODES, ShadowEvaluator, ShadowLog, load_shadow_log, get_auction_records, summarize_shadow_log
+from .test_state_store import InMemoryBidderStateStore
+from .test_wildberries_api import FakeHttpClient
+
+
+class TestShadowEvaluator(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "shadow.log")
+        self.positions = [40, 30, 20]
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    async def test_strategies_share_one_position_fetch(self):
+        bidder, http_client = self._given_bidder(dry_run=False)
+
+        await self._when_tick(bidder=bidder)
+
+        log = load_shadow_log(self.path)
+        summary = summarize_shadow_log(log)
+        self.assertEqual(bidder.position_fetches, 3)
+        self.assertEqual(len(http_client.requests), 3)
+        self.assertEqual(set(summary), {"live", "momentum", "bisection"})
+        self.assertEqual(summary["momentum"]["proposals"], 3)
+
+    async def test_live_record_is_sent_cpm(self):
+        bidder, http_client = self._given_bidder(dry_run=False)
+
+        await self._when_tick(bidder=bidder)
+
+        log = load_shadow_log(self.path)
+        live = log[log["mode"] == MODES.index(LIVE_MODE)]
+        sent = [json.loads(request)["cpm"] for request in http_client.requests]
+        self.assertEqual(live["proposed_cpm"].tolist(), sent)
+
+    async def test_record_cpm_is_bid_in_force(self):
+        store = InMemoryBidderStateStore([BidderStateSchema(advertId=1, last_cpm=200)])
+        bidder, http_client = self._given_bidder(dry_run=False, state_store=store, max_cpm_campaign=1200)
+
+        await self._when_tick(bidder=bidder)
+
+        live = load_shadow_log(self.path)
+        live = live[live["mode"] == MODES.index(LIVE_MODE)]
+        sent = [json.loads(request)["cpm"] for request in http_client.requests]
+        self.assertGreater(1200 // 3, 200)
+        self.assertEqual(live["cpm"].tolist(), [200, *sent[:-1]])
+
+    async def test_dry_run_does_not_write_bids(self):
+        bidder, http_client = self._given_bidder(dry_run=True)
+
+        await self._when_tick(bidder=bidder)
+
+        self.assertEqual(http_client.requests, [])
+        self.assertEqual(summarize_shadow_log(load_shadow_log(self.path))["live"]["proposals"], 3)
+
+    async def test_log_feeds_backtest(self):
+        bidder, _ = self._given_bidder(dry_run=False)
+        await self._when_tick(bidder=bidder)
+
+        records = get_auction_records(load_shadow_log(self.path))
+        model = RecordedAuctionModel(records=list(records.values()), min_cpm=150, max_cpm=400)
+
+        self.assertEqual(list(records), [1])
+        self.assertEqual(len(records[1]), 3)
+        self.assertEqual(model.lengths.tolist(), [3])
+
+    def _given_bidder(self, dry_run: bool, state_store=None, **bidder_data) -> tuple:
+        http_client = FakeHttpClient()
+        shadow = ShadowEvaluator(
+            log=ShadowLog(path=self.path, flush_every=1000),
+            modes=[ModeBidder.MOMENTUM, ModeBidder.BISECTION],
+            dry_run=dry_run
+        )
+        bidder = DefaultBidder(
+            bidder_data=BidderData(**{
+                "advertId": 1,
+                "max_cpm_campaign": 400,
+                "min_cpm_campaign": 150,
+                "wish_place_in_top": 10,
+                **bidder_data
+            }),
+            http_client=http_client,
+            token="token",
+            articuls=[],
+            state_store=state_store,
+            shadow=shadow
+        )
+        bidder.cpm_handler.coalesce_window = 0
+        bidder.position_fetches = 0
+        positions = iter(self.positions)
+
+        async def get_current_position():
+            bidder.position_fetches += 1
+            return next(positions)
+
+        bidder._get_current_position = get_current_position
+        return bidder, http_client
+
+    async def _when_tick(self, bidder: DefaultBidder) -> None:
+        for _ in self.positions:
+            await bidder.start()
+        bidder.shadow.log.close()
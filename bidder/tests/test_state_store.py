@@ -0,0 +1,158 @@
+import unittest
+import asyncio
+
+from ..backtest import NoHttpClient
+from ..bidder_2 import DefaultBidder
+from ..schemas import BidderData, BidderStateSchema, ModeBidder
+from ..state_store import BidderStateStore, SQLAlchemyBidderStateStore
+
+
+class FakeSQLAlchemyBidderStateStore(SQLAlchemyBidderStateStore):
+    def __init__(self, **kwargs):
+        super().__init__(session_factory=None, model=None, **kwargs)
+        self.batches = []
+        self.fail = False
+        self.block: asyncio.Event | None = None
+
+    async def _upsert(self, states: list[BidderStateSchema]) -> None:
+        if self.block is not None:
+            await self.block.wait()
+        if self.fail:
+            raise ConnectionError("database is down")
+        self.batches.append({state.advertId: state.last_cpm for state in states})
+
+class InMemoryBidderStateStore(BidderStateStore):
+    def __init__(self, states: list[BidderStateSchema] = ()):
+        self.states = {state.advertId: state for state in states}
+
+    async def load(self, advert_id: int) -> BidderStateSchema | None:
+        return self.states.get(advert_id)
+
+    def save(self, state: BidderStateSchema) -> None:
+        self.states[state.advertId] = state
+
+class TestSQLAlchemyBidderStateStore(unittest.IsolatedAsyncioTestCase):
+
+    async def test_saves_are_batched_with_last_state_per_campaign(self):
+        store = FakeSQLAlchemyBidderStateStore(flush_interval=60, max_batch=100)
+
+        async with store:
+            store.save(self._given_state(advert_id=1, cpm=150))
+            store.save(self._given_state(advert_id=1, cpm=152))
+            store.save(self._given_state(advert_id=2, cpm=200))
+            self.assertEqual(store.batches, [])
+
+        self.assertEqual(store.batches, [{1: 152, 2: 200}])
+
+    async def test_max_batch_triggers_flush(self):
+        store = FakeSQLAlchemyBidderStateStore(flush_interval=60, max_batch=2)
+
+        async with store:
+            store.save(self._given_state(advert_id=1, cpm=150))
+            store.save(self._given_state(advert_id=2, cpm=200))
+            await asyncio.sleep(0.01)
+            self.assertEqual(store.batches, [{1: 150, 2: 200}])
+
+    async def test_failed_upsert_keeps_states(self):
+        store = FakeSQLAlchemyBidderStateStore(flush_interval=60, max_batch=100)
+        store.fail = True
+
+        store.save(self._given_state(advert_id=1, cpm=150))
+        await store.flush()
+        store.save(self._given_state(advert_id=2, cpm=200))
+        store.fail = False
+        await store.flush()
+
+        self.assertEqual(store.batches, [{1: 150, 2: 200}])
+
+    async def test_cancelled_upsert_keeps_states(self):
+        store = FakeSQLAlchemyBidderStateStore(flush_interval=60, max_batch=100)
+        store.block = asyncio.Event()
+
+        store.save(self._given_state(advert_id=1, cpm=150))
+        flush = asyncio.create_task(store.flush())
+        await asyncio.sleep(0)
+        flush.cancel()
+        await asyncio.gather(flush, return_exceptions=True)
+        store.block.set()
+        await store.flush()
+
+        self.assertEqual(store.batches, [{1: 150}])
+
+    async def test_load_returns_pending_state(self):
+        store = FakeSQLAlchemyBidderStateStore(flush_interval=60, max_batch=100)
+
+        store.save(self._given_state(advert_id=1, cpm=150))
+
+        self.assertEqual((await store.load(1)).last_cpm, 150)
+
+    @staticmethod
+    def _given_state(advert_id: int, cpm: int) -> BidderStateSchema:
+        return BidderStateSchema(advertId=advert_id, last_cpm=cpm)
+
+class TestBidderState(unittest.IsolatedAsyncioTestCase):
+
+    async def test_bidder_restores_cpm_and_streak(self):
+        store = InMemoryBidderStateStore([BidderStateSchema(advertId=1, last_cpm=200, last_position=40, streak=3)])
+        bidder = self._given_bidder(state_store=store)
+
+        await bidder.start()
+
+        self.assertEqual(bidder.applied_cpm, 200 + bidder.bidder_data.step)
+        self.assertEqual(store.states[1].last_cpm, bidder.applied_cpm)
+        self.assertEqual(store.states[1].streak, 4)
+
+    async def test_streak_resets_on_direction_change(self):
+        store = InMemoryBidderStateStore([BidderStateSchema(advertId=1, last_cpm=300, streak=3)])
+        bidder = self._given_bidder(state_store=store)
+        bidder._get_next_cpm = lambda current_position: 250
+
+        await bidder.start()
+
+        self.assertEqual(store.states[1].streak, -1)
+
+    async def test_restored_cpm_below_start_cpm_is_kept(self):
+        store = InMemoryBidderStateStore([BidderStateSchema(advertId=1, last_cpm=200)])
+        bidder = self._given_bidder(state_store=store, max_cpm_campaign=1200)
+
+        await bidder.start()
+
+        self.assertEqual(bidder.applied_cpm, 200 + bidder.bidder_data.step)
+
+    async def test_bisection_resumes_bracket_after_restart(self):
+        store = InMemoryBidderStateStore([BidderStateSchema(
+            advertId=1, last_cpm=250, manager_state={"lo": 200, "hi": 300, "last_cpm": 250}
+        )])
+        bidder = self._given_bidder(state_store=store, type_work_bidder=ModeBidder.BISECTION)
+
+        await bidder.start()
+
+        self.assertEqual(bidder.applied_cpm, 275)
+        self.assertEqual(store.states[1].manager_state, {"lo": 250, "hi": 300, "last_cpm": 275})
+
+    def _given_bidder(self, state_store: BidderStateStore, **bidder_data) -> DefaultBidder:
+        bidder = DefaultBidder(
+            bidder_data=BidderData(**{
+                "advertId": 1,
+                "max_cpm_campaign": 400,
+                "min_cpm_campaign": 150,
+                "wish_place_in_top": 10,
+                **bidder_data
+            }),
+            http_client=NoHttpClient(),
+            token="token",
+            articuls=[],
+            state_store=state_store
+        )
+        bidder.applied_cpm = None
+
+        async def get_current_position():
+            return 40
+
+        async def change_cpm(cpm: int):
+            bidder.applied_cpm = cpm
+            bidder.calculator.min_cpm = cpm
+
+        bidder._get_current_position = get_current_position
+        bidder._change_cpm = change_cpm
+        return bidder
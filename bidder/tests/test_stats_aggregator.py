@@ -0,0 +1,66 @@
+import unittest
+import asyncio
+
+from ..position_report import PositionReport
+from ..stats_aggregator import WildberriesStatsAggregator
+
+
+class FakeStatsWorker:
+    def __init__(self, positions: dict, groups_per_page: int):
+        self.positions = positions
+        self.groups_per_page = groups_per_page
+        self.schemas = []
+
+    async def run_report(self, schema):
+        return PositionReport.from_stats(await self.run(schema))
+
+    async def run(self, schema):
+        self.schemas.append(schema)
+        nm_ids = [nm_id for nm_id in schema.nmIds if nm_id in self.positions]
+        page = nm_ids[schema.offset:schema.offset + self.groups_per_page]
+        return {
+            "data": {
+                "groups": [
+                    {"items": [{"nmId": nm_id, "avgPosition": {"current": self.positions[nm_id]}}]}
+                    for nm_id in page
+                ]
+            }
+        }
+
+
+class TestWildberriesStatsAggregator(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.positions = {1: 10, 2: 20, 3: 30, 4: 40, 5: 50}
+        self.batch_window = 0.01
+
+    async def test_one_request_for_many_campaigns(self):
+        worker, aggregator = self._given_aggregator(page_limit=1000)
+
+        results = await self._when_get_positions(aggregator, [[1], [2, 3], [5]])
+
+        self.assertEqual(results, [{1: 10}, {2: 20, 3: 30}, {5: 50}])
+        self.assertEqual(len(worker.schemas), 1)
+        self.assertEqual(worker.schemas[0].nmIds, [1, 2, 3, 5])
+
+    async def test_pages_through_offset(self):
+        worker, aggregator = self._given_aggregator(page_limit=2)
+
+        results = await self._when_get_positions(aggregator, [[1, 2, 3, 4, 5]])
+
+        self.assertEqual(results, [self.positions])
+        self.assertEqual([schema.offset for schema in worker.schemas], [0, 2, 4])
+
+    def _given_aggregator(self, page_limit: int) -> tuple:
+        worker = FakeStatsWorker(positions=self.positions, groups_per_page=page_limit)
+        aggregator = WildberriesStatsAggregator(
+            stats_worker=worker,
+            batch_window=self.batch_window,
+            page_limit=page_limit
+        )
+        return worker, aggregator
+
+    async def _when_get_positions(self, aggregator, nm_ids_by_campaign: list) -> list:
+        return await asyncio.gather(*(
+            aggregator.get_positions(nm_ids) for nm_ids in nm_ids_by_campaign
+        ))
@@ -0,0 +1,89 @@
+import unittest
+import asyncio
+
+import httpx
+
+from ..custom_exceptions import WBException
+from ..rate_limiter import RateLimiter
+from ..schemas import CPMChangeSchema
+from ..settings import RateLimitRule
+from ..wildberries_api import WildberriesBidderCPMWorker
+from utils.http_client import BaseHttpClient
+
+
+class FakeHttpClient(BaseHttpClient):
+    def __init__(self, status_code: int = 200):
+        self.status_code = status_code
+        self.requests = []
+
+    async def send_request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        self.requests.append(kwargs["data"])
+        return httpx.Response(self.status_code, json={})
+
+
+class TestWildberriesBidderCPMWorker(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.advert_id = 1234
+        self.limiter = RateLimiter(by_path={}, default=RateLimitRule(rate=1000, burst=1000))
+
+    async def test_same_cpm_is_not_sent_again(self):
+        http_client, worker = self._given_worker()
+
+        await worker.run(self._given_schema(cpm=150))
+        await worker.run(self._given_schema(cpm=150))
+        await worker.run(self._given_schema(cpm=152))
+
+        self.assertEqual(len(http_client.requests), 2)
+        self.assertEqual(worker.stats, {"writes": 2, "saved_writes": 1})
+
+    async def test_updates_in_window_are_merged(self):
+        http_client, worker = self._given_worker(coalesce_window=0.01)
+
+        await asyncio.gather(*(
+            worker.run(self._given_schema(cpm=cpm)) for cpm in (150, 152, 154)
+        ))
+
+        self.assertEqual(len(http_client.requests), 1)
+        self.assertIn('"cpm": 154', http_client.requests[0])
+        self.assertEqual(worker.stats, {"writes": 1, "saved_writes": 2})
+
+    async def test_write_with_default_window_is_not_delayed(self):
+        http_client = FakeHttpClient()
+        worker = WildberriesBidderCPMWorker(token="token", http_client=http_client, limiter=self.limiter)
+
+        await asyncio.wait_for(worker.run(self._given_schema(cpm=150)), timeout=0.05)
+
+        self.assertEqual(len(http_client.requests), 1)
+
+    async def test_failed_write_is_retried(self):
+        http_client, worker = self._given_worker(status_code=500)
+
+        with self.assertRaises(ValueError):
+            await worker.run(self._given_schema(cpm=150))
+        http_client.status_code = 200
+        await worker.run(self._given_schema(cpm=150))
+
+        self.assertEqual(len(http_client.requests), 2)
+
+    async def test_too_many_requests(self):
+        _, worker = self._given_worker(status_code=429)
+
+        with self.assertRaises(ValueError) as context:
+            await worker.run(self._given_schema(cpm=150))
+
+        self.assertIn(str(WBException.TOO_MANY_REQUESTS), str(context.exception))
+        self.assertLess(worker.bucket.rate, worker.bucket.max_rate)
+
+    def _given_worker(self, coalesce_window: float = 0, status_code: int = 200) -> tuple:
+        http_client = FakeHttpClient(status_code=status_code)
+        worker = WildberriesBidderCPMWorker(
+            token="token",
+            http_client=http_client,
+            limiter=self.limiter,
+            coalesce_window=coalesce_window
+        )
+        return http_client, worker
+
+    def _given_schema(self, cpm: int) -> CPMChangeSchema:
+        return CPMChangeSchema(advertId=self.advert_id, cpm=cpm)
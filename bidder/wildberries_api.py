@@ -1,8 +1,12 @@
 from abc import ABC, abstractmethod
+from urllib.parse import urlparse
+import asyncio
 import json
+import time
 
 from pydantic import BaseModel
 import httpx
+import orjson
 
 from utils.http_client import HttpxHttpClient, BaseHttpClient
 from .custom_exceptions import WBException
@@ -10,11 +14,24 @@ from .schemas import (
     CurrentPositionSchema, PeriodTime, OrderBy,
     CPMChangeSchema
 )
+from .cache import TTLCache, stats_cache, get_stats_cache_key
+from .metrics import metrics
+from .position_report import PositionReport
+from .rate_limiter import RateLimiter, rate_limiter, get_retry_after
+from .settings import settings
 from .utils import BaseFabric, BaseRegistry
 
 
-URL_CPM = "https://advert-api.wildberries.ru/adv/v0/cpm"
-URL_STAT = "https://seller-analytics-api.wildberries.ru/api/v2/search-report/report"
+URL_CPM = settings.wb_api.cpm_url
+URL_STAT = settings.wb_api.stats_url
+
+WB_API_REQUESTS = metrics.counter("wb_api_requests_total", "Requests to WB API", ("endpoint", "status"))
+WB_API_LATENCY = metrics.histogram("wb_api_request_seconds", "WB API response time", ("endpoint", "status"))
+WB_API_RATE_LIMIT_WAIT = metrics.histogram(
+    "wb_api_rate_limit_wait_seconds", "Time spent waiting for the token bucket", ("endpoint",)
+)
+BIDS_CHANGED = metrics.counter("bidder_bids_changed_total", "CPM writes sent to WB")
+BIDS_SKIPPED = metrics.counter("bidder_bids_skipped_total", "CPM writes not sent", ("reason",))
 
 class DataConverter:
     
@@ -27,7 +44,15 @@ class DataConverter:
         return json.dumps(data_dict)
 
 class WildberriesBidderWorkerMixin:
-    def __init__(self, token: str, url: str, http_client: BaseHttpClient):
+    TOO_MANY_REQUESTS = 429
+
+    def __init__(
+        self, 
+        token: str, 
+        url: str, 
+        http_client: BaseHttpClient, 
+        limiter: RateLimiter = rate_limiter
+    ):
         self.token = token 
         self.http_client = http_client
         self.url = url
@@ -35,16 +60,41 @@ class WildberriesBidderWorkerMixin:
             "Content-Type": "application/json",
             "Authorization": self.token
         }
+        self.bucket = limiter.get_bucket(token=self.token, url=self.url)
+        self.endpoint = urlparse(self.url).path
     
     async def _send_request_and_get_json_from_response(self, method: str, data_to_request: BaseModel) -> dict:
-        response = await self.http_client.send_request(
-            method=method,
-            url=self.url,
-            data=self._get_data_for_request(data_to_request),
-            headers=self.headers
-        )
-
+        response = await self._send_request(method=method, data_to_request=data_to_request)
         return self._get_json_from_response(response=response)
+
+    async def _send_request(self, method: str, data_to_request: BaseModel) -> httpx.Response:
+        started_at = time.perf_counter()
+        await self.bucket.acquire()
+        sent_at = time.perf_counter()
+        WB_API_RATE_LIMIT_WAIT.observe(sent_at - started_at, endpoint=self.endpoint)
+
+        status = "error"
+        try:
+            response = await self.http_client.send_request(
+                method=method,
+                url=self.url,
+                data=self._get_data_for_request(data_to_request),
+                headers=self.headers,
+                before_retry=self.bucket.acquire
+            )
+            status = response.status_code
+        finally:
+            WB_API_REQUESTS.inc(endpoint=self.endpoint, status=status)
+            WB_API_LATENCY.observe(time.perf_counter() - sent_at, endpoint=self.endpoint, status=status)
+        self._update_rate_limit(response=response)
+        return response
+
+    def _update_rate_limit(self, response: httpx.Response) -> None:
+        if response.status_code == self.TOO_MANY_REQUESTS:
+            self.bucket.slow_down(retry_after=get_retry_after(response.headers))
+            raise ValueError(WBException.TOO_MANY_REQUESTS)
+        if response.status_code == 200:
+            self.bucket.speed_up()
     
     def _get_data_for_request(self, data_to_request: BaseModel) -> dict:
         return DataConverter.get_clear_data(data_to_request)
@@ -65,19 +115,122 @@ class WBApi(ABC):
     async def run(schema: BaseModel) -> dict: ...
 
 class WildberriesBidderCPMWorker(WBApi, WildberriesBidderWorkerMixin):
-    def __init__(self, token: str, http_client: BaseHttpClient):
-        super().__init__(url=URL_CPM, token=token, http_client=http_client)
+    '''
+    Помнит последнюю применённую ставку каждой кампании и не отправляет
+    повторно ту же. Если задан coalesce_window (по умолчанию 0 - ставка
+    уходит сразу), изменения одной кампании в его пределах схлопываются
+    в одно, уходит последнее значение.
+    '''
+
+
+    def __init__(
+        self, 
+        token: str, 
+        http_client: BaseHttpClient, 
+        limiter: RateLimiter = rate_limiter,
+        coalesce_window: float = settings.cpm_var.coalesce_window,
+        url: str = URL_CPM
+    ):
+        super().__init__(url=url, token=token, http_client=http_client, limiter=limiter)
+        self.coalesce_window = coalesce_window
+
+        self._applied_cpm: dict[int, int] = {}
+        self._pending: dict[int, CPMChangeSchema] = {}
+        self.writes = 0
+        self.saved_writes = 0
 
     async def run(self, schema: CPMChangeSchema) -> dict:
-        return await self._send_request_and_get_json_from_response(method="post", data_to_request=schema)
+        if self._is_applied(schema=schema):
+            return self._skip(reason="applied")
+        if self.coalesce_window > 0:
+            if self._merge_pending(schema=schema):
+                return self._skip(reason="coalesced")
+
+            schema = await self._wait_final_schema(schema=schema)
+            if self._is_applied(schema=schema):
+                return self._skip(reason="applied")
+
+        response = await self._send_request_and_get_json_from_response(method="post", data_to_request=schema)
+        self._applied_cpm[schema.advertId] = schema.cpm
+        self.writes += 1
+        BIDS_CHANGED.inc()
+        return response
+
+    @property
+    def stats(self) -> dict:
+        return {
+            "writes": self.writes,
+            "saved_writes": self.saved_writes,
+        }
+
+    def _skip(self, reason: str) -> dict:
+        self.saved_writes += 1
+        BIDS_SKIPPED.inc(reason=reason)
+        return {}
+
+    def _is_applied(self, schema: CPMChangeSchema) -> bool:
+        return self._applied_cpm.get(schema.advertId) == schema.cpm
+
+    def _merge_pending(self, schema: CPMChangeSchema) -> bool:
+        if schema.advertId not in self._pending:
+            return False
+        self._pending[schema.advertId] = schema
+        return True
+
+    async def _wait_final_schema(self, schema: CPMChangeSchema) -> CPMChangeSchema:
+        self._pending[schema.advertId] = schema
+        try:
+            await asyncio.sleep(self.coalesce_window)
+        finally:
+            schema = self._pending.pop(schema.advertId)
+        return schema
 
 class WildberriesBidderStatsWorker(WBApi, WildberriesBidderWorkerMixin):
-    def __init__(self, token: str, http_client: BaseHttpClient):
-        super().__init__(url=URL_STAT, token=token, http_client=http_client)
+    def __init__(
+        self, 
+        token: str, 
+        http_client: BaseHttpClient, 
+        limiter: RateLimiter = rate_limiter,
+        cache: TTLCache | None = stats_cache,
+        url: str = URL_STAT
+    ):
+        super().__init__(url=url, token=token, http_client=http_client, limiter=limiter)
+        self.cache = cache
 
     async def run(self, schema: CurrentPositionSchema):
+        if self.cache is None:
+            return await self._request_stats(schema=schema)
+
+        return await self.cache.get_or_load(
+            get_stats_cache_key(token=self.token, schema=schema),
+            lambda: self._request_stats(schema=schema)
+        )
+
+    async def run_report(self, schema: CurrentPositionSchema) -> PositionReport:
+        '''
+        То же, что run, но ответ сразу разбирается orjson в PositionReport:
+        в памяти (и в кэше) остаются только массивы нужных полей.
+        '''
+        if self.cache is None:
+            return await self._request_report(schema=schema)
+
+        return await self.cache.get_or_load(
+            ("report", *get_stats_cache_key(token=self.token, schema=schema)),
+            lambda: self._request_report(schema=schema)
+        )
+
+    async def _request_stats(self, schema: CurrentPositionSchema) -> dict:
         return await self._send_request_and_get_json_from_response(method="post", data_to_request=schema)
 
+    async def _request_report(self, schema: CurrentPositionSchema) -> PositionReport:
+        response = await self._send_request(method="post", data_to_request=schema)
+        if response.status_code != 200:
+            raise ValueError(WBException.INVALID_REQUEST)
+        try:
+            return PositionReport.from_content(response.content)
+        except orjson.JSONDecodeError:
+            return PositionReport.empty()
+
 
 class WBApiRegistry(BaseRegistry): 
     _registry = {}
@@ -18,4 +18,5 @@ NOT_AVAILABLE_NEURO = "Neuro not available for this category"
 DOES_NOT_EXISTS = "Does not exists this values"
 BAD_DATA_TO_AUTH = "Incorrect data to auth"
 CANNOT_COLLECT = "Cannot collect this data"
-CANNOT_GET_VAR_NAME = "Cannot get var name"
\ No newline at end of file
+CANNOT_GET_VAR_NAME = "Cannot get var name"
+CIRCUIT_IS_OPEN = "Host {host} is unavailable, circuit breaker is open"
@@ -1,8 +1,13 @@
 from abc import ABC, abstractmethod
+from collections import Counter, defaultdict
+from typing import Awaitable, Callable
+import asyncio
+import importlib.util
 
 import httpx
 
 from .exceptions import *
+from .retry import RetryPolicy, CircuitBreaker
 
 
 class BaseHttpClient(ABC):
@@ -11,23 +16,208 @@ class BaseHttpClient(ABC):
     async def send_request(self, method: str, url: str, **kwargs) -> httpx.Response:
         ...
 
+    async def start(self) -> None:
+        ...
+
+    async def close(self) -> None:
+        ...
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.close()
+
+class _AttemptError(Exception):
+    def __init__(self, message: str, retryable: bool):
+        super().__init__(message)
+        self.message = message
+        self.retryable = retryable
+
 class HttpxHttpClient(BaseHttpClient):
-    async def send_request(self, method: str, url: str, **kwargs) -> httpx.Response:
-        async with httpx.AsyncClient() as client:
-            self.client = client
-            return await self._request(method=method, url=url, **kwargs)
+    '''
+    Держит один httpx.AsyncClient на всё время жизни процесса: соединения
+    переиспользуются через keep-alive пул, без нового TCP+TLS на каждый запрос.
+    Клиент поднимается лениво при первом запросе или явно через start().
+
+    Сбои повторяются по RetryPolicy метода (ключ "default" - для остальных;
+    POST по умолчанию не повторяется). Перед каждым повтором ждётся
+    before_retry (например, токен rate limiter'а вызывающего), чтобы повторы
+    не обходили лимит. На каждый хост свой CircuitBreaker: пока WB лежит,
+    запросы отклоняются сразу. Счётчики - в metrics.
+    '''
+    TIMEOUT = 10
+    MAX_CONNECTIONS = 100
+    MAX_KEEPALIVE_CONNECTIONS = 20
+    KEEPALIVE_EXPIRY = 30
+    RETRY_POLICIES = {
+        "default": RetryPolicy(),
+        "post": RetryPolicy(max_attempts=1),
+    }
+
+    def __init__(
+        self,
+        timeout: float = TIMEOUT,
+        max_connections: int = MAX_CONNECTIONS,
+        max_keepalive_connections: int = MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry: float = KEEPALIVE_EXPIRY,
+        http2: bool = False,
+        host_max_connections: dict[str, int] | None = None,
+        retry_policies: dict[str, RetryPolicy | dict] | None = None,
+        failure_threshold: int = CircuitBreaker.FAILURE_THRESHOLD,
+        recovery_timeout: float = CircuitBreaker.RECOVERY_TIMEOUT
+    ):
+        self.timeout = timeout
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry
+        )
+        self.http2 = http2 and self._has_http2_support()
+        self.host_max_connections = host_max_connections or {}
+        self.retry_policies = self._get_retry_policies(retry_policies=retry_policies)
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.client: httpx.AsyncClient | None = None
+
+        self._circuit_breakers: dict[str, CircuitBreaker] = {}
+        self._counters: dict[str, Counter] = defaultdict(Counter)
+
+    async def start(self) -> None:
+        if self.client is None or self.client.is_closed:
+            self.client = self._create_client()
+
+    async def close(self) -> None:
+        if self.client is not None and not self.client.is_closed:
+            await self.client.aclose()
+        self.client = None
+
+    async def send_request(
+        self, method: str, url: str, before_retry: Callable[[], Awaitable] | None = None, **kwargs
+    ) -> httpx.Response:
+        await self.start()
+        return await self._request(method=method, url=url, before_retry=before_retry, **kwargs)
+
+    @property
+    def metrics(self) -> dict[str, dict]:
+        return {
+            host: {
+                **counters,
+                "circuit_state": self._circuit_breakers[host].state,
+                "circuit_opened": self._circuit_breakers[host].opened_count,
+            }
+            for host, counters in self._counters.items()
+        }
 
-    async def _request(self, method: str, url: str, **kwargs) -> httpx.Response:
+    def _create_client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            timeout=self.timeout,
+            limits=self.limits,
+            http2=self.http2,
+            mounts=self._get_host_mounts()
+        )
+
+    def _get_host_mounts(self) -> dict[str, httpx.AsyncHTTPTransport]:
+        return {
+            f"all://{host}": httpx.AsyncHTTPTransport(
+                limits=httpx.Limits(
+                    max_connections=max_connections,
+                    max_keepalive_connections=max_connections,
+                    keepalive_expiry=self.limits.keepalive_expiry
+                ),
+                http2=self.http2
+            )
+            for host, max_connections in self.host_max_connections.items()
+        }
+
+    @staticmethod
+    def _has_http2_support() -> bool:
+        return importlib.util.find_spec("h2") is not None
+
+    async def _request(
+        self, method: str, url: str, before_retry: Callable[[], Awaitable] | None = None, **kwargs
+    ) -> httpx.Response:
+        host = httpx.URL(url).host
+        breaker = self._get_circuit_breaker(host=host)
+        policy = self.retry_policies.get(method, self.retry_policies["default"])
+        counters = self._counters[host]
+
+        for attempt in range(policy.max_attempts):
+            if attempt and before_retry is not None:
+                await before_retry()
+            if not breaker.allow():
+                counters["rejected"] += 1
+                raise ValueError(CIRCUIT_IS_OPEN.format(host=host))
+            counters["requests"] += 1
+            if attempt:
+                counters["retries"] += 1
+
+            try:
+                response = await self._send_once(method=method, url=url, breaker=breaker, policy=policy, **kwargs)
+            except _AttemptError as e:
+                counters["failures"] += 1
+                if not (e.retryable and policy.can_retry(attempt)):
+                    raise ValueError(e.message)
+            else:
+                if response.status_code not in policy.retry_statuses or not policy.can_retry(attempt):
+                    return response
+                counters["failures"] += 1
+            await asyncio.sleep(policy.get_delay(attempt))
+
+    async def _send_once(
+        self, method: str, url: str, breaker: CircuitBreaker, policy: RetryPolicy, **kwargs
+    ) -> httpx.Response:
         try:
             http_method = getattr(self.client, method)
-            
+
             response = await http_method(url, **kwargs)
-            return response
-        except httpx.RequestError:
-            raise ValueError(INVALID_REQUEST)
+        except httpx.ConnectTimeout:
+            breaker.record_failure()
+            raise _AttemptError(TIME_LIMIT_IS_REACHED, retryable=policy.retry_on_connection_error)
         except httpx.TimeoutException:
-            raise ValueError(TIME_LIMIT_IS_REACHED)
+            breaker.record_failure()
+            raise _AttemptError(TIME_LIMIT_IS_REACHED, retryable=policy.retry_on_timeout)
+        except httpx.RequestError:
+            breaker.record_failure()
+            raise _AttemptError(INVALID_REQUEST, retryable=policy.retry_on_connection_error)
         except httpx.HTTPStatusError as e:
+            breaker.release()
             raise ValueError(STATUS_ERROR.format(status_code=e.response.status_code))
-        except:
-            raise ValueError(INTERNAL_SERVER_ERROR)
\ No newline at end of file
+        except Exception:
+            breaker.release()
+            raise ValueError(INTERNAL_SERVER_ERROR)
+        except BaseException:
+            breaker.release()
+            raise
+
+        if response.status_code >= 500:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+        return response
+
+    def _get_circuit_breaker(self, host: str) -> CircuitBreaker:
+        if host not in self._circuit_breakers:
+            self._circuit_breakers[host] = CircuitBreaker(
+                failure_threshold=self.failure_threshold,
+                recovery_timeout=self.recovery_timeout
+            )
+        return self._circuit_breakers[host]
+
+    def _get_retry_policies(self, retry_policies: dict[str, RetryPolicy | dict] | None) -> dict[str, RetryPolicy]:
+        policies = dict(self.RETRY_POLICIES)
+        for method, policy in (retry_policies or {}).items():
+            policies[method] = policy if isinstance(policy, RetryPolicy) else RetryPolicy(**policy)
+        return policies
+
+_shared_http_client: HttpxHttpClient | None = None
+
+def get_shared_http_client(**kwargs) -> HttpxHttpClient:
+    '''
+    Один пул соединений на процесс. kwargs учитываются только при первом вызове.
+    '''
+    global _shared_http_client
+    if _shared_http_client is None:
+        _shared_http_client = HttpxHttpClient(**kwargs)
+    return _shared_http_client
@@ -0,0 +1,90 @@
+import random
+import time
+
+
+class RetryPolicy:
+    '''
+    Сколько раз и на что повторять запрос: сетевые ошибки, таймауты и
+    статусы из retry_statuses. Пауза - full jitter: случайная от 0 до
+    min(backoff_max, backoff_base * 2 ** attempt).
+    '''
+    MAX_ATTEMPTS = 3
+    BACKOFF_BASE = 0.2
+    BACKOFF_MAX = 5.0
+    RETRY_STATUSES = (500, 502, 503, 504)
+
+    def __init__(
+        self,
+        max_attempts: int = MAX_ATTEMPTS,
+        backoff_base: float = BACKOFF_BASE,
+        backoff_max: float = BACKOFF_MAX,
+        retry_statuses: tuple[int, ...] | list[int] = RETRY_STATUSES,
+        retry_on_timeout: bool = True,
+        retry_on_connection_error: bool = True
+    ):
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.retry_statuses = frozenset(retry_statuses)
+        self.retry_on_timeout = retry_on_timeout
+        self.retry_on_connection_error = retry_on_connection_error
+
+    def can_retry(self, attempt: int) -> bool:
+        return attempt + 1 < self.max_attempts
+
+    def get_delay(self, attempt: int) -> float:
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+class CircuitBreaker:
+    '''
+    Per-host предохранитель: после failure_threshold ошибок подряд хост
+    считается лежащим и запросы сразу отклоняются. Через recovery_timeout
+    пропускается один пробный запрос (half-open): успех закрывает цепь,
+    ошибка снова открывает её на recovery_timeout.
+    '''
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    FAILURE_THRESHOLD = 5
+    RECOVERY_TIMEOUT = 30.0
+
+    def __init__(self, failure_threshold: int = FAILURE_THRESHOLD, recovery_timeout: float = RECOVERY_TIMEOUT):
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_count = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+
+    def allow(self) -> bool:
+        if self.state == self.CLOSED:
+            return True
+        if self.state == self.OPEN and time.monotonic() - self._opened_at >= self.recovery_timeout:
+            self.state = self.HALF_OPEN
+        if self.state == self.HALF_OPEN and not self._probe_in_flight:
+            self._probe_in_flight = True
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self.state = self.CLOSED
+        self.failures = 0
+        self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self._probe_in_flight = False
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            self._open()
+
+    def release(self) -> None:
+        self._probe_in_flight = False
+
+    def _open(self) -> None:
+        if self.state != self.OPEN:
+            self.opened_count += 1
+        self.state = self.OPEN
+        self._opened_at = time.monotonic()